@@ -1,12 +1,22 @@
 # app.py
 
 from flask import Flask
+from common import instrumentation, profiling, readiness
 from controllers.main_controller import main_blueprint
+from models.stock_model import check_database, ensure_indexes
 
 def create_app():
     app = Flask(__name__)
+    # Index the issuer column once so per-issuer queries don't scan the table
+    ensure_indexes()
     # Register the main blueprint where all routes are defined
     app.register_blueprint(main_blueprint)
+    # Per-route latency, trace ids and the /metrics endpoint
+    instrumentation.init_app(app)
+    # Opt-in per-request profiling (PROFILING_ENABLED=1)
+    profiling.init_app(app)
+    # /health, and /ready once the database is readable
+    readiness.init_app(app, checks=[check_database])
     return app
 
 if __name__ == '__main__':
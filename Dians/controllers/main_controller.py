@@ -1,12 +1,26 @@
 # controllers/main_controller.py
 
+import logging
+import os
+import queue
+import time
+
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import requests
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, Response, render_template, request, jsonify, stream_with_context, url_for
+from markupsafe import escape
 from plotly.subplots import make_subplots
 
+from common.instrumentation import traced_post, current_request_id
+from common.singleflight import SingleFlight
+from models import live_feed
+from models.embedded_strategies import STRATEGY_RUNS, RemoteBackoff, StrategyError, analyze_embedded
+from models.export import EXPORT_FORMATS, stream_export
+from models.issuer_search import get_issuer_index
+from models.market_analytics import get_market_analytics
+from models.portfolio import get_portfolio_analytics
 from models.stock_model import (
     get_stock_data,
     get_all_stock_data,
@@ -14,10 +28,36 @@ from models.stock_model import (
     get_filtered_data_for_analysis,
     get_issuer_details,
     get_issuer_data_for_graph,
+    get_data_version,
     fetch_data
 )
 
 main_blueprint = Blueprint('main_blueprint', __name__)
+logger = logging.getLogger(__name__)
+
+# Overridable so the app can run against local stand-ins outside docker-compose
+STRATEGY_SERVICE_URL = os.environ.get('STRATEGY_SERVICE_URL', 'http://strategy_service:5003')
+PREDICTION_SERVICE_URL = os.environ.get('PREDICTION_SERVICE_URL', 'http://prediction_service:5002')
+
+# Where chart analyses run: 'remote' (the strategy service), 'embedded' (in this
+# process), or 'auto' (remote, falling back to embedded when the call fails or
+# takes longer than STRATEGY_TIMEOUT seconds). After a failure, auto mode runs
+# embedded without calling the service for STRATEGY_BACKOFF seconds.
+STRATEGY_MODE = os.environ.get('STRATEGY_MODE', 'remote').lower()
+STRATEGY_TIMEOUT = float(os.environ.get('STRATEGY_TIMEOUT', '2'))
+STRATEGY_BACKOFF = float(os.environ.get('STRATEGY_BACKOFF', '10'))
+strategy_backoff = RemoteBackoff(STRATEGY_BACKOFF)
+
+# POST /api/issuers/<code>/bars is disabled unless LIVE_INGEST_TOKEN is set, and
+# then requires it in the X-Ingest-Token header. Ingested bars are only written
+# to the database with LIVE_INGEST_PERSIST=1.
+LIVE_INGEST_TOKEN = os.environ.get('LIVE_INGEST_TOKEN')
+LIVE_INGEST_PERSIST = os.environ.get('LIVE_INGEST_PERSIST') == '1'
+INGEST_TOKEN_HEADER = 'X-Ingest-Token'
+
+# Concurrent requests for the same issuer, strategy and data version do the work once
+graph_flight = SingleFlight('issuer_graph')
+prediction_flight = SingleFlight('issuer_prediction')
 
 
 @main_blueprint.route('/')
@@ -47,6 +87,178 @@ def analysis():
     )
 
 
+@main_blueprint.route('/api/issuers/search')
+def search_issuers():
+    query = request.args.get('q', default='', type=str)
+    limit = min(request.args.get('limit', default=10, type=int), 50)
+
+    start = time.perf_counter()
+    matches = get_issuer_index().search(query, limit=limit)
+    took_ms = (time.perf_counter() - start) * 1000
+
+    return jsonify({
+        'query': query,
+        'results': [{'code': code, 'match': match} for code, match in matches],
+        'took_ms': round(took_ms, 3)
+    })
+
+
+def _market_response(run_query, get_engine=get_market_analytics):
+    """
+    Run one market (or portfolio) analytics query, timing it and turning
+    errors into JSON.
+    """
+    start = time.perf_counter()
+    try:
+        result = run_query(get_engine())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.exception("Market analytics query failed")
+        return jsonify({'error': str(e)}), 500
+    took_ms = (time.perf_counter() - start) * 1000
+    return jsonify({'results': result, 'took_ms': round(took_ms, 3)})
+
+
+@main_blueprint.route('/api/market/top-movers')
+def market_top_movers():
+    date = request.args.get('date', default=None, type=str)
+    limit = min(request.args.get('limit', default=10, type=int), 100)
+    return _market_response(lambda market: market.top_movers(date=date, limit=limit))
+
+
+@main_blueprint.route('/api/market/turnover')
+def market_turnover():
+    days = request.args.get('days', default=30, type=int)
+    limit = min(request.args.get('limit', default=10, type=int), 100)
+    return _market_response(lambda market: market.turnover_leaders(days=days, limit=limit))
+
+
+@main_blueprint.route('/api/market/volume-leaders')
+def market_volume_leaders():
+    days = request.args.get('days', default=30, type=int)
+    limit = min(request.args.get('limit', default=10, type=int), 100)
+    return _market_response(lambda market: market.volume_leaders(days=days, limit=limit))
+
+
+@main_blueprint.route('/api/market/volatility')
+def market_volatility():
+    window = max(request.args.get('window', default=20, type=int), 2)
+    limit = min(request.args.get('limit', default=10, type=int), 100)
+    return _market_response(lambda market: market.volatility(window=window, limit=limit))
+
+
+def _portfolio_args():
+    """
+    Issuers (comma-separated codes), frequency and min_periods shared by the
+    portfolio endpoints.
+    """
+    issuers = [code.strip().upper() for code in request.args.get('issuers', default='', type=str).split(',') if code.strip()]
+    frequency = request.args.get('frequency', default='D', type=str).upper()
+    min_periods = min(max(request.args.get('min_periods', default=20, type=int), 2), 1000)
+    return issuers, frequency, min_periods
+
+
+@main_blueprint.route('/api/portfolio/correlation')
+def portfolio_correlation():
+    issuers, frequency, min_periods = _portfolio_args()
+    return _market_response(
+        lambda portfolio: portfolio.correlation(issuers, frequency=frequency, min_periods=min_periods),
+        get_portfolio_analytics
+    )
+
+
+@main_blueprint.route('/api/portfolio/betas')
+def portfolio_betas():
+    issuers, frequency, min_periods = _portfolio_args()
+    window = min(max(request.args.get('window', default=60, type=int), 2), 1000)
+    return _market_response(
+        lambda portfolio: portfolio.betas(issuers, window=window, frequency=frequency, min_periods=min_periods),
+        get_portfolio_analytics
+    )
+
+
+@main_blueprint.route('/api/portfolio/volatility')
+def portfolio_volatility():
+    issuers, frequency, min_periods = _portfolio_args()
+    weights = request.args.get('weights', default=None, type=str)
+
+    def run_query(portfolio):
+        try:
+            parsed = [float(weight) for weight in weights.split(',')] if weights else None
+        except ValueError:
+            raise ValueError("weights must be comma-separated numbers")
+        return portfolio.volatility(issuers, parsed, frequency=frequency, min_periods=min_periods)
+
+    return _market_response(run_query, get_portfolio_analytics)
+
+
+@main_blueprint.route('/portfolio')
+def portfolio():
+    issuers, frequency, min_periods = _portfolio_args()
+    context = {'issuers': ','.join(issuers), 'frequency': frequency, 'min_periods': min_periods}
+    try:
+        analytics = get_portfolio_analytics()
+        # Without a selection, show the most actively traded issuers
+        issuers = issuers or analytics.panel.most_traded()
+        result = analytics.correlation(issuers, frequency=frequency, min_periods=min_periods)
+    except ValueError as e:
+        return render_template('portfolio.html', error=str(e), **context)
+
+    fig = go.Figure(go.Heatmap(
+        z=result['correlation'],
+        x=result['issuers'],
+        y=result['issuers'],
+        customdata=result['observations'],
+        zmin=-1,
+        zmax=1,
+        colorscale='RdBu',
+        reversescale=True,
+        hovertemplate='%{y} / %{x}<br>correlation %{z:.2f}<br>%{customdata} common observations<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f"Correlation of {'daily' if frequency == 'D' else 'weekly'} returns",
+        yaxis_autorange='reversed',
+        template='plotly_white',
+        height=max(500, 28 * len(result['issuers']) + 200)
+    )
+
+    try:
+        volatility = analytics.volatility(result['issuers'], frequency=frequency, min_periods=min_periods)
+    except ValueError:
+        volatility = None
+
+    return render_template(
+        'portfolio.html',
+        graph_html=fig.to_html(full_html=False),
+        volatility=volatility,
+        **context
+    )
+
+
+@main_blueprint.route('/export/stock_data.<fmt>')
+def export_stock_data(fmt):
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unsupported export format '{fmt}'"}), 404
+
+    issuer = request.args.get('issuer', default=None, type=str)
+    try:
+        # Validate up front: once streaming starts the status can't change
+        start_date, end_date = (
+            pd.Timestamp(value).strftime('%Y-%m-%d') if value else None
+            for value in (request.args.get('start'), request.args.get('end'))
+        )
+    except ValueError:
+        return jsonify({'error': 'start and end must be dates in YYYY-MM-DD format'}), 400
+
+    filename = f"stock_data{'_' + issuer if issuer else ''}.{fmt}"
+    return Response(
+        stream_with_context(stream_export(fmt, issuer, start_date, end_date)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
 @main_blueprint.route('/issuer/<issuer_code>')
 def issuer_details(issuer_code):
     stock_data = get_issuer_details(issuer_code)
@@ -55,31 +267,78 @@ def issuer_details(issuer_code):
 
 @main_blueprint.route('/issuer/<issuer_code>/graph')
 def issuer_graph(issuer_code):
-    df = get_issuer_data_for_graph(issuer_code)
-
     # Determine which strategy to use
     chosen_strategy = request.args.get('strategy', 'full').lower()
+    key = (issuer_code, chosen_strategy, get_data_version())
+    return graph_flight.do(key, _render_issuer_graph, issuer_code, chosen_strategy)
+
 
+def _analyze_remote(df, chosen_strategy, timeout=None):
+    """
+    Run the strategy in the strategy microservice.
+    """
     # Prepare data for the microservice
     data_payload = {
         'issuer_data': df.reset_index().to_dict(orient='records'),
         'strategy': chosen_strategy
     }
 
-    try:
-        # Call the strategy microservice
-        response = requests.post(
-            'http://strategy_service:5003/analyze',  # Ensure this matches the microservice's endpoint
-            json=data_payload
-        )
-        response.raise_for_status()
-        analyzed_data = response.json()
-
-        # Convert back to DataFrame
-        df = pd.DataFrame(analyzed_data)
+    # Call the strategy microservice
+    response = traced_post(
+        'strategy_service',
+        f'{STRATEGY_SERVICE_URL}/analyze',
+        json=data_payload,
+        timeout=timeout
+    )
+    if response.status_code == 400:
+        # Unknown strategy or an invalid rule
+        raise StrategyError(response.json().get('error', 'Invalid strategy'))
+    response.raise_for_status()
+    analyzed_data = response.json()
+
+    # Convert back to DataFrame
+    df = pd.DataFrame(analyzed_data)
+
+    # Convert `Датум` back to datetime
+    df['Датум'] = pd.to_datetime(df['Датум'])
+    return df
+
+
+def _analyze(df, chosen_strategy):
+    """
+    Run the strategy where STRATEGY_MODE says.
+    """
+    if STRATEGY_MODE == 'embedded':
+        STRATEGY_RUNS.labels('embedded').inc()
+        return analyze_embedded(df, chosen_strategy)
+
+    if STRATEGY_MODE == 'auto':
+        if strategy_backoff.active():
+            # Failed recently: don't wait for another timeout
+            STRATEGY_RUNS.labels('fallback').inc()
+            return analyze_embedded(df, chosen_strategy)
+        try:
+            analyzed = _analyze_remote(df, chosen_strategy, timeout=STRATEGY_TIMEOUT)
+            strategy_backoff.succeeded()
+            STRATEGY_RUNS.labels('remote').inc()
+            return analyzed
+        except requests.RequestException as e:
+            # Down, slow or failing (5xx): compute the chart here instead
+            logger.warning("Strategy service unavailable, analysing in-process for %ss (%s, request_id=%s)",
+                           STRATEGY_BACKOFF, e, current_request_id())
+            strategy_backoff.failed()
+            STRATEGY_RUNS.labels('fallback').inc()
+            return analyze_embedded(df, chosen_strategy)
+
+    STRATEGY_RUNS.labels('remote').inc()
+    return _analyze_remote(df, chosen_strategy)
+
+
+def _render_issuer_graph(issuer_code, chosen_strategy):
+    df = get_issuer_data_for_graph(issuer_code)
 
-        # Convert `Датум` back to datetime
-        df['Датум'] = pd.to_datetime(df['Датум'])
+    try:
+        df = _analyze(df, chosen_strategy)
 
         if 'InsufficientData' in df and df['InsufficientData'].iloc[0]:
             return f"<h3>Insufficient data for issuer {issuer_code}. Please upload more data to perform technical strategies.</h3>"
@@ -239,37 +498,104 @@ def issuer_graph(issuer_code):
         fig.update_yaxes(title_text="MACD", row=3, col=1)
         fig.update_yaxes(title_text="ADX & CCI", row=4, col=1)
 
-        # Return minimal HTML so it can be embedded in iframe
-        return fig.to_html(full_html=False)
+        # Return minimal HTML so it can be embedded in iframe, plus the script
+        # that appends bars pushed over /issuer/<code>/stream to the traces
+        live_script = (
+            f'<script src="{url_for("static", filename="js/live_chart.js")}" data-graph="analysis-graph" '
+            f'data-stream="{url_for("main_blueprint.issuer_stream", issuer_code=issuer_code)}" '
+            f'data-strategy="{escape(chosen_strategy)}"></script>'
+        )
+        return fig.to_html(full_html=False, div_id='analysis-graph') + live_script
+
+    except StrategyError as e:
+        return f"<h3>{escape(str(e))}</h3>"
 
     except requests.RequestException as e:
         return f"<h3>Error communicating with the strategy service: {e}</h3>"
 
     except Exception as e:
+        logger.exception("Rendering graph for %s failed (request_id=%s)", issuer_code, current_request_id())
         return f"<h3>An unexpected error occurred: {e}</h3>"
 
 
-@main_blueprint.route('/issuer/<issuer_code>/predict', methods=['GET'])
-def predict_and_display(issuer_code):
-    # Fetch issuer data
-    df = fetch_data(issuer_code)
-    if len(df) < 100:
-        return f"<h3>Not enough data to train the model for {issuer_code}. Please add more historical data.</h3>"
+@main_blueprint.route('/issuer/<issuer_code>/stream')
+def issuer_stream(issuer_code):
+    """
+    Server-Sent Events: one `bar` event per ingested bar for this issuer,
+    carrying the bar and the updated indicator and signal values.
+    """
+    if not live_feed.is_known_issuer(issuer_code):
+        return jsonify({'error': f"Unknown issuer: {issuer_code}"}), 404
+    live_feed.start_simulated_feed()
+    subscription = live_feed.broker.subscribe(issuer_code)
+
+    def events():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = subscription.get(timeout=15)
+                except queue.Empty:
+                    # Comment line: keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield live_feed.format_sse(event)
+        finally:
+            live_feed.broker.unsubscribe(issuer_code, subscription)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@main_blueprint.route('/api/issuers/<issuer_code>/bars', methods=['POST'])
+def ingest_issuer_bar(issuer_code):
+    if not LIVE_INGEST_TOKEN:
+        return jsonify({'error': "Bar ingestion is disabled"}), 403
+    if request.headers.get(INGEST_TOKEN_HEADER) != LIVE_INGEST_TOKEN:
+        return jsonify({'error': f"Missing or invalid {INGEST_TOKEN_HEADER}"}), 403
+    bar = request.get_json(silent=True) or {}
+    try:
+        event = live_feed.ingest_bar(issuer_code, bar, persist=LIVE_INGEST_PERSIST)
+    except live_feed.UnknownIssuerError as e:
+        return jsonify({'error': str(e)}), 404
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f"Invalid bar: {e}"}), 400
+    except Exception as e:
+        logger.exception("Ingesting bar for %s failed", issuer_code)
+        return jsonify({'error': str(e)}), 500
+    return jsonify(event), 201
+
 
+def _request_predictions(df):
+    """
+    Call the prediction microservice for one issuer's weekly data.
+    """
     # Convert the DataFrame to a format suitable for the API call
     data_payload = {
         'issuer_data': df.reset_index().assign(
             Датум=lambda x: x['Датум'].dt.strftime('%Y-%m-%d')
         ).to_dict(orient='records')  # Convert Timestamps to strings
     }
+    response = traced_post('prediction_service', f'{PREDICTION_SERVICE_URL}/predict', json=data_payload)
+    response.raise_for_status()  # Raise an exception for HTTP errors
+    return response.json()
 
-    try:
-        # Call the prediction microservice
-        response = requests.post('http://prediction_service:5002/predict', json=data_payload)
-        response.raise_for_status()  # Raise an exception for HTTP errors
 
-        # Parse the microservice response
-        response_data = response.json()
+@main_blueprint.route('/issuer/<issuer_code>/predict', methods=['GET'])
+def predict_and_display(issuer_code):
+    # Fetch issuer data
+    df = fetch_data(issuer_code)
+    if len(df) < 100:
+        return f"<h3>Not enough data to train the model for {issuer_code}. Please add more historical data.</h3>"
+
+    try:
+        # Call the prediction microservice, sharing an in-flight call for the same data
+        response_data = prediction_flight.do(
+            (issuer_code, get_data_version()), _request_predictions, df
+        )
 
         if 'predictions' not in response_data or 'dates' not in response_data:
             return f"<h3>Invalid response from prediction service for {issuer_code}.</h3>"
@@ -313,4 +639,5 @@ def predict_and_display(issuer_code):
     except requests.RequestException as e:
         return f"<h3>Error communicating with the prediction service: {e}</h3>"
     except Exception as e:
+        logger.exception("Rendering prediction for %s failed (request_id=%s)", issuer_code, current_request_id())
         return f"<h3>An unexpected error occurred: {e}</h3>"
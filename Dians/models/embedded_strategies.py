@@ -0,0 +1,94 @@
+# models/embedded_strategies.py
+
+"""
+Runs the strategy service's analysis engine inside the main app.
+
+The `strategies` package from strategy_service is imported directly: the
+Docker image copies it next to the app, and in a source checkout it is
+found in ../strategy_service. The analysis is the same code path as
+/analyze, on the same frame, minus the JSON round-trip.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+from prometheus_client import Counter
+
+from common.instrumentation import compute_timer
+
+STRATEGY_RUNS = Counter(
+    'strategy_runs_total',
+    'Chart analyses by where they ran: remote, embedded, or embedded as a fallback after a failed remote call.',
+    ['path']
+)
+
+# strategy_service/ in a source checkout
+_SERVICE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'strategy_service')
+
+
+class RemoteBackoff:
+    """
+    Remembers a failed strategy service call, so that auto mode skips the
+    service for `seconds` instead of waiting for the timeout on every
+    request. The first request after the backoff tries the service again.
+    """
+
+    def __init__(self, seconds, clock=time.monotonic):
+        self.seconds = seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._until = None
+
+    def active(self):
+        with self._lock:
+            return self._until is not None and self._clock() < self._until
+
+    def failed(self):
+        with self._lock:
+            self._until = self._clock() + self.seconds
+
+    def succeeded(self):
+        with self._lock:
+            self._until = None
+
+
+class StrategyError(ValueError):
+    """
+    The requested strategy is unknown or is not a valid rule.
+    """
+
+
+def _rules_module():
+    try:
+        from strategies import rules
+    except ImportError:
+        if _SERVICE_DIR in sys.path or not os.path.isdir(_SERVICE_DIR):
+            raise
+        sys.path.append(_SERVICE_DIR)
+        from strategies import rules
+    return rules
+
+
+def analyze_embedded(df, strategy_spec):
+    """
+    Run a strategy (built-in name or rule) on the frame returned by
+    `get_issuer_data_for_graph`, exactly as the strategy service's /analyze
+    would, and return the analyzed frame.
+    """
+    rules = _rules_module()
+    try:
+        label, strategy = rules.resolve_strategy(strategy_spec)
+    except rules.RuleError as e:
+        raise StrategyError(str(e)) from e
+
+    frame = df.reset_index()
+    frame['Датум'] = pd.to_datetime(frame['Датум'])
+    frame = frame.sort_values('Датум')
+    with compute_timer(f'embedded_analyze_{label}'):
+        result = strategy.perform_analysis(frame)
+    # /analyze returns dates without a time part
+    result['Датум'] = result['Датум'].dt.normalize()
+    return result
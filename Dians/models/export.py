@@ -0,0 +1,136 @@
+# models/export.py
+
+"""
+Streaming serializers for dataset exports.
+
+Each writer consumes `iter_stock_data` (column names, then row batches) and
+yields encoded chunks, one per batch, so a Flask response can send the
+whole table without ever holding it in memory.
+"""
+
+import csv
+import io
+import json
+
+from models.stock_model import iter_stock_data
+
+# Rows per Parquet row group: large enough that the footer metadata stays
+# small (the writer holds every group's metadata until close), small enough
+# that a pending group's Arrow buffers stay a few MiB
+ROW_GROUP_ROWS = 20000
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def iter_csv(batches):
+    columns = next(batches)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_ndjson(batches):
+    columns = next(batches)
+    for rows in batches:
+        yield ''.join(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n' for row in rows
+        ).encode('utf-8')
+
+
+class _DrainableSink(io.RawIOBase):
+    """
+    Write-only file object that hands written bytes back on `drain()`,
+    letting a ParquetWriter stream to an HTTP response.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_parquet(batches, row_group_rows=ROW_GROUP_ROWS):
+    """
+    Batches are gathered into row groups of about `row_group_rows` rows.
+    The writer keeps every row group's metadata until the footer is
+    written, so one row group per batch would make memory grow with the
+    table. Columns are stored as text (the table mixes formatted strings
+    and REALs) except Количина, which is numeric.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = next(batches)
+    schema = pa.schema([
+        (name, pa.float64() if name == 'Количина' else pa.string()) for name in columns
+    ])
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    def write_row_group(pending):
+        table = pa.Table.from_batches(pending, schema=schema)
+        writer.write_table(table, row_group_size=table.num_rows)
+
+    try:
+        pending, pending_rows = [], 0
+        for rows in batches:
+            arrays = [
+                list(values) if field.type == pa.float64()
+                else [None if value is None else str(value) for value in values]
+                for field, values in zip(schema, zip(*rows))
+            ]
+            pending.append(pa.record_batch(arrays, schema=schema))
+            pending_rows += len(rows)
+            if pending_rows >= row_group_rows:
+                write_row_group(pending)
+                pending, pending_rows = [], 0
+                yield sink.drain()
+        if pending:
+            write_row_group(pending)
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+WRITERS = {
+    'csv': iter_csv,
+    'ndjson': iter_ndjson,
+    'parquet': iter_parquet,
+}
+
+
+def stream_export(fmt, issuer=None, start_date=None, end_date=None, batch_size=5000):
+    """
+    Yield the matching rows encoded as `fmt` ('csv', 'ndjson' or 'parquet').
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported export format '{fmt}'")
+    batches = iter_stock_data(issuer, start_date, end_date, batch_size)
+    return WRITERS[fmt](batches)
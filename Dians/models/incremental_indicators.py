@@ -0,0 +1,227 @@
+# models/incremental_indicators.py
+
+"""
+Indicators updated one bar at a time.
+
+Each class keeps just enough state to produce the value for a new bar in
+O(window) or O(1), with the same definitions (windows, smoothing, warm-up)
+as the `ta`/pandas calls in strategy_service's analysis strategies, so a
+streamed point continues the chart rendered by /issuer/<code>/graph.
+"""
+
+from collections import deque
+
+
+class RollingMean:
+    """
+    pandas `rolling(window).mean()`: None until `window` values are seen.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._values = deque(maxlen=window)
+        self._sum = 0.0
+
+    def update(self, value):
+        if len(self._values) == self.window:
+            self._sum -= self._values[0]
+        self._values.append(value)
+        self._sum += value
+        return self._sum / self.window if len(self._values) == self.window else None
+
+
+class Ema:
+    """
+    pandas `ewm(span=span, adjust=False).mean()`, seeded with the first
+    value. `min_periods` hides the first values like `ta`'s EMA does.
+    """
+
+    def __init__(self, span=None, alpha=None, min_periods=0):
+        self.alpha = alpha if alpha is not None else 2 / (span + 1)
+        self.min_periods = min_periods
+        self.value = None
+        self.count = 0
+
+    def update(self, x):
+        self.count += 1
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value if self.count >= self.min_periods else None
+
+
+class Rsi:
+    """
+    ta.momentum.RSIIndicator: Wilder smoothing of gains and losses.
+    """
+
+    def __init__(self, window=14):
+        self._gain = Ema(alpha=1 / window, min_periods=window)
+        self._loss = Ema(alpha=1 / window, min_periods=window)
+        self._previous = None
+
+    def update(self, close):
+        change = 0.0 if self._previous is None else close - self._previous
+        self._previous = close
+        gain = self._gain.update(max(change, 0.0))
+        loss = self._loss.update(max(-change, 0.0))
+        if gain is None or loss is None:
+            return None
+        return 100.0 if loss == 0 else 100 - 100 / (1 + gain / loss)
+
+
+class Macd:
+    """
+    ta.trend.MACD(...).macd(): EMA(12) - EMA(26), None until both are warm.
+    """
+
+    def __init__(self, fast=12, slow=26):
+        self._fast = Ema(span=fast, min_periods=fast)
+        self._slow = Ema(span=slow, min_periods=slow)
+
+    def update(self, close):
+        fast, slow = self._fast.update(close), self._slow.update(close)
+        return None if fast is None or slow is None else fast - slow
+
+
+class Cci:
+    """
+    ta.trend.CCIIndicator: typical price against its rolling mean, scaled
+    by the rolling mean absolute deviation.
+    """
+
+    def __init__(self, window=20, constant=0.015):
+        self.window = window
+        self.constant = constant
+        self._typical = deque(maxlen=window)
+
+    def update(self, high, low, close):
+        typical = (high + low + close) / 3.0
+        self._typical.append(typical)
+        if len(self._typical) < self.window:
+            return None
+        mean = sum(self._typical) / self.window
+        mad = sum(abs(value - mean) for value in self._typical) / self.window
+        return (typical - mean) / (self.constant * mad) if mad else None
+
+
+class Adx:
+    """
+    ta.trend.ADXIndicator(...).adx(). Matches ta's own recursion: true range
+    and directional movement are summed over bars 1..window, then smoothed
+    as s - s / window + x; ADX is the mean of the first `window` DX values,
+    then Wilder-smoothed. ta reports 0 (not NaN) before bar 2 * window - 1.
+    """
+
+    def __init__(self, window=14):
+        self.window = window
+        self._count = 0
+        self._previous = None
+        self._sums = [0.0, 0.0, 0.0]   # true range, +DM, -DM
+        self._dx_seen = []
+        self._adx = None
+
+    def update(self, high, low, close):
+        index = self._count
+        self._count += 1
+        if self._previous is None:
+            self._previous = (high, low, close)
+            return 0.0
+
+        prev_high, prev_low, prev_close = self._previous
+        self._previous = (high, low, close)
+        true_range = max(high, prev_close) - min(low, prev_close)
+        up, down = high - prev_high, prev_low - low
+        plus_dm = up if up > down and up > 0 else 0.0
+        minus_dm = down if down > up and down > 0 else 0.0
+
+        w = self.window
+        if index <= w:
+            for i, value in enumerate((true_range, plus_dm, minus_dm)):
+                self._sums[i] += value
+            if index < w:
+                return 0.0
+        else:
+            for i, value in enumerate((true_range, plus_dm, minus_dm)):
+                self._sums[i] = self._sums[i] - self._sums[i] / w + value
+
+        tr_sum, plus_sum, minus_sum = self._sums
+        plus_di = 100 * plus_sum / tr_sum if tr_sum else 0.0
+        minus_di = 100 * minus_sum / tr_sum if tr_sum else 0.0
+        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di) if plus_di + minus_di else 0.0
+
+        if self._adx is None:
+            self._dx_seen.append(dx)
+            if len(self._dx_seen) < w:
+                return 0.0
+            self._adx = sum(self._dx_seen) / w
+            self._dx_seen = None
+        else:
+            self._adx = (self._adx * (w - 1) + dx) / w
+        return self._adx
+
+
+class IndicatorState:
+    """
+    Every indicator and strategy signal for one issuer, advanced bar by bar.
+    `update` returns the indicator values and each strategy's signal for the
+    new bar, with the thresholds used by the analysis strategies.
+    """
+
+    def __init__(self):
+        self.bars = 0
+        self._previous_close = None
+        self._sma10, self._sma50 = RollingMean(10), RollingMean(50)
+        self._ema10, self._ema50 = Ema(span=10), Ema(span=50)
+        self._rsi = Rsi(14)
+        self._macd = Macd()
+        self._cci = Cci(20)
+        self._adx = Adx(14)
+
+    def update(self, high, low, close):
+        self.bars += 1
+        indicators = {
+            'SMA10': self._sma10.update(close),
+            'SMA50': self._sma50.update(close),
+            'EMA10': self._ema10.update(close),
+            'EMA50': self._ema50.update(close),
+            'RSI': self._rsi.update(close),
+            'MACD': self._macd.update(close),
+            'CCI': self._cci.update(high, low, close),
+            'ADX': self._adx.update(high, low, close),
+        }
+        signals = self._signals(close, indicators)
+        self._previous_close = close
+        return indicators, signals
+
+    def _signals(self, close, ind):
+        # Short histories fall back to the direction of the last price change
+        change = 0.0 if self._previous_close is None else close - self._previous_close
+        fallback = 'Buy' if change > 0 else 'Sell' if change < 0 else 'Hold'
+
+        def above(value, threshold):
+            return value is not None and value > threshold
+
+        def below(value, threshold):
+            return value is not None and value < threshold
+
+        if self.bars < 14:
+            signals = dict.fromkeys(('rsi', 'macd', 'adx', 'full'), fallback)
+        else:
+            rsi = 'Buy' if below(ind['RSI'], 40) else 'Sell' if above(ind['RSI'], 60) else 'Hold'
+            sma10 = ind['SMA10']
+            full = 'Hold'
+            if below(ind['RSI'], 40) and sma10 is not None and close > sma10:
+                full = 'Buy'
+            elif above(ind['RSI'], 60) and sma10 is not None and close < sma10:
+                full = 'Sell'
+            signals = {
+                'rsi': rsi,
+                'macd': 'Buy' if above(ind['MACD'], 0) else 'Sell',
+                'adx': 'Buy' if above(ind['ADX'], 25) else 'Sell',
+                'full': full,
+            }
+
+        if self.bars < 20:
+            signals['cci'] = fallback
+        else:
+            signals['cci'] = 'Buy' if below(ind['CCI'], -100) else 'Sell' if above(ind['CCI'], 100) else 'Hold'
+        return signals
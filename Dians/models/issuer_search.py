@@ -0,0 +1,130 @@
+# models/issuer_search.py
+
+import bisect
+import threading
+from collections import defaultdict
+
+from common.instrumentation import record_cache
+from models.stock_model import get_data_version, get_issuer_codes
+
+
+def _edit_distance(a, b, limit):
+    """
+    Levenshtein distance between a and b, giving up early (returning
+    limit + 1) once every alignment is already worse than `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _deletions(word, depth):
+    """
+    Every string obtained by deleting up to `depth` characters from word.
+    """
+    variants = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+class IssuerIndex:
+    """
+    In-memory search index over the issuer catalog.
+
+    Codes are kept in a sorted list, so a prefix lookup is two binary
+    searches. Fuzzy matching uses a deletion index (the SymSpell trick):
+    two strings within N edits share a variant with at most N characters
+    deleted, so candidates are found with a few dict lookups instead of
+    comparing the query against every code.
+    """
+
+    MAX_DISTANCE = 2
+
+    def __init__(self, codes):
+        self.codes = sorted({code for code in codes if code})
+        # Nothing longer can prefix, contain or be MAX_DISTANCE edits from a code
+        self.max_query_length = max(map(len, self.codes), default=0) + self.MAX_DISTANCE
+        self._deletes = defaultdict(set)
+        for code in self.codes:
+            for variant in _deletions(code, self.MAX_DISTANCE):
+                self._deletes[variant].add(code)
+
+    def prefix(self, query, limit=10):
+        start = bisect.bisect_left(self.codes, query)
+        # '\uffff' sorts after any character that can follow the prefix
+        end = bisect.bisect_right(self.codes, query + '\uffff', lo=start)
+        return self.codes[start:min(end, start + limit)]
+
+    def search(self, query, limit=10, max_distance=2):
+        """
+        Return up to `limit` matches as (code, match_type) pairs, best first:
+        exact/prefix matches, then codes containing the query, then codes
+        within `max_distance` edits of it. Queries longer than any code plus
+        MAX_DISTANCE match nothing and return before the fuzzy step, whose
+        deletion variants grow with the cube of the query length.
+        """
+        query = query.strip().upper()
+        if not query or len(query) > self.max_query_length:
+            return []
+
+        results = [(code, 'prefix') for code in self.prefix(query, limit)]
+        seen = {code for code, _ in results}
+
+        if len(results) < limit:
+            for code in self.codes:
+                if code not in seen and query in code:
+                    results.append((code, 'contains'))
+                    seen.add(code)
+                    if len(results) == limit:
+                        break
+
+        # Short queries would fuzzy-match almost everything
+        max_distance = min(max_distance, self.MAX_DISTANCE, len(query) // 2)
+        if len(results) < limit and max_distance:
+            candidates = set()
+            for variant in _deletions(query, max_distance):
+                candidates |= self._deletes.get(variant, set())
+            scored = []
+            for code in candidates - seen:
+                distance = _edit_distance(query, code, max_distance)
+                if distance <= max_distance:
+                    scored.append((distance, code))
+            scored.sort()
+            results.extend((code, 'fuzzy') for _, code in scored[:limit - len(results)])
+
+        return results
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_issuer_index():
+    """
+    Return the issuer index, rebuilding it only when the database has changed.
+    """
+    global _index, _index_version
+    version = get_data_version()
+    with _index_lock:
+        hit = _index is not None and _index_version == version
+        record_cache('issuer_index', hit)
+        if not hit:
+            _index = IssuerIndex(get_issuer_codes())
+            _index_version = version
+        return _index
@@ -0,0 +1,302 @@
+# models/live_feed.py
+
+"""
+Live bar ingestion and per-issuer push channel.
+
+`ingest_bar` stores a new bar, advances the issuer's incremental indicators
+by one step and publishes the bar with the updated indicator and signal
+values to every subscriber of that issuer (the /issuer/<code>/stream SSE
+endpoint). `SimulatedFeed` generates bars locally for testing.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from common.instrumentation import sql_timer
+from models import stock_model
+from models.incremental_indicators import IndicatorState
+
+logger = logging.getLogger(__name__)
+
+
+def format_mk_number(value):
+    """
+    Format a float the way the exchange exports it, e.g. 1234.5 -> '1.234,50'.
+    """
+    return f"{value:,.2f}".translate(str.maketrans(',.', '.,'))
+
+
+def parse_mk_number(value):
+    """
+    '1.234,56' -> 1234.56; plain numbers pass through.
+    """
+    if isinstance(value, str):
+        value = value.replace('.', '').replace(',', '.')
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class BarBroker:
+    """
+    In-process fan-out: one bounded queue per subscriber, grouped by issuer.
+    A subscriber that stops reading loses its oldest events instead of
+    blocking the publisher.
+    """
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, issuer):
+        subscription = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subscribers.setdefault(issuer, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, issuer, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(issuer, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                self._subscribers.pop(issuer, None)
+
+    def active_issuers(self):
+        with self._lock:
+            return list(self._subscribers)
+
+    def publish(self, issuer, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(issuer, ()))
+        for subscription in subscribers:
+            while True:
+                try:
+                    subscription.put_nowait(event)
+                    break
+                except queue.Full:
+                    try:
+                        subscription.get_nowait()
+                    except queue.Empty:
+                        pass
+
+
+class UnknownIssuerError(LookupError):
+    """
+    The issuer code is not in the database.
+    """
+
+
+def is_known_issuer(issuer):
+    return issuer in stock_model.get_issuer_codes()
+
+
+class LiveIssuer:
+    """
+    Indicator state for one issuer, seeded by replaying its stored history
+    once and then advanced one bar at a time.
+    """
+
+    def __init__(self, issuer):
+        self.issuer = issuer
+        self.lock = threading.Lock()
+        self.state = IndicatorState()
+        self.last_date = None
+        self.last_close = None
+
+        df = stock_model.get_issuer_data_for_graph(issuer)
+        df['Датум'] = pd.to_datetime(df['Датум'], format='%m/%d/%Y', errors='coerce')
+        df = df.dropna(subset=['Датум']).sort_values('Датум')
+        if len(df):
+            self.last_date = df['Датум'].iloc[-1]
+            self.last_close = parse_mk_number(df['Цена_на_последна_трансакција'].iloc[-1])
+
+        prices = df[['Мак_', 'Мин_', 'Цена_на_последна_трансакција']].apply(lambda column: column.map(parse_mk_number))
+        for high, low, close in prices.dropna().itertuples(index=False):
+            self.state.update(high, low, close)
+
+
+broker = BarBroker()
+
+_live_issuers = {}
+_live_version = None
+_live_lock = threading.Lock()
+
+
+def get_live_issuer(issuer):
+    """
+    Return the issuer's live state, re-seeding every issuer when the database
+    was changed by anything other than `ingest_bar`. Raises
+    UnknownIssuerError for codes that aren't in the database.
+    """
+    global _live_version
+    version = stock_model.get_data_version()
+    with _live_lock:
+        if version != _live_version:
+            _live_issuers.clear()
+            _live_version = version
+        if issuer not in _live_issuers:
+            if not is_known_issuer(issuer):
+                raise UnknownIssuerError(f"Unknown issuer: {issuer}")
+            _live_issuers[issuer] = LiveIssuer(issuer)
+        return _live_issuers[issuer]
+
+
+def _insert_bar(issuer, date, bar, table="stock_data"):
+    """
+    Append a bar to stock_data in the scraper's formats (M/D/YYYY, '1.234,56').
+    """
+    previous = bar.get('previous_close')
+    pct_change = (bar['close'] / previous - 1) * 100 if previous else 0.0
+    turnover = bar['average'] * bar['quantity']
+    row = (
+        issuer, f"{date.month}/{date.day}/{date.year}",
+        format_mk_number(bar['close']), format_mk_number(bar['high']), format_mk_number(bar['low']),
+        format_mk_number(bar['average']), format_mk_number(pct_change), format_mk_number(turnover),
+        float(bar['quantity']), format_mk_number(turnover),
+    )
+    conn = sqlite3.connect(stock_model.DB_NAME)
+    with sql_timer('insert_bar'):
+        conn.execute(f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+        conn.commit()
+    conn.close()
+
+
+def ingest_bar(issuer, bar, persist=False):
+    """
+    Add one daily bar for `issuer` and push it to the issuer's subscribers.
+
+    `bar` holds 'date' and numeric 'close', 'high', 'low' and optionally
+    'average' and 'quantity'. The date must be after the issuer's last bar.
+    With `persist` the bar is also appended to stock_data; otherwise it only
+    lives in memory until the process restarts. Returns the published event.
+    """
+    global _live_version
+    live = get_live_issuer(issuer)
+    date = pd.Timestamp(bar['date']).normalize()
+    bar = {
+        'close': float(bar['close']),
+        'high': float(bar.get('high', bar['close'])),
+        'low': float(bar.get('low', bar['close'])),
+        'average': float(bar.get('average', bar['close'])),
+        'quantity': float(bar.get('quantity', 0)),
+    }
+    if not bar['low'] <= bar['close'] <= bar['high']:
+        raise ValueError("close must be between low and high")
+
+    with live.lock:
+        if live.last_date is not None and date <= live.last_date:
+            raise ValueError(f"Bar date {date.date()} is not after the last bar ({live.last_date.date()})")
+        bar['previous_close'] = live.last_close
+
+        if persist:
+            _insert_bar(issuer, date, bar)
+            # Our own write: the cached live state is still current
+            with _live_lock:
+                _live_version = stock_model.get_data_version()
+
+        # Round-trip through the stored format so the point matches the chart after a reload
+        close, high, low = (parse_mk_number(format_mk_number(bar[key])) for key in ('close', 'high', 'low'))
+
+        indicators, signals = live.state.update(high, low, close)
+        live.last_date = date
+        live.last_close = bar['close']
+
+    event = {
+        'issuer': issuer,
+        'date': date.strftime('%Y-%m-%d'),
+        'close': close,
+        'high': high,
+        'low': low,
+        'indicators': indicators,
+        'signals': signals,
+    }
+    broker.publish(issuer, event)
+    return event
+
+
+def format_sse(event, name='bar'):
+    """
+    Encode an event for a text/event-stream response.
+    """
+    return f"event: {name}\ndata: {json.dumps(event)}\n\n"
+
+
+class SimulatedFeed(threading.Thread):
+    """
+    Local tick feed for testing: every `interval` seconds, each issuer with
+    open streams (or each of `issuers`, if given) gets a new daily bar from a
+    random walk that continues its last close.
+    """
+
+    def __init__(self, interval=2.0, issuers=None, persist=False, volatility=0.02, seed=None):
+        super().__init__(daemon=True, name='simulated-feed')
+        self.interval = interval
+        self.issuers = issuers
+        self.persist = persist
+        self.volatility = volatility
+        self._rng = random.Random(seed)
+        self._stopped = threading.Event()
+
+    def next_bar(self, live):
+        previous = live.last_close or 100.0
+        close = round(previous * np.exp(self._rng.gauss(0, self.volatility)), 2)
+        spread = abs(self._rng.gauss(0, self.volatility / 2))
+        high = round(max(previous, close) * (1 + spread), 2)
+        low = round(min(previous, close) * (1 - spread), 2)
+        date = (live.last_date or pd.Timestamp.today().normalize()) + pd.offsets.BDay(1)
+        return {
+            'date': date, 'close': close, 'high': high, 'low': low,
+            'average': round((high + low + close) / 3, 2),
+            'quantity': self._rng.randint(1, 2000),
+        }
+
+    def tick(self):
+        for issuer in self.issuers or broker.active_issuers():
+            try:
+                bar = self.next_bar(get_live_issuer(issuer))
+                ingest_bar(issuer, bar, persist=self.persist)
+            except Exception:
+                logger.exception("Simulated bar for %s failed", issuer)
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.tick()
+
+    def stop(self):
+        self._stopped.set()
+
+
+_feed = None
+_feed_lock = threading.Lock()
+
+
+def start_simulated_feed():
+    """
+    Start the simulated feed once per process if SIMULATED_FEED=1.
+    Configured by SIMULATED_FEED_INTERVAL (seconds), SIMULATED_FEED_ISSUERS
+    (comma-separated; default: issuers with open streams) and
+    SIMULATED_FEED_PERSIST=1 to write the bars to the database.
+    """
+    global _feed
+    if os.environ.get('SIMULATED_FEED') != '1':
+        return None
+    with _feed_lock:
+        if _feed is None:
+            issuers = [code for code in os.environ.get('SIMULATED_FEED_ISSUERS', '').split(',') if code]
+            _feed = SimulatedFeed(
+                interval=float(os.environ.get('SIMULATED_FEED_INTERVAL', '2')),
+                issuers=issuers or None,
+                persist=os.environ.get('SIMULATED_FEED_PERSIST') == '1',
+            )
+            _feed.start()
+        return _feed
@@ -0,0 +1,222 @@
+# models/market_analytics.py
+
+"""
+Market-wide aggregations (top movers, turnover and volume leaders, rolling
+volatility) run in DuckDB over a typed, columnar copy of `stock_data`.
+
+The SQLite table stores dates as M/D/YYYY text and numbers as Macedonian
+formatted text, so it is loaded once per data version, parsed in DuckDB
+and materialized as an in-memory columnar table. Queries then scan only the
+columns they need instead of building a dict per row.
+
+Note: the scraped column names are shifted relative to their contents.
+`Промет_во_БЕСТ_во_денари` holds the daily % change, `Вкупен_промет_во_денари`
+the turnover in BEST and `Промет_во_БЕСТ_во_денари_друга` the total turnover;
+the typed table uses names that match the contents. `Количина` was stored
+as REAL, so thousands separators became decimal points (1.393 for 1393);
+see `TYPED_MARKET_SQL`.
+"""
+
+import sqlite3
+import threading
+
+import duckdb
+import pandas as pd
+
+from common.instrumentation import record_cache, sql_timer
+from models import stock_model
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def mk_number_sql(column):
+    """
+    DuckDB expression parsing a column mixing Macedonian-formatted text
+    ('1.234,56') and plain numbers (values SQLite stored as REAL, e.g. '757.0').
+    """
+    return (f"TRY_CAST(CASE WHEN contains({column}, ',') "
+            f"THEN replace(replace({column}, '.', ''), ',', '.') ELSE {column} END AS DOUBLE)")
+
+
+# Raw columns are read as text and typed inside DuckDB, which is much
+# faster than parsing them with pandas' string methods
+TYPED_MARKET_SQL = f"""
+    WITH parsed AS (
+        SELECT Код_на_издавач AS issuer,
+               CAST(strptime(Датум, '%m/%d/%Y') AS DATE) AS date,
+               {mk_number_sql('Цена_на_последна_трансакција')} AS close,
+               {mk_number_sql('Мак_')} AS high,
+               {mk_number_sql('Мин_')} AS low,
+               {mk_number_sql('Просечна_цена')} AS average,
+               {mk_number_sql('Промет_во_БЕСТ_во_денари')} AS pct_change,
+               {mk_number_sql('Вкупен_промет_во_денари')} AS best_turnover,
+               TRY_CAST(Количина AS DOUBLE) AS quantity,
+               {mk_number_sql('Промет_во_БЕСТ_во_денари_друга')} AS total_turnover
+        FROM raw_market
+    )
+    SELECT * REPLACE (
+        -- A thousands separator read as a decimal point (1.393 for 1393):
+        -- keep whichever of q and q * 1000 is closer to turnover / average price
+        CASE WHEN abs(quantity * 1000 - best_turnover / average) < abs(quantity - best_turnover / average)
+             THEN quantity * 1000 ELSE quantity END AS quantity
+    )
+    FROM parsed
+    ORDER BY issuer, date
+"""
+
+
+def load_market_frame(table="stock_data"):
+    """
+    Read the whole table as text, one column per field.
+    """
+    conn = sqlite3.connect(stock_model.DB_NAME)
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    query = "SELECT " + ", ".join(f"CAST({column} AS TEXT) AS {column}" for column in columns) + f" FROM {table}"
+    with sql_timer('load_market_frame'):
+        raw = pd.read_sql_query(query, conn)
+    conn.close()
+    return raw
+
+
+class MarketAnalytics:
+    """
+    Columnar query engine over one snapshot of the market data.
+    """
+
+    def __init__(self, raw):
+        self._conn = duckdb.connect(':memory:')
+        self._conn.register('raw_market', raw)
+        self._conn.execute(f"CREATE TABLE market AS {TYPED_MARKET_SQL}")
+        self._conn.unregister('raw_market')
+        self.latest_date = pd.Timestamp(self._conn.execute("SELECT MAX(date) FROM market").fetchone()[0])
+
+    def _query(self, sql, params=()):
+        # A cursor per query: DuckDB connections must not be shared across threads
+        cursor = self._conn.cursor()
+        try:
+            result = cursor.execute(sql, params).fetchdf()
+        finally:
+            cursor.close()
+        # NaN isn't valid JSON
+        result = result.astype(object).where(result.notna(), None)
+        return result.to_dict(orient='records')
+
+    def _period_start(self, days):
+        return (self.latest_date - pd.Timedelta(days=days)).date()
+
+    def top_movers(self, date=None, limit=10):
+        """
+        Biggest gainers and losers by the exchange-reported % change on `date`
+        (default: the latest trading day in the data).
+        """
+        date = pd.Timestamp(date) if date else self.latest_date
+        sql = f"""
+            SELECT issuer, close, pct_change, quantity, best_turnover
+            FROM market
+            WHERE date = ? AND pct_change IS NOT NULL
+            ORDER BY pct_change {{order}}
+            LIMIT ?
+        """
+        return {
+            'date': date.strftime('%Y-%m-%d'),
+            'gainers': self._query(sql.format(order='DESC'), [date.date(), limit]),
+            'losers': self._query(sql.format(order='ASC'), [date.date(), limit]),
+        }
+
+    def turnover_leaders(self, days=30, limit=10):
+        """
+        Issuers ranked by turnover over the last `days` calendar days.
+        """
+        return self._query("""
+            SELECT issuer,
+                   SUM(best_turnover) AS best_turnover,
+                   SUM(total_turnover) AS total_turnover,
+                   COUNT(*) AS trading_days
+            FROM market
+            WHERE date > ?
+            GROUP BY issuer
+            ORDER BY total_turnover DESC NULLS LAST
+            LIMIT ?
+        """, [self._period_start(days), limit])
+
+    def volume_leaders(self, days=30, limit=10):
+        """
+        Issuers ranked by traded quantity over the last `days` calendar days.
+        """
+        return self._query("""
+            SELECT issuer, SUM(quantity) AS quantity, COUNT(*) AS trading_days
+            FROM market
+            WHERE date > ?
+            GROUP BY issuer
+            ORDER BY quantity DESC NULLS LAST
+            LIMIT ?
+        """, [self._period_start(days), limit])
+
+    def volatility(self, window=20, limit=10, active_days=30):
+        """
+        Annualized volatility of daily log returns over each issuer's last
+        `window` trading days, most volatile first. Issuers that haven't
+        traded in the last `active_days` calendar days are left out.
+        """
+        return self._query(f"""
+            WITH returns AS (
+                SELECT issuer, date,
+                       LN(close / LAG(close) OVER (PARTITION BY issuer ORDER BY date)) AS log_return,
+                       ROW_NUMBER() OVER (PARTITION BY issuer ORDER BY date DESC) AS recency
+                FROM market
+                WHERE close > 0
+            )
+            SELECT issuer,
+                   STDDEV_SAMP(log_return) * SQRT({TRADING_DAYS_PER_YEAR}) AS volatility,
+                   COUNT(log_return) AS observations,
+                   strftime(MAX(date), '%Y-%m-%d') AS last_date
+            FROM returns
+            WHERE recency <= ?
+            GROUP BY issuer
+            HAVING COUNT(log_return) = ? AND MAX(date) > ?
+            ORDER BY volatility DESC NULLS LAST
+            LIMIT ?
+        """, [window, window, self._period_start(active_days), limit])
+
+    def close_prices(self):
+        """
+        Every positive daily close as a DataFrame with issuer, date and close.
+        """
+        cursor = self._conn.cursor()
+        try:
+            return cursor.execute("SELECT issuer, date, close FROM market WHERE close > 0").fetchdf()
+        finally:
+            cursor.close()
+
+    def export_parquet(self, directory):
+        """
+        Write the typed table as Parquet files partitioned by issuer and year.
+        """
+        cursor = self._conn.cursor()
+        try:
+            cursor.execute(f"""
+                COPY (SELECT *, YEAR(date) AS year FROM market)
+                TO '{directory}' (FORMAT PARQUET, PARTITION_BY (issuer, year), OVERWRITE_OR_IGNORE)
+            """)
+        finally:
+            cursor.close()
+
+
+_engine = None
+_engine_version = None
+_engine_lock = threading.Lock()
+
+
+def get_market_analytics():
+    """
+    Return the analytics engine, reloading it only when the database has changed.
+    """
+    global _engine, _engine_version
+    version = stock_model.get_data_version()
+    with _engine_lock:
+        hit = _engine is not None and _engine_version == version
+        record_cache('market_analytics', hit)
+        if not hit:
+            _engine = MarketAnalytics(load_market_frame())
+            _engine_version = version
+        return _engine
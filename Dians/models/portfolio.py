@@ -0,0 +1,277 @@
+# models/portfolio.py
+
+"""
+Cross-issuer analytics over a date-aligned price panel: correlation
+matrices, rolling betas against an equal-weighted market index and
+portfolio volatility.
+
+The panel is a float32 matrix with one row per market date (any issuer
+traded) and one column per issuer, built from the typed table in
+`models.market_analytics`. Issuers don't trade every day, so a cell is NaN
+when the issuer didn't trade, and a return is only defined on the days the
+issuer traded. It is measured from its previous trade, so a return spanning
+a gap counts on the day trading resumes. Statistics between two issuers use
+the dates on which both have a return ("pairwise complete"), computed for
+all pairs at once with masked matrix products. With frequency='W' prices
+are first resampled to the last close of each week, which lines up thinly
+traded issuers better.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from common.instrumentation import compute_timer, record_cache
+from models import stock_model
+from models.market_analytics import get_market_analytics
+
+PERIODS_PER_YEAR = {'D': 252, 'W': 52}
+
+
+def _masked(returns):
+    """
+    Split a returns matrix into float64 values with NaN replaced by 0 and
+    the float64 mask of valid cells.
+    """
+    mask = ~np.isnan(returns)
+    return np.where(mask, returns, 0).astype(np.float64), mask.astype(np.float64)
+
+
+def pairwise_covariance(returns, min_periods=20):
+    """
+    Sample covariance and correlation of every pair of columns over the rows
+    where both are present. Returns (covariance, correlation, observations);
+    pairs with fewer than `min_periods` common rows are NaN.
+    """
+    values, mask = _masked(returns)
+    n = mask.T @ mask
+    sums = values.T @ mask          # sums[i, j]: sum of column i where j is present too
+    squares = (values ** 2).T @ mask
+    products = values.T @ values
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centered_products = products - sums * sums.T / n
+        covariance = centered_products / (n - 1)
+        variance_i = squares - sums ** 2 / n
+        correlation = centered_products / np.sqrt(variance_i * variance_i.T)
+
+    too_few = n < max(min_periods, 2)
+    covariance[too_few] = np.nan
+    correlation[too_few] = np.nan
+    # Exactly 1 on the diagonal, except for columns without variance
+    np.fill_diagonal(correlation, np.where(np.isnan(np.diag(correlation)), np.nan, 1.0))
+    return covariance, np.clip(correlation, -1, 1), n.astype(np.int64)
+
+
+def rolling_betas(returns, market, window=60, min_periods=20):
+    """
+    Beta of every column against `market` over a trailing window of `window`
+    rows, using the rows where the column is present. Computed for all
+    columns and windows at once from cumulative sums.
+    """
+    values, mask = _masked(returns)
+    market = np.nan_to_num(market.astype(np.float64))[:, None]
+
+    def window_sums(x):
+        total = np.cumsum(x, axis=0)
+        total[window:] = total[window:] - total[:-window].copy()
+        return total
+
+    n = window_sums(mask)
+    sum_x = window_sums(values)
+    sum_m = window_sums(mask * market)
+    sum_mm = window_sums(mask * market ** 2)
+    sum_xm = window_sums(values * market)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        betas = (sum_xm - sum_x * sum_m / n) / (sum_mm - sum_m ** 2 / n)
+    betas[n < max(min_periods, 2)] = np.nan
+    return betas
+
+
+class PricePanel:
+    """
+    Close prices of every issuer on every market date, as a float32 matrix.
+    """
+
+    def __init__(self, dates, issuers, prices):
+        self.dates = dates
+        self.issuers = issuers
+        self.prices = prices
+        self._columns = {issuer: n for n, issuer in enumerate(issuers)}
+        self._returns = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_market(cls, market):
+        frame = market.close_prices()
+        issuer_codes, columns = np.unique(frame['issuer'].to_numpy(), return_inverse=True)
+        dates, rows = np.unique(frame['date'].to_numpy(), return_inverse=True)
+        prices = np.full((len(dates), len(issuer_codes)), np.nan, dtype=np.float32)
+        prices[rows, columns] = frame['close'].to_numpy(dtype=np.float32)
+        return cls(pd.DatetimeIndex(dates), [str(code) for code in issuer_codes], prices)
+
+    def columns(self, issuers=None):
+        """
+        Column indices for `issuers` (all issuers when None). Raises
+        ValueError for unknown codes.
+        """
+        if not issuers:
+            return np.arange(len(self.issuers))
+        unknown = [issuer for issuer in issuers if issuer not in self._columns]
+        if unknown:
+            raise ValueError(f"Unknown issuers: {', '.join(unknown)}")
+        return np.array([self._columns[issuer] for issuer in issuers])
+
+    def most_traded(self, limit=15):
+        """
+        The `limit` issuers with the most trading days.
+        """
+        counts = np.sum(~np.isnan(self.prices), axis=0)
+        return [self.issuers[column] for column in np.argsort(-counts, kind='stable')[:limit]]
+
+    def returns(self, frequency='D'):
+        """
+        (dates, float32 log returns) for every issuer, cached per frequency.
+        A return is NaN where the issuer didn't trade in that period.
+        """
+        if frequency not in PERIODS_PER_YEAR:
+            raise ValueError(f"frequency must be one of {', '.join(PERIODS_PER_YEAR)}")
+        with self._lock:
+            if frequency not in self._returns:
+                self._returns[frequency] = self._log_returns(frequency)
+            return self._returns[frequency]
+
+    def _log_returns(self, frequency):
+        dates, prices = self.dates, self.prices
+        if frequency == 'W':
+            weekly = pd.DataFrame(prices, index=dates).resample('W-FRI').last()
+            dates, prices = weekly.index, weekly.to_numpy(dtype=np.float32)
+
+        # Log returns from each issuer's previous traded price
+        log_prices = np.log(np.where(prices > 0, prices, np.nan))
+        previous = pd.DataFrame(log_prices).ffill().shift(1).to_numpy()
+        returns = (log_prices - previous).astype(np.float32)
+        return dates, returns
+
+
+class PortfolioAnalytics:
+    """
+    Correlation, beta and volatility queries over one snapshot of the data.
+    """
+
+    def __init__(self, panel):
+        self.panel = panel
+        self._covariances = {}
+        self._lock = threading.Lock()
+
+    def _covariance(self, frequency, min_periods):
+        # The full matrix is cheap and any issuer subset is a slice of it
+        key = (frequency, min_periods)
+        with self._lock:
+            if key not in self._covariances:
+                _, returns = self.panel.returns(frequency)
+                with compute_timer('portfolio_covariance'):
+                    self._covariances[key] = pairwise_covariance(returns, min_periods)
+            return self._covariances[key]
+
+    def correlation(self, issuers=None, frequency='D', min_periods=20):
+        """
+        Pairwise correlation of the issuers' returns, with the number of
+        common observations behind each entry.
+        """
+        columns = self.panel.columns(issuers)
+        _, correlation, observations = self._covariance(frequency, min_periods)
+        selected = np.ix_(columns, columns)
+        return {
+            'issuers': [self.panel.issuers[column] for column in columns],
+            'frequency': frequency,
+            'correlation': _to_json(correlation[selected]),
+            'observations': observations[selected].tolist(),
+        }
+
+    def betas(self, issuers=None, window=60, frequency='D', min_periods=20):
+        """
+        Rolling betas against the equal-weighted index of all issuers
+        (the mean return of the issuers that traded in each period).
+        """
+        dates, returns = self.panel.returns(frequency)
+        with np.errstate(invalid='ignore'), compute_timer('portfolio_betas'):
+            counts = np.sum(~np.isnan(returns), axis=1)
+            market = np.where(counts > 0, np.nansum(returns, axis=1) / np.maximum(counts, 1), np.nan)
+            columns = self.panel.columns(issuers)
+            betas = rolling_betas(returns[:, columns], market, window, min_periods)
+
+        # Drop the leading periods where no issuer has a beta yet
+        defined = np.flatnonzero(~np.isnan(betas).all(axis=1))
+        start = defined[0] if len(defined) else len(dates)
+        return {
+            'window': window,
+            'frequency': frequency,
+            'dates': dates[start:].strftime('%Y-%m-%d').tolist(),
+            'betas': {self.panel.issuers[column]: _to_json(betas[start:, n]) for n, column in enumerate(columns)},
+        }
+
+    def volatility(self, issuers, weights=None, frequency='D', min_periods=20):
+        """
+        Annualized volatility sqrt(w' S w) of a portfolio of `issuers`, where S
+        is the pairwise covariance matrix of their returns. `weights` default
+        to equal and are normalized to sum to 1. Also returns each issuer's
+        share of the portfolio variance.
+        """
+        columns = self.panel.columns(issuers)
+        if len(columns) == 0:
+            raise ValueError("A portfolio needs at least one issuer")
+        if weights is None:
+            weights = np.full(len(columns), 1 / len(columns))
+        else:
+            weights = np.asarray(weights, dtype=np.float64)
+            if weights.shape != (len(columns),) or not weights.sum():
+                raise ValueError("Give one weight per issuer, not summing to zero")
+            weights = weights / weights.sum()
+
+        covariance, _, _ = self._covariance(frequency, min_periods)
+        covariance = covariance[np.ix_(columns, columns)] * PERIODS_PER_YEAR[frequency]
+        if np.isnan(covariance).any():
+            raise ValueError("Some issuers have too few common observations; lower min_periods or pick other issuers")
+
+        marginal = covariance @ weights
+        # A pairwise estimate isn't guaranteed to be positive semi-definite
+        variance = max(float(weights @ marginal), 0.0)
+        contributions = weights * marginal / variance if variance else np.zeros_like(weights)
+        return {
+            'issuers': [self.panel.issuers[column] for column in columns],
+            'frequency': frequency,
+            'weights': weights.tolist(),
+            'volatility': variance ** 0.5,
+            'risk_contributions': contributions.tolist(),
+        }
+
+
+def _to_json(values):
+    """
+    Floats with NaN as None, which JSON can represent.
+    """
+    return np.where(np.isnan(values), None, np.round(values.astype(np.float64), 6)).tolist()
+
+
+_analytics = None
+_analytics_version = None
+_analytics_lock = threading.Lock()
+
+
+def get_portfolio_analytics():
+    """
+    Return the portfolio analytics, rebuilding the panel only when the
+    database has changed.
+    """
+    global _analytics, _analytics_version
+    version = stock_model.get_data_version()
+    with _analytics_lock:
+        hit = _analytics is not None and _analytics_version == version
+        record_cache('portfolio_analytics', hit)
+        if not hit:
+            _analytics = PortfolioAnalytics(PricePanel.from_market(get_market_analytics()))
+            _analytics_version = version
+        return _analytics
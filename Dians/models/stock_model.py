@@ -1,11 +1,79 @@
 # models/stock_model.py
 
+import logging
+import os
 import sqlite3
 import pandas as pd
 import numpy as np
 
+from common.instrumentation import sql_timer
+
+logger = logging.getLogger(__name__)
+
 DB_NAME = 'stock_data.db'
 
+
+def ensure_indexes(table="stock_data"):
+    """
+    Create the indexes the queries below rely on, if they are missing.
+    Without an index on Код_на_издавач every per-issuer lookup is a full
+    table scan. Only the first startup against a database writes to it;
+    after that this just reads the schema. A read-only database without
+    the index is logged and left alone.
+    """
+    index = f"idx_{table}_issuer"
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (index,)
+        ).fetchone()
+        if not exists:
+            conn.execute(f"CREATE INDEX {index} ON {table} (Код_на_издавач)")
+            conn.commit()
+    except sqlite3.OperationalError as e:
+        logger.warning("Could not create index %s, per-issuer queries will scan %s: %s", index, table, e)
+    finally:
+        conn.close()
+
+
+def check_database(table="stock_data"):
+    """
+    Raise if the database can't be opened or doesn't have the stock table.
+    Used by /ready.
+    """
+    # mode=ro so a missing file is an error instead of a new empty database
+    conn = sqlite3.connect(f"file:{DB_NAME}?mode=ro", uri=True)
+    try:
+        conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchall()
+    finally:
+        conn.close()
+
+
+def get_data_version():
+    """
+    Cheap token that changes whenever the database file is written.
+    Used to invalidate caches derived from the data.
+    """
+    stat = os.stat(DB_NAME)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_issuer_codes(table="stock_data"):
+    """
+    Return every distinct Код_на_издавач, sorted.
+    """
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+
+    query = f"SELECT DISTINCT Код_на_издавач FROM {table} ORDER BY Код_на_издавач"
+    with sql_timer('get_issuer_codes'):
+        cursor.execute(query)
+        codes = [row[0] for row in cursor.fetchall()]
+
+    conn.close()
+    return codes
+
+
 def get_stock_data(page=1, table="stock_data", limit=10):
     """
     Fetch distinct issuers (Код_на_издавач) from the database
@@ -20,8 +88,9 @@ def get_stock_data(page=1, table="stock_data", limit=10):
         FROM {table}
         LIMIT {limit} OFFSET {offset}
     """
-    cursor.execute(query)
-    rows = cursor.fetchall()
+    with sql_timer('get_stock_data'):
+        cursor.execute(query)
+        rows = cursor.fetchall()
 
     # Map each row into a dict with Код_на_издавач
     stock_data = [{'Код_на_издавач': row[0]} for row in rows]
@@ -33,35 +102,67 @@ def get_stock_data(page=1, table="stock_data", limit=10):
 def get_all_stock_data(table="stock_data"):
     """
     Fetch all rows from the database table.
+    Loads the whole table into memory; use iter_stock_data for exports.
     """
     conn = sqlite3.connect(DB_NAME)
     cursor = conn.cursor()
 
     query = f"SELECT * FROM {table}"
-    cursor.execute(query)
-    rows = cursor.fetchall()
+    with sql_timer('get_all_stock_data'):
+        cursor.execute(query)
+        rows = cursor.fetchall()
 
-    # Map rows to a list of dictionaries
-    stock_data = [
-        {
-            'Код_на_издавач': row[0],
-            'Датум': row[1],
-            'Цена_на_последна_трансакција': row[2],
-            'Макс': row[3],
-            'Мин': row[4],
-            'Просечна_цена': row[5],
-            'Промет_во_БЕСТ_во_денари': row[6],
-            'Купен_промет_во_денари': row[7],
-            'Количина': row[8],
-            'Промет_во_Бест_во_денари_друга': row[9]
-        }
-        for row in rows
-    ]
+    # Key each row by the schema's own column names
+    columns = [column[0] for column in cursor.description]
+    stock_data = [dict(zip(columns, row)) for row in rows]
 
     conn.close()
     return stock_data
 
 
+# Датум is stored as unpadded M/D/YYYY text, which doesn't sort by date.
+# This rebuilds it as YYYY-MM-DD inside SQLite so ranges can be filtered there.
+_ISO_DATE_SQL = (
+    "printf('%s-%02d-%02d', substr(Датум, -4), "
+    "CAST(substr(Датум, 1, instr(Датум, '/') - 1) AS INTEGER), "
+    "CAST(substr(Датум, instr(Датум, '/') + 1, 2) AS INTEGER))"
+)
+
+
+def iter_stock_data(issuer=None, start_date=None, end_date=None, batch_size=5000, table="stock_data"):
+    """
+    Stream rows matching the optional issuer and ISO date range (inclusive).
+    The first item yielded is the list of column names, followed by lists of
+    up to `batch_size` row tuples, so memory stays bounded by one batch
+    however large the table is.
+    """
+    query = f"SELECT * FROM {table} WHERE 1=1"
+    params = []
+    if issuer:
+        query += " AND Код_на_издавач = ?"
+        params.append(issuer)
+    if start_date:
+        query += f" AND {_ISO_DATE_SQL} >= ?"
+        params.append(start_date)
+    if end_date:
+        query += f" AND {_ISO_DATE_SQL} <= ?"
+        params.append(end_date)
+
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        cursor = conn.cursor()
+        with sql_timer('iter_stock_data'):
+            cursor.execute(query, params)
+        yield [column[0] for column in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
 def get_total_issuers_count(table="stock_data"):
     """
     Return the total count of unique Код_на_издавач in the table.
@@ -70,9 +171,9 @@ def get_total_issuers_count(table="stock_data"):
     cursor = conn.cursor()
 
     query = f"SELECT COUNT(DISTINCT Код_на_издавач) FROM {table}"
-    cursor.execute(query)
-
-    count = cursor.fetchone()[0]
+    with sql_timer('get_total_issuers_count'):
+        cursor.execute(query)
+        count = cursor.fetchone()[0]
     conn.close()
     return count
 
@@ -99,8 +200,9 @@ def get_filtered_data_for_analysis(issuer='', page=1, limit=10, table="stock_dat
     if issuer:
         count_query += " AND Код_на_издавач = ?"
 
-    cursor.execute(count_query, [issuer] if issuer else [])
-    total_rows = cursor.fetchone()[0]
+    with sql_timer('count_filtered_data'):
+        cursor.execute(count_query, [issuer] if issuer else [])
+        total_rows = cursor.fetchone()[0]
 
     total_pages = (total_rows + limit - 1) // limit
 
@@ -108,8 +210,9 @@ def get_filtered_data_for_analysis(issuer='', page=1, limit=10, table="stock_dat
     query += " LIMIT ? OFFSET ?"
     params.extend([limit, (page - 1) * limit])
 
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
+    with sql_timer('get_filtered_data_for_analysis'):
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
 
     # Format into a list of dictionaries
     stock_data = [
@@ -141,8 +244,9 @@ def get_issuer_details(issuer_code, table="stock_data"):
     cursor = conn.cursor()
 
     query = f"SELECT * FROM {table} WHERE Код_на_издавач = ?"
-    cursor.execute(query, (issuer_code,))
-    rows = cursor.fetchall()
+    with sql_timer('get_issuer_details'):
+        cursor.execute(query, (issuer_code,))
+        rows = cursor.fetchall()
 
     stock_data = [
         {
@@ -176,7 +280,8 @@ def get_issuer_data_for_graph(issuer_code, table="stock_data"):
         WHERE Код_на_издавач = ?
         ORDER BY Датум ASC
     """
-    df = pd.read_sql_query(query, conn, params=(issuer_code,))
+    with sql_timer('get_issuer_data_for_graph'):
+        df = pd.read_sql_query(query, conn, params=(issuer_code,))
     conn.close()
 
     return df
@@ -194,7 +299,8 @@ def fetch_data(issuer_code, table="stock_data"):
         WHERE Код_на_издавач = ?
         ORDER BY Датум
     """
-    df = pd.read_sql_query(query, conn, params=(issuer_code,))
+    with sql_timer('fetch_data'):
+        df = pd.read_sql_query(query, conn, params=(issuer_code,))
     conn.close()
 
     # Convert date column to datetime
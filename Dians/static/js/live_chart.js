@@ -0,0 +1,49 @@
+// Appends bars pushed by the issuer's event stream to the technical analysis
+// chart in place. Traces are found by name, so only the ones the selected
+// strategy drew are extended.
+(function () {
+    const script = document.currentScript;
+    const graph = document.getElementById(script.dataset.graph);
+    const strategy = script.dataset.strategy;
+    if (!graph || !window.EventSource || !window.Plotly) {
+        return;
+    }
+
+    const INDICATORS = ["SMA10", "SMA50", "EMA10", "EMA50", "RSI", "MACD", "ADX", "CCI"];
+
+    function traceIndex(name) {
+        return graph.data.findIndex(trace => trace.name === name);
+    }
+
+    const source = new EventSource(script.dataset.stream);
+    source.addEventListener("bar", function (message) {
+        const bar = JSON.parse(message.data);
+        const update = {x: [], y: []};
+        const indices = [];
+
+        function add(name, value) {
+            const index = traceIndex(name);
+            if (index === -1 || value === null || value === undefined) {
+                return;
+            }
+            update.x.push([bar.date]);
+            update.y.push([value]);
+            indices.push(index);
+        }
+
+        add("Price", bar.close);
+        INDICATORS.forEach(name => add(name, bar.indicators[name]));
+        const signal = bar.signals[strategy];
+        if (signal === "Buy") {
+            add("Buy Signal", bar.close);
+        } else if (signal === "Sell") {
+            add("Sell Signal", bar.close);
+        }
+
+        if (indices.length) {
+            Plotly.extendTraces(graph, update, indices);
+        }
+    });
+
+    window.addEventListener("beforeunload", () => source.close());
+})();
@@ -1,3 +1,50 @@
 document.addEventListener("DOMContentLoaded", () => {
+    // Issuer autocomplete for any input marked with data-issuer-autocomplete
+    document.querySelectorAll("input[data-issuer-autocomplete]").forEach((input) => {
+        const list = document.createElement("datalist");
+        list.id = `${input.id}-suggestions`;
+        input.setAttribute("list", list.id);
+        input.setAttribute("autocomplete", "off");
+        input.after(list);
 
+        let timer = null;
+        let controller = null;
+        input.addEventListener("input", () => {
+            clearTimeout(timer);
+            const query = input.value.trim();
+            if (!query) {
+                list.replaceChildren();
+                return;
+            }
+            timer = setTimeout(async () => {
+                // Drop the previous request so stale results never overwrite newer ones
+                if (controller) controller.abort();
+                controller = new AbortController();
+                try {
+                    const response = await fetch(
+                        `/api/issuers/search?q=${encodeURIComponent(query)}&limit=10`,
+                        {signal: controller.signal}
+                    );
+                    const data = await response.json();
+                    list.replaceChildren(...data.results.map((result) => {
+                        const option = document.createElement("option");
+                        option.value = result.code;
+                        return option;
+                    }));
+                } catch (error) {
+                    if (error.name !== "AbortError") console.error(error);
+                }
+            }, 150);
+        });
+    });
+
+    // The home page search jumps straight to the issuer's page
+    const issuerSearch = document.getElementById("issuer-search-form");
+    if (issuerSearch) {
+        issuerSearch.addEventListener("submit", (event) => {
+            event.preventDefault();
+            const code = issuerSearch.querySelector("input").value.trim().toUpperCase();
+            if (code) window.location.href = `/issuer/${encodeURIComponent(code)}`;
+        });
+    }
 });
@@ -0,0 +1,17 @@
+# benchmarks/__init__.py
+
+import os
+import sys
+
+# The services are separate apps rather than installable packages, so the
+# benchmarks import them by putting each service directory on the path.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_DIRS = {
+    'main_app': os.path.join(ROOT, 'Dians'),
+    'strategy_service': os.path.join(ROOT, 'strategy_service'),
+    'prediction_service': os.path.join(ROOT, 'prediction_service'),
+}
+
+for _path in (ROOT, *SERVICE_DIRS.values()):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
@@ -0,0 +1,64 @@
+# benchmarks/bench_market.py
+
+"""
+Market-wide turnover ranking: the row-at-a-time path (every row as a dict,
+aggregated in Python) against the columnar engine in models.market_analytics.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from benchmarks.harness import benchmark
+
+
+def _mk_number(value):
+    if isinstance(value, str):
+        value = value.replace('.', '').replace(',', '.')
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def turnover_leaders_row_at_a_time(rows, days=30, limit=10):
+    dates = [datetime.strptime(row['Датум'], '%m/%d/%Y') for row in rows]
+    since = max(dates) - timedelta(days=days)
+    totals = defaultdict(float)
+    for row, date in zip(rows, dates):
+        if date > since:
+            totals[row['Код_на_издавач']] += _mk_number(row['Промет_во_БЕСТ_во_денари_друга'])
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def _engine(ctx):
+    from models.market_analytics import MarketAnalytics, load_market_frame
+    return ctx.cached('market_engine', lambda: MarketAnalytics(load_market_frame()))
+
+
+@benchmark('market', repeat=3)
+def turnover_row_at_a_time(ctx):
+    return lambda: turnover_leaders_row_at_a_time(ctx.stock_model.get_all_stock_data())
+
+
+@benchmark('market')
+def turnover_columnar(ctx):
+    engine = _engine(ctx)
+    return engine.turnover_leaders
+
+
+@benchmark('market')
+def volatility_columnar(ctx):
+    engine = _engine(ctx)
+    return engine.volatility
+
+
+@benchmark('market')
+def top_movers_columnar(ctx):
+    engine = _engine(ctx)
+    return engine.top_movers
+
+
+@benchmark('market', repeat=3)
+def load_columnar_engine(ctx):
+    from models.market_analytics import MarketAnalytics, load_market_frame
+    return lambda: MarketAnalytics(load_market_frame())
@@ -0,0 +1,50 @@
+# benchmarks/bench_portfolio.py
+
+"""
+Cross-issuer statistics: pairwise-complete correlation with pandas
+(DataFrame.corr loops over column pairs) against the masked matrix
+products in models.portfolio.
+"""
+
+import numpy as np
+
+from benchmarks.harness import benchmark
+
+
+def _panel(ctx):
+    from models.market_analytics import MarketAnalytics, load_market_frame
+    from models.portfolio import PricePanel
+    return ctx.cached('price_panel', lambda: PricePanel.from_market(MarketAnalytics(load_market_frame())))
+
+
+def _returns(ctx):
+    return _panel(ctx).returns('D')[1]
+
+
+@benchmark('portfolio', repeat=3)
+def correlation_pandas(ctx):
+    import pandas as pd
+    frame = pd.DataFrame(_returns(ctx).astype(np.float64))
+    return lambda: frame.corr(min_periods=20)
+
+
+@benchmark('portfolio')
+def correlation_matrix(ctx):
+    from models.portfolio import pairwise_covariance
+    returns = _returns(ctx)
+    return lambda: pairwise_covariance(returns, 20)
+
+
+@benchmark('portfolio')
+def rolling_betas(ctx):
+    from models.portfolio import PortfolioAnalytics
+    analytics = PortfolioAnalytics(_panel(ctx))
+    return lambda: analytics.betas(window=60)
+
+
+@benchmark('portfolio', repeat=3)
+def build_panel(ctx):
+    from models.portfolio import PricePanel
+    from models.market_analytics import MarketAnalytics, load_market_frame
+    market = MarketAnalytics(load_market_frame())
+    return lambda: PricePanel.from_market(market).returns('D')
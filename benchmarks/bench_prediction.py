@@ -0,0 +1,44 @@
+# benchmarks/bench_prediction.py
+
+import os
+
+import numpy as np
+
+from benchmarks.harness import benchmark
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+
+def weekly_prices(ctx):
+    return ctx.cached('weekly_prices', lambda: ctx.stock_model.fetch_data(ctx.issuer))
+
+
+def trained_model(ctx):
+    from prediction.model import train_lstm
+    return ctx.cached('trained_model', lambda: train_lstm(weekly_prices(ctx)))
+
+
+# Early stopping makes training time data-dependent, hence the loose threshold
+@benchmark('prediction', repeat=1, threshold=2.0, slow=True)
+def train_lstm(ctx):
+    from prediction.model import train_lstm as train
+    df = weekly_prices(ctx)
+    return lambda: train(df)
+
+
+@benchmark('prediction', repeat=5, slow=True)
+def inference(ctx):
+    model, scaler, sequence_length = trained_model(ctx)
+    scaled = scaler.transform(weekly_prices(ctx).values.reshape(-1, 1))
+    X = np.array([scaled[i - sequence_length:i] for i in range(sequence_length, len(scaled))])
+    return lambda: model.predict(X, verbose=0)
+
+
+@benchmark('prediction', repeat=5, slow=True)
+def inference_numpy(ctx):
+    from prediction.inference import NumpyLSTM
+    model, scaler, sequence_length = trained_model(ctx)
+    scaled = scaler.transform(weekly_prices(ctx).values.reshape(-1, 1))
+    X = np.array([scaled[i - sequence_length:i] for i in range(sequence_length, len(scaled))])
+    exported = NumpyLSTM.from_keras(model, sequence_length)
+    return lambda: exported.predict(X)
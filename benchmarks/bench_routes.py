@@ -0,0 +1,65 @@
+# benchmarks/bench_routes.py
+
+from unittest import mock
+
+from benchmarks.harness import InProcessTransport, benchmark, load_service_app
+
+
+def client(ctx):
+    def build():
+        app = load_service_app('main_app').create_app()
+        return app.test_client()
+    return ctx.cached('main_client', build)
+
+
+def _get(ctx, url):
+    test_client = client(ctx)
+    transport = ctx.cached('transport', InProcessTransport)
+
+    def run():
+        with transport.patch():
+            response = test_client.get(url)
+        assert response.status_code == 200, response.status_code
+        return response
+    return run
+
+
+@benchmark('routes')
+def home(ctx):
+    return _get(ctx, '/?page=3')
+
+
+@benchmark('routes')
+def analysis(ctx):
+    return _get(ctx, '/analysis?page=20')
+
+
+@benchmark('routes')
+def analysis_filtered(ctx):
+    return _get(ctx, f'/analysis?issuer={ctx.issuer}')
+
+
+@benchmark('routes')
+def issuer_details(ctx):
+    return _get(ctx, f'/issuer/{ctx.issuer}')
+
+
+@benchmark('routes')
+def issuer_graph(ctx):
+    return _get(ctx, f'/issuer/{ctx.issuer}/graph?strategy=full')
+
+
+@benchmark('routes')
+def issuer_graph_embedded(ctx):
+    from controllers import main_controller
+    run = _get(ctx, f'/issuer/{ctx.issuer}/graph?strategy=full')
+
+    def embedded():
+        with mock.patch.object(main_controller, 'STRATEGY_MODE', 'embedded'):
+            return run()
+    return embedded
+
+
+@benchmark('routes', repeat=1, threshold=2.0, slow=True)
+def issuer_predict(ctx):
+    return _get(ctx, f'/issuer/{ctx.issuer}/predict')
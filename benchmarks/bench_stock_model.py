@@ -0,0 +1,43 @@
+# benchmarks/bench_stock_model.py
+
+from benchmarks.harness import benchmark
+
+
+@benchmark('stock_model')
+def get_stock_data(ctx):
+    return lambda: ctx.stock_model.get_stock_data(page=5, limit=10)
+
+
+@benchmark('stock_model', repeat=3)
+def get_all_stock_data(ctx):
+    return ctx.stock_model.get_all_stock_data
+
+
+@benchmark('stock_model')
+def get_total_issuers_count(ctx):
+    return ctx.stock_model.get_total_issuers_count
+
+
+@benchmark('stock_model')
+def get_filtered_data_for_analysis(ctx):
+    return lambda: ctx.stock_model.get_filtered_data_for_analysis(page=50, limit=10)
+
+
+@benchmark('stock_model')
+def get_filtered_data_for_analysis_by_issuer(ctx):
+    return lambda: ctx.stock_model.get_filtered_data_for_analysis(issuer=ctx.issuer, page=2, limit=10)
+
+
+@benchmark('stock_model')
+def get_issuer_details(ctx):
+    return lambda: ctx.stock_model.get_issuer_details(ctx.issuer)
+
+
+@benchmark('stock_model')
+def get_issuer_data_for_graph(ctx):
+    return lambda: ctx.stock_model.get_issuer_data_for_graph(ctx.issuer)
+
+
+@benchmark('stock_model')
+def fetch_data(ctx):
+    return lambda: ctx.stock_model.fetch_data(ctx.issuer)
@@ -0,0 +1,60 @@
+# benchmarks/bench_strategies.py
+
+import pandas as pd
+
+from benchmarks.harness import BENCHMARKS, Benchmark, DEFAULT_THRESHOLD, benchmark
+from strategies.analysis_strategies import (
+    RSIOnlyStrategy,
+    MacdOnlyStrategy,
+    AdxOnlyStrategy,
+    CciOnlyStrategy,
+    FullIndicatorStrategy
+)
+
+STRATEGY_CLASSES = [RSIOnlyStrategy, MacdOnlyStrategy, AdxOnlyStrategy, CciOnlyStrategy, FullIndicatorStrategy]
+
+
+def issuer_frame(ctx):
+    """
+    The frame exactly as strategy_service builds it from the main app's payload.
+    """
+    def build():
+        records = ctx.stock_model.get_issuer_data_for_graph(ctx.issuer).reset_index().to_dict(orient='records')
+        df = pd.DataFrame(records)
+        df['Датум'] = pd.to_datetime(df['Датум'])
+        return df.sort_values('Датум')
+    return ctx.cached('issuer_frame', build)
+
+
+def _perform_analysis(strategy_class):
+    def setup(ctx):
+        frame = issuer_frame(ctx)
+        strategy = strategy_class()
+        # perform_analysis cleans columns in place, so every run gets a fresh copy
+        return lambda: strategy.perform_analysis(frame.copy())
+    return setup
+
+
+for _strategy_class in STRATEGY_CLASSES:
+    BENCHMARKS.append(Benchmark(
+        f"strategies.{_strategy_class.__name__}.perform_analysis",
+        _perform_analysis(_strategy_class),
+        repeat=10,
+        threshold=DEFAULT_THRESHOLD,
+        slow=False
+    ))
+
+
+@benchmark('strategies')
+def rule_strategy(ctx):
+    from strategies.rules import RuleStrategy
+    frame = issuer_frame(ctx)
+    strategy = RuleStrategy('RSI < 30 AND MACD > 0 AND price > SMA50', 'RSI > 70 OR price < SMA50')
+    return lambda: strategy.perform_analysis(frame.copy())
+
+
+@benchmark('strategies', repeat=1, slow=True)
+def backtest_all_strategies(ctx):
+    from strategies.backtest import load_issuer_frames, run_backtest
+    frames = load_issuer_frames(ctx.db_path)
+    return lambda: run_backtest(frames)
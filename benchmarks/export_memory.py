@@ -0,0 +1,183 @@
+# benchmarks/export_memory.py
+
+"""
+Check that the streaming exports run in bounded memory.
+
+Generates synthetic tables of increasing size (up to 10M rows by default)
+and drains each export format through `models.export.stream_export` as the
+HTTP response would. Every run happens in a fresh process, which reports
+how far its peak resident memory rose above the memory in use before the
+export started. For Parquet it also reports the peak of pyarrow's memory
+pool, which holds the Arrow buffers that tracemalloc cannot see. Both
+should be flat across sizes, set by the batch size rather than the table
+size. The script exits with status 1 if the largest table's peak exceeds
+the smallest's by more than `--tolerance` (plus `--slack-mib` for
+allocator noise).
+
+For comparison, `--include-fetchall` also measures `get_all_stock_data`
+on the sizes up to `--fetchall-max-rows`.
+
+Usage:
+    python -m benchmarks.export_memory
+    python -m benchmarks.export_memory --rows 100000 1000000 --formats csv ndjson
+"""
+
+import argparse
+import json
+import math
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+from benchmarks import ROOT
+from benchmarks.harness import DATA_DIR
+from benchmarks.synthetic_data import generate_database
+
+YEARS = 20
+# Average rows per issuer over 20 years with the generator's listing/liquidity model
+ROWS_PER_ISSUER = 2630
+
+
+def database_for(rows, data_dir=DATA_DIR):
+    """
+    Path to a synthetic database with roughly `rows` rows, generating it if needed.
+    """
+    issuers = max(1, math.ceil(rows / ROWS_PER_ISSUER))
+    path = os.path.join(data_dir, f"export-{issuers}x{YEARS}.db")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"Generating {path} ({issuers} issuers x {YEARS} years)...", flush=True)
+        generate_database(path, issuers=issuers, years=YEARS)
+    return path
+
+
+def count_rows(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT COUNT(*) FROM stock_data").fetchone()[0]
+    conn.close()
+    return rows
+
+
+def _memory_status(field):
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(f'{field}:'):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError(f"{field} is not reported by /proc/self/status")
+
+
+def reset_peak_rss():
+    """
+    Reset the peak resident memory (VmHWM) to the current RSS; Linux only.
+    """
+    with open('/proc/self/clear_refs', 'w') as clear_refs:
+        clear_refs.write('5')
+
+
+def drain(chunks):
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+    return total
+
+
+def worker(db_path, fmt, batch_size):
+    """
+    Runs in the subprocess: drain one export (or fetch the whole table for
+    fmt='fetchall') and print its memory use as JSON.
+    """
+    from models import export, stock_model
+    stock_model.DB_NAME = db_path
+
+    arrow_pool = None
+    if fmt == 'parquet':
+        import pyarrow
+        arrow_pool = pyarrow.default_memory_pool()
+
+    reset_peak_rss()
+    baseline = _memory_status('VmRSS')
+    start = time.perf_counter()
+    if fmt == 'fetchall':
+        size = len(stock_model.get_all_stock_data())
+    else:
+        size = drain(export.stream_export(fmt, batch_size=batch_size))
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'size': size,
+        'seconds': elapsed,
+        'peak_rss_growth': _memory_status('VmHWM') - baseline,
+        # The pool is only used by this export, so its lifetime peak is the export's
+        'arrow_peak': arrow_pool.max_memory() if arrow_pool is not None else None,
+    }))
+
+
+def measure(db_path, fmt, batch_size=5000):
+    """
+    Run one export in a fresh process; returns the worker's JSON report.
+    """
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.export_memory', '--worker', fmt,
+         '--db', db_path, '--batch-size', str(batch_size)],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def grew(peaks, tolerance, slack):
+    """
+    True if the last (largest table's) peak exceeds the first by more than
+    `tolerance` times plus `slack` bytes.
+    """
+    return peaks[-1] > peaks[0] * tolerance + slack
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure peak memory of the streaming exports.")
+    parser.add_argument('--rows', nargs='+', type=int, default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--formats', nargs='+', choices=['csv', 'ndjson', 'parquet'], default=['csv', 'ndjson', 'parquet'])
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--tolerance', type=float, default=1.5, help="allowed peak ratio between the largest and smallest table")
+    parser.add_argument('--slack-mib', type=float, default=8, help="allowed peak growth on top of the ratio")
+    parser.add_argument('--include-fetchall', action='store_true', help="also measure get_all_stock_data")
+    parser.add_argument('--fetchall-max-rows', type=int, default=1_000_000)
+    parser.add_argument('--worker', choices=['csv', 'ndjson', 'parquet', 'fetchall'], help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.db, args.worker, args.batch_size)
+        return
+
+    print(f"{'rows':>10} {'format':<10} {'peak RSS MiB':>13} {'Arrow MiB':>10} {'output MiB':>11} {'seconds':>8}")
+    peaks = {}
+    for target in sorted(args.rows):
+        db_path = database_for(target)
+        rows = count_rows(db_path)
+
+        formats = list(args.formats)
+        if args.include_fetchall and target <= args.fetchall_max_rows:
+            formats.append('fetchall')
+        for fmt in formats:
+            result = measure(db_path, fmt, args.batch_size)
+            arrow = f"{result['arrow_peak'] / 2**20:>10.1f}" if result['arrow_peak'] is not None else f"{'-':>10}"
+            output = f"{result['size'] / 2**20:>11.1f}" if fmt != 'fetchall' else f"{'-':>11}"
+            print(f"{rows:>10} {fmt:<10} {result['peak_rss_growth'] / 2**20:>13.1f} {arrow} {output} "
+                  f"{result['seconds']:>8.1f}", flush=True)
+            if fmt != 'fetchall':
+                peaks.setdefault((fmt, 'RSS'), []).append(result['peak_rss_growth'])
+                if result['arrow_peak'] is not None:
+                    peaks.setdefault((fmt, 'Arrow'), []).append(result['arrow_peak'])
+
+    slack = args.slack_mib * 2**20
+    failed = [f"{fmt} ({kind})" for (fmt, kind), values in peaks.items() if grew(values, args.tolerance, slack)]
+    if failed:
+        print(f"Peak memory grew with table size for: {', '.join(failed)}")
+        sys.exit(1)
+    print("Peak memory is independent of table size.")
+
+
+if __name__ == '__main__':
+    main()
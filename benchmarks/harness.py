@@ -0,0 +1,165 @@
+# benchmarks/harness.py
+
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+from unittest import mock
+
+import requests
+
+from benchmarks import SERVICE_DIRS
+from benchmarks.synthetic_data import generate_database
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '.data')
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+# Dataset sizes relative to the checked-in DB (~150 issuers, ~28k rows)
+PROFILES = {
+    'x1': {'issuers': 150, 'years': 2},
+    'x10': {'issuers': 150, 'years': 20},
+    'x100': {'issuers': 1500, 'years': 20},
+}
+
+# Compared against the best (minimum) run, which is far less noisy than the median
+DEFAULT_THRESHOLD = 1.5
+
+BENCHMARKS = []
+
+
+class Benchmark:
+    """
+    A registered benchmark. `setup(ctx)` runs untimed and returns the
+    zero-argument callable that is actually measured.
+    """
+
+    def __init__(self, name, setup, repeat, threshold, slow):
+        self.name = name
+        self.setup = setup
+        self.repeat = repeat
+        self.threshold = threshold
+        self.slow = slow
+
+
+def benchmark(group, repeat=10, threshold=DEFAULT_THRESHOLD, slow=False):
+    """
+    Register a benchmark under '<group>.<function name>'.
+    """
+    def decorator(setup):
+        BENCHMARKS.append(Benchmark(f"{group}.{setup.__name__}", setup, repeat, threshold, slow))
+        return setup
+    return decorator
+
+
+def load_service_app(service):
+    """
+    Import a service's app.py under a unique module name
+    (all three services call their entry module `app`).
+    """
+    # Benchmarks time cold paths themselves; a background warm-up would skew them
+    os.environ.setdefault('WARMUP', '0')
+    path = os.path.join(SERVICE_DIRS[service], 'app.py')
+    spec = importlib.util.spec_from_file_location(f"{service}_app", path)
+    module = importlib.util.module_from_spec(spec)
+    # Flask resolves templates relative to the module, so it must be registered
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class InProcessTransport:
+    """
+    Routes the main app's outbound requests.post calls to the strategy and
+    prediction apps' Flask test clients, so routes can be measured end to
+    end without Docker or network hops.
+    """
+
+    SERVICES = ('strategy_service', 'prediction_service')
+
+    def __init__(self):
+        self._clients = {}
+
+    def _client(self, service):
+        if service not in self._clients:
+            self._clients[service] = load_service_app(service).app.test_client()
+        return self._clients[service]
+
+    def post(self, url, json=None, headers=None, **kwargs):
+        service = next(name for name in self.SERVICES if f"//{name}:" in url)
+        path = '/' + url.split('/', 3)[3]
+        result = self._client(service).post(path, json=json, headers=headers)
+
+        response = requests.Response()
+        response.status_code = result.status_code
+        response._content = result.data
+        response.url = url
+        return response
+
+    def patch(self):
+        return mock.patch('requests.post', self.post)
+
+
+class BenchContext:
+    """
+    Shared state for one benchmark run: the synthetic database for the
+    selected profile and lazily built fixtures derived from it.
+    """
+
+    def __init__(self, profile, seed=0):
+        self.profile = profile
+        self.db_path = os.path.join(DATA_DIR, f"{profile}-{seed}.db")
+        if not os.path.exists(self.db_path):
+            os.makedirs(DATA_DIR, exist_ok=True)
+            generate_database(self.db_path, seed=seed, **PROFILES[profile])
+
+        from models import stock_model
+        stock_model.DB_NAME = self.db_path
+        self.stock_model = stock_model
+        self._cache = {}
+
+    def cached(self, key, factory):
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+    @property
+    def issuer(self):
+        """
+        The issuer with the longest history, i.e. the worst case per request.
+        """
+        def busiest():
+            import sqlite3
+            conn = sqlite3.connect(self.db_path)
+            code = conn.execute(
+                "SELECT Код_на_издавач FROM stock_data GROUP BY 1 ORDER BY COUNT(*) DESC LIMIT 1"
+            ).fetchone()[0]
+            conn.close()
+            return code
+        return self.cached('issuer', busiest)
+
+
+def time_benchmark(bench, ctx):
+    func = bench.setup(ctx)
+    if not bench.slow:
+        func()  # warm-up, not measured
+    timings = []
+    for _ in range(bench.repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {'median': statistics.median(timings), 'min': min(timings)}
+
+
+def load_baselines():
+    if not os.path.exists(BASELINES_PATH):
+        return {}
+    with open(BASELINES_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baselines(baselines):
+    with open(BASELINES_PATH, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -0,0 +1,154 @@
+# benchmarks/lstm_inference.py
+
+"""
+Compare serving the trained LSTM through Keras with the NumPy export
+(prediction.inference.NumpyLSTM).
+
+Trains the model once on the busiest issuer of the selected profile, saves
+it as .keras and as float32/float16 .npz files, then measures each backend
+in a fresh subprocess so that imports and resident memory are attributed to
+that backend alone:
+
+- startup: imports plus loading the model file
+- batch: predicting every window of the issuer's history in one call
+- single: predicting one window, as a latency floor per call
+- max RSS of the process
+- drift: largest absolute difference from the Keras predictions, in price units
+
+Usage:
+    python -m benchmarks.lstm_inference
+    python -m benchmarks.lstm_inference --profile x1 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+BACKENDS = {
+    'keras': 'lstm.keras',
+    'numpy': 'lstm.npz',
+    'numpy-float16': 'lstm-float16.npz',
+}
+
+
+def prepare(profile, workdir):
+    """
+    Train the model and write it in every format, plus the inputs and the
+    scaler range, to `workdir`.
+    """
+    from benchmarks.harness import BenchContext
+    from prediction.inference import NumpyLSTM
+    from prediction.model import train_lstm
+
+    ctx = BenchContext(profile)
+    prices = ctx.stock_model.fetch_data(ctx.issuer)
+    model, scaler, sequence_length = train_lstm(prices)
+
+    scaled = scaler.transform(prices.values.reshape(-1, 1))
+    X = np.array([scaled[i - sequence_length:i] for i in range(sequence_length, len(scaled))])
+    np.save(os.path.join(workdir, 'X.npy'), X)
+
+    model.save(os.path.join(workdir, BACKENDS['keras']))
+    exported = NumpyLSTM.from_keras(model, sequence_length)
+    exported.save(os.path.join(workdir, BACKENDS['numpy']))
+    exported.save(os.path.join(workdir, BACKENDS['numpy-float16']), weights_dtype='float16')
+    return ctx.issuer, X.shape[0], float(scaler.data_range_[0])
+
+
+def peak_rss_mib():
+    """
+    Peak resident memory of this process. VmHWM, unlike ru_maxrss, is not
+    inherited from the parent across fork/exec.
+    """
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def worker(backend, workdir, repeat):
+    """
+    Runs in the subprocess: load one backend, time it and report as JSON.
+    """
+    start = time.perf_counter()
+    path = os.path.join(workdir, BACKENDS[backend])
+    if backend == 'keras':
+        from tensorflow.keras.models import load_model
+        model = load_model(path)
+        predict = lambda X: model.predict(X, verbose=0)
+    else:
+        from prediction.inference import NumpyLSTM
+        predict = NumpyLSTM.load(path).predict
+    startup = time.perf_counter() - start
+
+    X = np.load(os.path.join(workdir, 'X.npy'))
+    timings = {}
+    for name, inputs in (('batch', X), ('single', X[-1:])):
+        predict(inputs)  # warm-up
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            predictions = predict(inputs)
+            runs.append(time.perf_counter() - start)
+        timings[name] = statistics.median(runs)
+        if name == 'batch':
+            np.save(os.path.join(workdir, f'predictions-{backend}.npy'), np.asarray(predictions, dtype=np.float64))
+
+    print(json.dumps({
+        'startup': startup,
+        'batch': timings['batch'],
+        'single': timings['single'],
+        'max_rss_mib': peak_rss_mib(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Keras and NumPy LSTM inference.")
+    parser.add_argument('--profile', default='x10', help="synthetic dataset profile to train on")
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--worker', choices=list(BACKENDS), help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.workdir, args.repeat)
+        return
+
+    from benchmarks.harness import DATA_DIR
+    workdir = os.path.join(DATA_DIR, f'lstm-{args.profile}')
+    os.makedirs(workdir, exist_ok=True)
+    issuer, windows, price_range = prepare(args.profile, workdir)
+    print(f"Issuer {issuer}: {windows} windows of 50 weeks\n")
+
+    results = {}
+    for backend in BACKENDS:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.lstm_inference', '--worker', backend,
+             '--workdir', workdir, '--repeat', str(args.repeat)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[backend] = json.loads(output.strip().splitlines()[-1])
+
+    reference = np.load(os.path.join(workdir, 'predictions-keras.npy'))
+    print(f"{'backend':<14} {'startup s':>9} {'batch ms':>9} {'single ms':>10} {'max RSS MiB':>12} {'drift':>10}")
+    for backend, result in results.items():
+        predictions = np.load(os.path.join(workdir, f'predictions-{backend}.npy'))
+        # Predictions are in scaled units; the scaler maps them back linearly
+        drift = np.abs(predictions - reference).max() * price_range
+        print(
+            f"{backend:<14} {result['startup']:>9.2f} {result['batch'] * 1000:>9.1f} "
+            f"{result['single'] * 1000:>10.2f} {result['max_rss_mib']:>12.0f} {drift:>10.2e}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/run.py
+
+"""
+Run the benchmark suite against a synthetic dataset and compare the
+results with the stored baselines.
+
+Usage:
+    python -m benchmarks.run                     # x1 profile, compare with baselines
+    python -m benchmarks.run --profile x10       # 10x the history per issuer
+    python -m benchmarks.run --save              # record new baselines
+    python -m benchmarks.run -k strategies --include-slow
+
+Exits with status 1 if any benchmark is slower than its baseline
+multiplied by its regression threshold.
+"""
+
+import argparse
+import sys
+
+from benchmarks import bench_market, bench_portfolio, bench_prediction, bench_routes, bench_stock_model, bench_strategies  # noqa: F401 (registers benchmarks)
+from benchmarks.harness import (
+    BENCHMARKS,
+    PROFILES,
+    BenchContext,
+    load_baselines,
+    save_baselines,
+    time_benchmark
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the performance benchmarks.")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='x1')
+    parser.add_argument('-k', dest='pattern', default='', help="only run benchmarks whose name contains this")
+    parser.add_argument('--include-slow', action='store_true', help="also run the multi-second benchmarks (LSTM, full backtest)")
+    parser.add_argument('--save', action='store_true', help="store the results as the new baselines")
+    parser.add_argument('--threshold', type=float, help="override every benchmark's regression threshold")
+    args = parser.parse_args()
+
+    ctx = BenchContext(args.profile)
+    baselines = load_baselines()
+    profile_baselines = baselines.setdefault(args.profile, {})
+    regressions = []
+
+    print(f"Profile {args.profile}: {PROFILES[args.profile]}, busiest issuer {ctx.issuer}")
+    print(f"{'benchmark':<60} {'best':>10} {'baseline':>10} {'ratio':>7}")
+
+    for bench in BENCHMARKS:
+        if args.pattern not in bench.name or (bench.slow and not args.include_slow):
+            continue
+
+        result = time_benchmark(bench, ctx)
+        threshold = args.threshold or bench.threshold
+        baseline = profile_baselines.get(bench.name)
+
+        if baseline:
+            ratio = result['min'] / baseline['min']
+            status = 'REGRESSION' if ratio > threshold else ''
+            if status:
+                regressions.append(bench.name)
+            print(f"{bench.name:<60} {result['min'] * 1000:>8.2f}ms {baseline['min'] * 1000:>8.2f}ms "
+                  f"{ratio:>6.2f}x {status}")
+        else:
+            print(f"{bench.name:<60} {result['min'] * 1000:>8.2f}ms {'-':>10} {'-':>7}")
+
+        if args.save:
+            profile_baselines[bench.name] = result
+
+    if args.save:
+        save_baselines(baselines)
+        print("Baselines saved.")
+
+    if regressions and not args.save:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/startup_time.py
+
+"""
+Cold-start time of each service, from launching the process to its first
+successful response.
+
+Every run starts the service in a fresh interpreter on a free port and
+polls it. It records when /health first answers and when /ready reports
+ready, then sends one real request (/analyze, /predict, or the main
+app's home page) and records when it succeeds. The strategy and
+prediction services are measured with the warm-up enabled (the request
+is sent once /ready answers) and disabled (WARMUP=0: the request is sent
+as soon as /health answers and pays for the lazy imports itself).
+
+Usage:
+    python -m benchmarks.startup_time
+    python -m benchmarks.startup_time --services prediction_service --repeat 5
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+from benchmarks import ROOT, SERVICE_DIRS
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+POLL_INTERVAL = 0.02
+LAUNCH = {
+    'main_app': (
+        "import sys; import models.stock_model as m; m.DB_NAME = sys.argv[2]; "
+        "from app import create_app; create_app().run(host='127.0.0.1', port=int(sys.argv[1]))"
+    ),
+    'strategy_service': "import sys, app; app.app.run(host='127.0.0.1', port=int(sys.argv[1]))",
+    'prediction_service': "import sys, app; app.app.run(host='127.0.0.1', port=int(sys.argv[1]))",
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def first_request(ctx, service):
+    """
+    (method, path, json body) of the request a service exists to answer.
+    """
+    if service == 'main_app':
+        return 'GET', '/', None
+    if service == 'strategy_service':
+        df = ctx.stock_model.get_issuer_data_for_graph(ctx.issuer)
+        return 'POST', '/analyze', {'issuer_data': df.reset_index().to_dict(orient='records'), 'strategy': 'full'}
+    df = ctx.stock_model.fetch_data(ctx.issuer)
+    payload = df.reset_index().assign(Датум=lambda x: x['Датум'].dt.strftime('%Y-%m-%d')).to_dict(orient='records')
+    return 'POST', '/predict', {'issuer_data': payload}
+
+
+def wait_for(url, deadline, ok=lambda response: response.status_code == 200):
+    while time.monotonic() < deadline:
+        try:
+            if ok(requests.get(url, timeout=1)):
+                return time.monotonic()
+        except requests.RequestException:
+            pass
+        time.sleep(POLL_INTERVAL)
+    raise TimeoutError(f"{url} did not become available")
+
+
+def measure(service, warmup, request, db_path, timeout):
+    """
+    Start the service once; return seconds from launch to /health, /ready
+    and the first successful response, and that request's own latency.
+    """
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        'WARMUP': '1' if warmup else '0',
+        'PYTHONPATH': os.pathsep.join([SERVICE_DIRS[service], ROOT]),
+    }
+    start = time.monotonic()
+    process = subprocess.Popen(
+        [sys.executable, '-c', LAUNCH[service], str(port), db_path],
+        cwd=SERVICE_DIRS[service], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + timeout
+        health = wait_for(f"{base}/health", deadline)
+        ready = wait_for(f"{base}/ready", deadline) if warmup else None
+
+        method, path, body = request
+        sent = time.monotonic()
+        response = requests.request(method, f"{base}{path}", json=body, timeout=timeout)
+        response.raise_for_status()
+        served = time.monotonic()
+        return health - start, (ready - start) if ready else None, served - start, served - sent
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure service cold start to first successful response.")
+    parser.add_argument('--services', nargs='+', choices=list(LAUNCH), default=list(LAUNCH))
+    parser.add_argument('--profile', default='x1', help="synthetic dataset the requests are built from")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=300)
+    args = parser.parse_args()
+
+    from benchmarks.harness import BenchContext
+    ctx = BenchContext(args.profile)
+
+    print(f"{'service':<20} {'warm-up':<8} {'health s':>9} {'ready s':>8} {'first response s':>17} {'request s':>10}")
+    for service in args.services:
+        request = first_request(ctx, service)
+        # The main app has no warm-up phase
+        modes = [None] if service == 'main_app' else [True, False]
+        for warmup in modes:
+            runs = [measure(service, warmup, request, ctx.db_path, args.timeout) for _ in range(args.repeat)]
+            health, ready, served, latency = (
+                statistics.median(values) if None not in values else None for values in zip(*runs)
+            )
+            mode = {True: 'on', False: 'off', None: '-'}[warmup]
+            ready = f"{ready:>8.2f}" if ready is not None else f"{'-':>8}"
+            print(f"{service:<20} {mode:<8} {health:>9.2f} {ready} {served:>17.2f} {latency:>10.2f}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/strategy_modes.py
+
+"""
+Chart latency with the analysis run remotely or embedded in the main app.
+
+Starts the strategy service on a free port and renders
+/issuer/<code>/graph in the main app for each STRATEGY_MODE:
+
+- remote: a real HTTP call to the running strategy service
+- embedded: the strategies run in the main app's process
+- auto (service down): the remote call is refused and the chart falls back to
+  embedded
+- auto (service slow): the service stand-in answers after --slow-ms, so the
+  call times out after STRATEGY_TIMEOUT and falls back
+
+In the auto modes only the first (warm-up) request waits for the failed
+call; the rest run embedded during STRATEGY_BACKOFF.
+
+Usage:
+    python -m benchmarks.strategy_modes
+    python -m benchmarks.strategy_modes --strategies full rsi --repeat 20
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from unittest import mock
+
+from benchmarks import ROOT, SERVICE_DIRS
+from benchmarks.startup_time import LAUNCH, free_port, wait_for
+
+os.environ.setdefault('WARMUP', '0')
+
+
+def start_strategy_service(port):
+    env = {**os.environ, 'WARMUP': '1', 'PYTHONPATH': os.pathsep.join([SERVICE_DIRS['strategy_service'], ROOT])}
+    process = subprocess.Popen(
+        [sys.executable, '-c', LAUNCH['strategy_service'], str(port), ''],
+        cwd=SERVICE_DIRS['strategy_service'], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    wait_for(f"http://127.0.0.1:{port}/ready", time.monotonic() + 60)
+    return process
+
+
+def start_slow_stand_in(port, latency_ms):
+    from werkzeug.serving import make_server
+    from loadtest.stubs import create_stub_app
+
+    # werkzeug logs every request to stderr
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    app = create_stub_app('slow_strategy', '/analyze', '[]', latency_ms=latency_ms)
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def time_graph(client, url, repeat):
+    runs = []
+    for _ in range(repeat + 1):
+        start = time.perf_counter()
+        response = client.get(url)
+        runs.append(time.perf_counter() - start)
+        assert response.status_code == 200 and b'analysis-graph' in response.data, response.data[:200]
+    # The first run is a warm-up
+    return min(runs[1:]), statistics.median(runs[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare remote and embedded strategy execution for charts.")
+    parser.add_argument('--profile', default='x1')
+    parser.add_argument('--strategies', nargs='+', default=['full', 'rsi', 'macd', 'adx', 'cci'])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--timeout', type=float, default=0.5, help="STRATEGY_TIMEOUT for the auto modes")
+    parser.add_argument('--slow-ms', type=float, default=2000)
+    args = parser.parse_args()
+
+    from benchmarks.harness import BenchContext, load_service_app
+    ctx = BenchContext(args.profile)
+    client = load_service_app('main_app').create_app().test_client()
+    from controllers import main_controller
+    from models.embedded_strategies import RemoteBackoff
+
+    port = free_port()
+    remote_url = f"http://127.0.0.1:{port}"
+    service = start_strategy_service(port)
+    try:
+        results = {}
+        scenarios = [
+            ('remote', 'remote', remote_url),
+            ('embedded', 'embedded', remote_url),
+            ('auto (service down)', 'auto', f"http://127.0.0.1:{free_port()}"),
+        ]
+        slow_port = free_port()
+        slow_server = start_slow_stand_in(slow_port, args.slow_ms)
+        scenarios.append(('auto (service slow)', 'auto', f"http://127.0.0.1:{slow_port}"))
+
+        for name, mode, url in scenarios:
+            for strategy in args.strategies:
+                with mock.patch.multiple(main_controller, STRATEGY_MODE=mode, STRATEGY_SERVICE_URL=url,
+                                         STRATEGY_TIMEOUT=args.timeout,
+                                         strategy_backoff=RemoteBackoff(main_controller.STRATEGY_BACKOFF)):
+                    repeat = 2 if 'slow' in name else args.repeat
+                    results[name, strategy] = time_graph(client, f'/issuer/{ctx.issuer}/graph?strategy={strategy}', repeat)
+        slow_server.shutdown()
+    finally:
+        service.terminate()
+        service.wait()
+
+    print(f"Issuer {ctx.issuer} ({args.profile}), best / median ms per chart\n")
+    print(f"{'strategy':<10}" + ''.join(f"{name:>24}" for name, _, _ in scenarios))
+    for strategy in args.strategies:
+        cells = ''.join(
+            f"{results[name, strategy][0] * 1000:>11.1f} / {results[name, strategy][1] * 1000:>8.1f}"
+            for name, _, _ in scenarios
+        )
+        print(f"{strategy:<10}{cells}")
+
+
+if __name__ == '__main__':
+    main()
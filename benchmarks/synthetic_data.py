@@ -0,0 +1,155 @@
+# benchmarks/synthetic_data.py
+
+"""
+Synthetic market-data generator.
+
+Produces OHLCV-style histories for any number of issuers in the exact
+`stock_data` schema used by the main app, including its quirks: dates
+are stored as M/D/YYYY strings and prices/turnover as Macedonian-formatted
+strings ("1.234,56").
+
+Usage:
+    python -m benchmarks.synthetic_data --issuers 1500 --years 10 --out big.db
+"""
+
+import argparse
+import os
+import sqlite3
+import string
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE {table} (
+    Код_на_издавач TEXT,
+    Датум TEXT,
+    Цена_на_последна_трансакција REAL,
+    Мак_ REAL,
+    Мин_ REAL,
+    Просечна_цена REAL,
+    Промет_во_БЕСТ_во_денари REAL,
+    Вкупен_промет_во_денари REAL,
+    Количина REAL,
+    Промет_во_БЕСТ_во_денари_друга REAL
+)
+"""
+
+# Swap the thousands and decimal separators of "1,234.56" -> "1.234,56"
+_MK_SEPARATORS = str.maketrans(',.', '.,')
+
+
+def format_mk_number(value):
+    """
+    Format a float the way the exchange exports it, e.g. 1234.5 -> '1.234,50'.
+    """
+    return f"{value:,.2f}".translate(_MK_SEPARATORS)
+
+
+def issuer_codes(count, seed=0):
+    """
+    Return `count` unique, exchange-looking issuer codes (3-5 upper-case letters).
+    """
+    rng = np.random.default_rng(seed)
+    letters = np.array(list(string.ascii_uppercase))
+    codes = set()
+    while len(codes) < count:
+        length = rng.integers(3, 6)
+        codes.add(''.join(rng.choice(letters, size=length)))
+    return sorted(codes)
+
+
+def _trading_days(years, end_date):
+    end = np.datetime64(end_date, 'D')
+    start = end - np.timedelta64(int(round(365.25 * years)), 'D')
+    days = np.arange(start, end + np.timedelta64(1, 'D'), dtype='datetime64[D]')
+    return days[np.is_busday(days)]
+
+
+def _format_dates(days):
+    # Stored without zero padding, e.g. '11/3/2014'
+    years = days.astype('datetime64[Y]').astype(int) + 1970
+    months = days.astype('datetime64[M]').astype(int) % 12 + 1
+    day_of_month = (days - days.astype('datetime64[M]')).astype(int) + 1
+    return [f"{m}/{d}/{y}" for m, d, y in zip(months, day_of_month, years)]
+
+
+def generate_issuer_rows(code, calendar, rng):
+    """
+    Simulate one issuer's history over the given trading calendar and
+    return it as a list of rows ready for insertion into `stock_data`.
+    """
+    # Issuers list at different times and trade on only some of the days
+    listing = rng.integers(0, max(1, len(calendar) // 4))
+    liquidity = rng.uniform(0.2, 0.98)
+    mask = rng.random(len(calendar) - listing) < liquidity
+    days = calendar[listing:][mask]
+    n = len(days)
+    if n == 0:
+        return []
+
+    # Geometric random walk for the closing price
+    volatility = rng.uniform(0.005, 0.03)
+    drift = rng.normal(0.0, 0.0005)
+    start_price = np.exp(rng.uniform(np.log(10), np.log(25000)))
+    log_returns = rng.normal(drift, volatility, size=n)
+    close = np.round(start_price * np.exp(np.cumsum(log_returns)), 2)
+
+    spread = np.abs(rng.normal(0, volatility, size=n))
+    high = np.round(close * (1 + spread), 2)
+    low = np.round(close * (1 - spread), 2)
+    average = np.round(low + (high - low) * rng.random(n), 2)
+
+    previous = np.concatenate(([close[0]], close[:-1]))
+    pct_change = np.round((close - previous) / previous * 100, 2)
+
+    quantity = np.maximum(1, np.round(rng.lognormal(4.5, 1.2, size=n)))
+    turnover = np.round(quantity * average, 2)
+
+    dates = _format_dates(days)
+    fmt = format_mk_number
+    return [
+        (code, dates[i], fmt(close[i]), fmt(high[i]), fmt(low[i]), fmt(average[i]),
+         fmt(pct_change[i]), fmt(turnover[i]), float(quantity[i]), fmt(turnover[i]))
+        for i in range(n)
+    ]
+
+
+def generate_database(path, issuers=150, years=1, seed=0, end_date='2022-09-09', table='stock_data'):
+    """
+    Create (or replace) a SQLite database at `path` filled with synthetic
+    history for `issuers` issuers over `years` years.
+    Returns the number of rows written.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+
+    rng = np.random.default_rng(seed)
+    calendar = _trading_days(years, end_date)
+
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA.format(table=table))
+    total = 0
+    # One issuer at a time keeps memory flat even for very large tables
+    for code in issuer_codes(issuers, seed):
+        rows = generate_issuer_rows(code, calendar, rng)
+        conn.executemany(f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        total += len(rows)
+    conn.commit()
+    conn.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic stock_data database.")
+    parser.add_argument('--issuers', type=int, default=150)
+    parser.add_argument('--years', type=float, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='synthetic_stock_data.db')
+    args = parser.parse_args()
+
+    rows = generate_database(args.out, issuers=args.issuers, years=args.years, seed=args.seed)
+    print(f"Wrote {rows} rows for {args.issuers} issuers to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
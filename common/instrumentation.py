@@ -0,0 +1,147 @@
+# common/instrumentation.py
+
+import logging
+import time
+import uuid
+
+from flask import Response, g, has_request_context, request
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+# Model training can take minutes, so it gets its own, wider buckets.
+MODEL_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Latency of incoming HTTP requests per route.',
+    ['route', 'method', 'status']
+)
+SQL_LATENCY = Histogram(
+    'sql_query_duration_seconds',
+    'Time spent executing SQL queries.',
+    ['query']
+)
+OUTBOUND_LATENCY = Histogram(
+    'outbound_request_duration_seconds',
+    'Latency of calls made to other services.',
+    ['target', 'outcome']
+)
+COMPUTE_LATENCY = Histogram(
+    'compute_duration_seconds',
+    'Time spent in CPU-bound work such as strategy analysis.',
+    ['operation']
+)
+MODEL_LATENCY = Histogram(
+    'model_phase_duration_seconds',
+    'Time spent training models and running inference.',
+    ['phase'],
+    buckets=MODEL_BUCKETS
+)
+CACHE_EVENTS = Counter(
+    'cache_events_total',
+    'Cache lookups, labelled by cache name and hit/miss.',
+    ['cache', 'result']
+)
+
+
+def init_app(app):
+    """
+    Attach request tracing and latency tracking to a Flask app
+    and expose the collected metrics on /metrics.
+    """
+
+    @app.before_request
+    def _start_request():
+        g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def _finish_request(response):
+        start = g.pop('request_start', None)
+        if start is not None:
+            # Use the route template so /issuer/ALK and /issuer/KMB share a series
+            route = request.url_rule.rule if request.url_rule else '<unmatched>'
+            REQUEST_LATENCY.labels(route, request.method, str(response.status_code)).observe(
+                time.perf_counter() - start
+            )
+            if response.status_code >= 500:
+                logger.warning(
+                    "%s %s failed with %s (request_id=%s)",
+                    request.method, request.path, response.status_code, g.request_id
+                )
+        response.headers[REQUEST_ID_HEADER] = g.get('request_id', '')
+        return response
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    return app
+
+
+def metrics_view():
+    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+
+
+def current_request_id():
+    """
+    Return the trace id of the request being handled, or None outside a request.
+    """
+    if has_request_context():
+        return g.get('request_id')
+    return None
+
+
+def outbound_headers():
+    """
+    Headers that propagate the current trace id to a downstream service.
+    """
+    request_id = current_request_id()
+    return {REQUEST_ID_HEADER: request_id} if request_id else {}
+
+
+def traced_post(target, url, **kwargs):
+    """
+    requests.post wrapper that forwards the trace id and records
+    the call latency under the given target name.
+    """
+    # Imported here so services that never call out don't need requests installed
+    import requests
+
+    headers = {**outbound_headers(), **kwargs.pop('headers', {})}
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        response = requests.post(url, headers=headers, **kwargs)
+        outcome = str(response.status_code)
+        return response
+    except requests.RequestException:
+        logger.warning("Call to %s failed (request_id=%s)", target, current_request_id())
+        raise
+    finally:
+        OUTBOUND_LATENCY.labels(target, outcome).observe(time.perf_counter() - start)
+
+
+def sql_timer(query_name):
+    """
+    Context manager timing a single SQL query.
+    """
+    return SQL_LATENCY.labels(query_name).time()
+
+
+def compute_timer(operation):
+    """
+    Context manager timing a CPU-bound computation.
+    """
+    return COMPUTE_LATENCY.labels(operation).time()
+
+
+def model_timer(phase):
+    """
+    Context manager timing a model phase ('training' or 'inference').
+    """
+    return MODEL_LATENCY.labels(phase).time()
+
+
+def record_cache(cache_name, hit):
+    CACHE_EVENTS.labels(cache_name, 'hit' if hit else 'miss').inc()
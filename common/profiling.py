@@ -0,0 +1,246 @@
+# common/profiling.py
+
+"""
+Opt-in per-request profiling.
+
+Disabled unless PROFILING_ENABLED=1. When enabled, a request is profiled if it
+carries an `X-Profile` header or a `profile` query parameter naming a profiler
+(and passes the PROFILING_SAMPLE_RATE draw); any other value is ignored:
+
+  - `sample`: a sampling profiler that periodically records the request
+    thread's stack; downloadable as speedscope JSON or as collapsed stacks
+    for flamegraph.pl.
+  - `cprofile`: deterministic cProfile; downloadable as a .pstats file.
+
+The last PROFILING_BUFFER_SIZE profiles are kept in memory and served from
+/admin/profiles. With PROFILING_ADMIN_TOKEN set those endpoints require it
+as an `X-Admin-Token` header (or `token` query parameter); without it they
+only answer requests from localhost.
+"""
+
+import cProfile
+import collections
+import itertools
+import json
+import marshal
+import os
+import random
+import sys
+import threading
+import time
+
+from flask import Response, abort, g, jsonify, request
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_MODES = ('sample', 'cprofile')
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+
+def _env_flag(name, default='0'):
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes', 'on')
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's call stack every `interval` seconds from a
+    background thread and counts identical stacks.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            # Root first, as flamegraphs expect
+            self.stacks[tuple(reversed(stack))] += 1
+
+
+def _frame_label(frame):
+    name, filename, line = frame
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def to_collapsed(stacks):
+    """
+    Render stacks in Brendan Gregg's collapsed format: 'root;child;leaf count'.
+    """
+    return ''.join(
+        ';'.join(_frame_label(frame) for frame in stack) + f" {count}\n"
+        for stack, count in stacks.most_common()
+    )
+
+
+def to_speedscope(stacks, interval, name):
+    """
+    Render stacks as a speedscope 'sampled' profile.
+    """
+    frames, frame_index, samples, weights = [], {}, [], []
+    for stack, count in stacks.items():
+        indices = []
+        for frame in stack:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({'name': frame[0], 'file': frame[1], 'line': frame[2]})
+            indices.append(frame_index[frame])
+        samples.append(indices)
+        weights.append(count * interval * 1000)
+
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'exporter': 'common.profiling',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights,
+        }],
+    }
+
+
+class ProfileStore:
+    """
+    Bounded ring buffer of captured profiles; the oldest is dropped first.
+    """
+
+    def __init__(self, size):
+        self._profiles = collections.deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            record['id'] = next(self._ids)
+            self._profiles.append(record)
+        return record['id']
+
+    def get(self, profile_id):
+        with self._lock:
+            return next((p for p in self._profiles if p['id'] == profile_id), None)
+
+    def list(self):
+        with self._lock:
+            return [{k: v for k, v in p.items() if k != 'data'} for p in reversed(self._profiles)]
+
+
+def init_app(app):
+    """
+    Install the profiling hooks and admin endpoints if PROFILING_ENABLED is set.
+    """
+    if not _env_flag('PROFILING_ENABLED'):
+        return app
+
+    sample_rate = float(os.environ.get('PROFILING_SAMPLE_RATE', '1.0'))
+    interval = float(os.environ.get('PROFILING_INTERVAL_MS', '5')) / 1000
+    admin_token = os.environ.get('PROFILING_ADMIN_TOKEN')
+    store = ProfileStore(int(os.environ.get('PROFILING_BUFFER_SIZE', '20')))
+    # Only one cProfile can be active per interpreter
+    cprofile_lock = threading.Lock()
+
+    @app.before_request
+    def _start_profile():
+        mode = (request.headers.get(PROFILE_HEADER) or request.args.get('profile') or '').lower()
+        if mode not in PROFILE_MODES or request.path.startswith('/admin/profiles') or random.random() >= sample_rate:
+            return
+        if mode == 'cprofile':
+            if not cprofile_lock.acquire(blocking=False):
+                return
+            profiler = cProfile.Profile()
+            profiler.enable()
+            g.profiler = ('cprofile', profiler)
+        else:
+            profiler = SamplingProfiler(threading.get_ident(), interval)
+            profiler.start()
+            g.profiler = ('sample', profiler)
+        g.profile_start = time.perf_counter()
+
+    @app.teardown_request
+    def _finish_profile(exc):
+        if 'profiler' not in g:
+            return
+        mode, profiler = g.pop('profiler')
+        duration = time.perf_counter() - g.pop('profile_start')
+        if mode == 'cprofile':
+            profiler.disable()
+            cprofile_lock.release()
+            profiler.create_stats()
+            data = profiler.stats
+        else:
+            profiler.stop()
+            data = profiler.stacks
+
+        store.add({
+            'mode': mode,
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'route': request.url_rule.rule if request.url_rule else None,
+            'request_id': g.get('request_id'),
+            'captured_at': time.time(),
+            'duration_ms': round(duration * 1000, 2),
+            'data': data,
+        })
+
+    def _check_token():
+        if admin_token:
+            if admin_token not in (request.headers.get(ADMIN_TOKEN_HEADER), request.args.get('token')):
+                abort(403)
+        elif request.remote_addr not in LOCAL_ADDRESSES:
+            # Profiles expose code paths and request URLs; without a token keep them local
+            abort(403)
+
+    def list_profiles():
+        _check_token()
+        return jsonify(store.list())
+
+    def download_profile(profile_id, fmt):
+        _check_token()
+        record = store.get(profile_id)
+        if record is None:
+            abort(404)
+        name = f"{record['method']} {record['path']}"
+
+        if record['mode'] == 'cprofile':
+            if fmt != 'pstats':
+                abort(400, "cProfile captures are only available as .pstats")
+            # Same layout pstats.Stats.dump_stats writes, without a temp file
+            body, mimetype = marshal.dumps(record['data']), 'application/octet-stream'
+        elif fmt == 'speedscope':
+            body, mimetype = json.dumps(to_speedscope(record['data'], interval, name)), 'application/json'
+        elif fmt == 'collapsed':
+            body, mimetype = to_collapsed(record['data']), 'text/plain'
+        else:
+            abort(400, "Sampled profiles are available as speedscope or collapsed")
+
+        extension = {'speedscope': 'speedscope.json', 'collapsed': 'collapsed.txt', 'pstats': 'pstats'}[fmt]
+        return Response(body, mimetype=mimetype, headers={
+            'Content-Disposition': f'attachment; filename=profile-{profile_id}.{extension}'
+        })
+
+    app.add_url_rule('/admin/profiles', 'list_profiles', list_profiles)
+    app.add_url_rule('/admin/profiles/<int:profile_id>.<any(speedscope, collapsed, pstats):fmt>',
+                     'download_profile', download_profile)
+    return app
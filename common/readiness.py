@@ -0,0 +1,117 @@
+# common/readiness.py
+
+"""
+Liveness and readiness endpoints with an optional warm-up phase.
+
+`/health` answers as soon as the process serves HTTP. `/ready` answers 503
+until the service's warm-up (importing heavy libraries, preloading models)
+has finished and its readiness checks pass, then 200. docker-compose
+health checks poll `/ready`, so dependent containers start once the
+service can actually answer requests quickly.
+
+The warm-up runs in a background thread and is skipped with WARMUP=0, in
+which case heavy dependencies are loaded by the first request instead.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from flask import jsonify
+from prometheus_client import Gauge
+
+logger = logging.getLogger(__name__)
+
+SERVICE_READY = Gauge(
+    'service_ready',
+    '1 once the service has finished warming up, 0 before.'
+)
+WARMUP_DURATION = Gauge(
+    'warmup_duration_seconds',
+    'Time the warm-up phase took.'
+)
+
+
+def _env_flag(name, default='1'):
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes', 'on')
+
+
+class Readiness:
+    """
+    Warm-up state of one service.
+    """
+
+    def __init__(self, warmup=None, checks=()):
+        self.warmup = warmup
+        self.checks = list(checks)
+        self.started = time.monotonic()
+        self.error = None
+        self._warm = threading.Event()
+
+    def start(self):
+        if self.warmup is None or not _env_flag('WARMUP'):
+            self._finish()
+            return
+        threading.Thread(target=self._run_warmup, daemon=True, name='warmup').start()
+
+    def _run_warmup(self):
+        start = time.perf_counter()
+        try:
+            self.warmup()
+        except Exception as e:
+            logger.exception("Warm-up failed")
+            self.error = f"warm-up failed: {e}"
+        else:
+            WARMUP_DURATION.set(time.perf_counter() - start)
+            logger.info("Warm-up finished in %.2fs", time.perf_counter() - start)
+        self._finish()
+
+    def _finish(self):
+        self._warm.set()
+        if self.error is None:
+            SERVICE_READY.set(1)
+
+    def wait(self, timeout=None):
+        """
+        Block until the warm-up has finished; returns False on timeout.
+        """
+        return self._warm.wait(timeout)
+
+    def status(self):
+        """
+        (ready, details) for the /ready response.
+        """
+        if not self._warm.is_set():
+            return False, {'status': 'warming up', 'uptime': round(time.monotonic() - self.started, 3)}
+        if self.error is not None:
+            return False, {'status': 'error', 'error': self.error}
+        for check in self.checks:
+            try:
+                check()
+            except Exception as e:
+                return False, {'status': 'error', 'error': f"{check.__name__}: {e}"}
+        return True, {'status': 'ready'}
+
+
+def init_app(app, warmup=None, checks=()):
+    """
+    Register /health and /ready and start the warm-up.
+
+    `warmup` is a callable run once in the background; `checks` are callables
+    run on every /ready request that raise when the service cannot serve.
+    """
+    readiness = Readiness(warmup, checks)
+
+    def health():
+        return jsonify({'status': 'ok'})
+
+    def ready():
+        is_ready, details = readiness.status()
+        return jsonify(details), 200 if is_ready else 503
+
+    app.add_url_rule('/health', 'health', health)
+    app.add_url_rule('/ready', 'ready', ready)
+    app.extensions['readiness'] = readiness
+    readiness.start()
+    return readiness
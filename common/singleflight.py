@@ -0,0 +1,86 @@
+# common/singleflight.py
+
+"""
+Request coalescing ("single flight").
+
+When several threads ask for the same piece of work at once, only the
+first one (the leader) runs it; the others wait and receive the leader's
+result, or its exception. Nothing is cached: once the work finishes, the
+next call with the same key runs it again.
+"""
+
+import hashlib
+import threading
+
+from prometheus_client import Counter, Gauge
+
+SINGLEFLIGHT_CALLS = Counter(
+    'singleflight_calls_total',
+    'Coalesced calls, labelled by group and whether the caller ran the work (leader) or shared it (follower).',
+    ['group', 'role']
+)
+SINGLEFLIGHT_IN_FLIGHT = Gauge(
+    'singleflight_in_flight',
+    'Distinct units of work currently running per group.',
+    ['group']
+)
+
+
+def body_key(*parts):
+    """
+    Stable key for work identified by its input, e.g. a request body.
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key within one process.
+    """
+
+    def __init__(self, group):
+        self.group = group
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs), unless a call with the same key is already
+        running, in which case wait for it and return its result.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        SINGLEFLIGHT_CALLS.labels(self.group, 'leader' if leader else 'follower').inc()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        SINGLEFLIGHT_IN_FLIGHT.labels(self.group).inc()
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            SINGLEFLIGHT_IN_FLIGHT.labels(self.group).dec()
+            call.done.set()
@@ -0,0 +1,152 @@
+# loadtest/scenarios.py
+
+"""
+Drive the main app with concurrent simulated users and report throughput,
+latency percentiles and error rates per route.
+
+Usage:
+    python -m loadtest.scenarios --scenario mixed --users 20 --duration 60
+    python -m loadtest.scenarios --scenario charts --users 50 --base-url http://localhost:5001
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+import requests
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Dians', 'stock_data.db')
+
+# The main app reports downstream failures as 200 pages, so look at the body too
+ERROR_MARKERS = ('Error communicating with', 'An unexpected error occurred', 'Invalid response from')
+
+# Each scenario is a weighted mix of (route label, weight, url builder)
+SCENARIOS = {
+    'browse': [
+        ('/', 3, lambda issuer: f"/?page={random.randint(1, 15)}"),
+        ('/analysis', 3, lambda issuer: f"/analysis?page={random.randint(1, 100)}"),
+        ('/analysis?issuer', 2, lambda issuer: f"/analysis?issuer={issuer}"),
+    ],
+    'charts': [
+        ('/issuer/<code>/graph', 1,
+         lambda issuer: f"/issuer/{issuer}/graph?strategy={random.choice(['rsi', 'macd', 'adx', 'cci', 'full'])}"),
+    ],
+    'predict': [
+        ('/issuer/<code>/predict', 1, lambda issuer: f"/issuer/{issuer}/predict"),
+    ],
+    'mixed': [
+        ('/', 4, lambda issuer: f"/?page={random.randint(1, 15)}"),
+        ('/analysis', 3, lambda issuer: f"/analysis?issuer={issuer}"),
+        ('/issuer/<code>/graph', 4,
+         lambda issuer: f"/issuer/{issuer}/graph?strategy={random.choice(['rsi', 'macd', 'adx', 'cci', 'full'])}"),
+        ('/issuer/<code>/predict', 1, lambda issuer: f"/issuer/{issuer}/predict"),
+    ],
+}
+
+
+def load_issuers(db_path):
+    conn = sqlite3.connect(db_path)
+    codes = [row[0] for row in conn.execute("SELECT DISTINCT Код_на_издавач FROM stock_data")]
+    conn.close()
+    return codes
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def _user(base_url, mix, issuers, deadline, think_time, timeout, results):
+    session = requests.Session()
+    labels, weights, builders = zip(*mix)
+    samples = []
+    while time.monotonic() < deadline:
+        index = random.choices(range(len(labels)), weights=weights)[0]
+        url = base_url + builders[index](random.choice(issuers))
+        start = time.perf_counter()
+        try:
+            response = session.get(url, timeout=timeout)
+            ok = response.status_code == 200 and not any(m in response.text for m in ERROR_MARKERS)
+        except requests.RequestException:
+            ok = False
+        samples.append((labels[index], time.perf_counter() - start, ok))
+        if think_time:
+            time.sleep(random.expovariate(1 / think_time))
+    results.extend(samples)
+
+
+def run_scenario(base_url, scenario, users, duration, issuers, think_time=0.0, timeout=60.0):
+    """
+    Run `users` concurrent closed-loop users for `duration` seconds and
+    return per-route statistics.
+    """
+    mix = SCENARIOS[scenario]
+    deadline = time.monotonic() + duration
+    results = []
+    threads = [
+        threading.Thread(target=_user, args=(base_url, mix, issuers, deadline, think_time, timeout, results))
+        for _ in range(users)
+    ]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    report = {}
+    for label in [entry[0] for entry in mix] + ['TOTAL']:
+        samples = [s for s in results if label == 'TOTAL' or s[0] == label]
+        latencies = sorted(s[1] * 1000 for s in samples)
+        errors = sum(1 for s in samples if not s[2])
+        report[label] = {
+            'requests': len(samples),
+            'throughput_rps': len(samples) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+            'error_rate': errors / len(samples) if samples else 0.0,
+        }
+    return report
+
+
+def print_report(report):
+    print(f"{'route':<26} {'reqs':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for label, stats in report.items():
+        print(f"{label:<26} {stats['requests']:>7} {stats['throughput_rps']:>8.1f} {stats['p50_ms']:>9.1f} "
+              f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['error_rate']:>7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the main app.")
+    parser.add_argument('--base-url', default='http://localhost:5001')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='mixed')
+    parser.add_argument('--users', type=int, default=10, help="concurrent simulated users")
+    parser.add_argument('--duration', type=float, default=30, help="seconds to run")
+    parser.add_argument('--think-ms', type=float, default=0, help="mean pause between a user's requests")
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--issuers', help="comma-separated issuer codes (default: all codes in --db)")
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args()
+
+    issuers = args.issuers.split(',') if args.issuers else load_issuers(args.db)
+    report = run_scenario(args.base_url, args.scenario, args.users, args.duration, issuers,
+                          think_time=args.think_ms / 1000, timeout=args.timeout)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# loadtest/stubs.py
+
+"""
+Lightweight stand-ins for strategy_service (:5003) and prediction_service (:5002).
+
+They accept the same requests as the real services and reply with a canned,
+pre-serialized response, after an artificial delay and with an optional
+injected error rate. No TensorFlow, `ta` or Docker required.
+
+Usage:
+    python -m loadtest.stubs --latency-ms 80 --jitter-ms 20 --error-rate 0.02 --rows 1000
+"""
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+
+import numpy as np
+from flask import Flask, Response
+from werkzeug.serving import make_server
+
+STRATEGY_PORT = 5003
+PREDICTION_PORT = 5002
+
+
+def canned_analysis(rows, seed=0):
+    """
+    A response shaped like /analyze with the 'full' strategy: price, all
+    indicator columns and a Signal per row.
+    """
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64('2015-01-01') + np.arange(rows)
+    price = np.round(1000 * np.exp(np.cumsum(rng.normal(0, 0.01, rows))), 2)
+    signals = rng.choice(['Buy', 'Sell', 'Hold'], size=rows, p=[0.2, 0.2, 0.6])
+    return [
+        {
+            'Датум': str(dates[i]),
+            'Цена_на_последна_трансакција': float(price[i]),
+            'Мак_': float(price[i] * 1.01),
+            'Мин_': float(price[i] * 0.99),
+            'SMA10': float(price[i]),
+            'SMA50': float(price[i]),
+            'EMA10': float(price[i]),
+            'EMA50': float(price[i]),
+            'RSI': float(rng.uniform(20, 80)),
+            'MACD': float(rng.normal(0, 5)),
+            'CCI': float(rng.normal(0, 100)),
+            'ADX': float(rng.uniform(10, 40)),
+            'Signal': str(signals[i]),
+            'InsufficientData': False,
+        }
+        for i in range(rows)
+    ]
+
+
+def canned_prediction(rows, seed=0):
+    """
+    A response shaped like /predict: predictions, actual prices and dates.
+    """
+    rng = np.random.default_rng(seed)
+    actual = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, rows)))
+    predicted = actual * (1 + rng.normal(0, 0.01, rows))
+    dates = np.datetime64('2015-01-04') + 7 * np.arange(rows)
+    return {
+        'predictions': predicted.round(2).tolist(),
+        'actual_prices': actual.round(2).tolist(),
+        'dates': [str(d) for d in dates],
+    }
+
+
+def create_stub_app(name, route, body, latency_ms=50.0, jitter_ms=0.0, error_rate=0.0):
+    """
+    Build a Flask app serving `body` (already JSON-encoded) on POST `route`.
+    """
+    app = Flask(name)
+    error_body = json.dumps({'error': 'Injected failure from load-test stub'})
+
+    @app.route(route, methods=['POST'])
+    def handle():
+        delay = max(0.0, random.gauss(latency_ms, jitter_ms)) / 1000
+        time.sleep(delay)
+        if random.random() < error_rate:
+            return Response(error_body, status=500, mimetype='application/json')
+        return Response(body, mimetype='application/json')
+
+    return app
+
+
+def serve(apps_and_ports):
+    """
+    Run each (app, port) pair on its own threaded server until interrupted.
+    """
+    servers = [make_server('0.0.0.0', port, app, threaded=True) for app, port in apps_and_ports]
+    threads = [threading.Thread(target=server.serve_forever, daemon=True) for server in servers]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for server in servers:
+            server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run stand-in strategy and prediction services.")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="mean artificial response delay")
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help="standard deviation of the delay")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    parser.add_argument('--rows', type=int, default=500, help="rows in each canned response (payload size)")
+    parser.add_argument('--prediction-latency-ms', type=float,
+                        help="override the delay for the prediction stub (real training takes seconds)")
+    parser.add_argument('--strategy-port', type=int, default=STRATEGY_PORT)
+    parser.add_argument('--prediction-port', type=int, default=PREDICTION_PORT)
+    args = parser.parse_args()
+
+    # Per-request access logs would dominate the stubs' CPU time under load
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    strategy_body = json.dumps(canned_analysis(args.rows))
+    prediction_body = json.dumps(canned_prediction(args.rows))
+    prediction_latency = args.prediction_latency_ms if args.prediction_latency_ms is not None else args.latency_ms
+
+    strategy_app = create_stub_app('strategy_stub', '/analyze', strategy_body,
+                                   args.latency_ms, args.jitter_ms, args.error_rate)
+    prediction_app = create_stub_app('prediction_stub', '/predict', prediction_body,
+                                     prediction_latency, args.jitter_ms, args.error_rate)
+
+    print(f"strategy stub on :{args.strategy_port} ({len(strategy_body) / 1024:.0f} KiB responses), "
+          f"prediction stub on :{args.prediction_port} ({len(prediction_body) / 1024:.0f} KiB responses)")
+    serve([(strategy_app, args.strategy_port), (prediction_app, args.prediction_port)])
+
+
+if __name__ == '__main__':
+    main()
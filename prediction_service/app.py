@@ -1,49 +1,164 @@
+import logging
+import threading
+from collections import OrderedDict
 import numpy as np
 from flask import Flask, request, jsonify
-from prediction.model import train_lstm
-import pandas as pd
+from common import instrumentation, profiling, readiness
+from common.instrumentation import model_timer
+from common.singleflight import SingleFlight, body_key
+from prediction.inference import NumpyLSTM
 import os
 
+# pandas, scikit-learn and TensorFlow are imported on first use (or by the
+# warm-up) so the service starts answering /health immediately
+
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
+instrumentation.init_app(app)
+profiling.init_app(app)
 
-@app.route('/predict', methods=['POST'])
-def predict():
-    try:
-        # Parse input data
-        data = request.json
-        issuer_data = data['issuer_data']
+# Identical concurrent /predict requests train the LSTM once and share the predictions
+predict_flight = SingleFlight('predict')
+
+# 'numpy' runs inference through NumpyLSTM, 'keras' through model.predict
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'numpy')
+# When set, trained models are exported here and reused for identical price series
+MODEL_DIR = os.environ.get('PREDICTION_MODEL_DIR')
+# How many exported models to keep in memory, least recently used evicted first
+MODEL_CACHE_SIZE = int(os.environ.get('PREDICTION_MODEL_CACHE_SIZE', '64'))
+# Exported models already read from MODEL_DIR, by path, in LRU order
+exported_models = OrderedDict()
+_exported_lock = threading.Lock()
+
+
+def remember_exported(path, model):
+    with _exported_lock:
+        exported_models[path] = model
+        exported_models.move_to_end(path)
+        while len(exported_models) > MODEL_CACHE_SIZE:
+            exported_models.popitem(last=False)
+
+
+def load_exported(path):
+    with _exported_lock:
+        if path in exported_models:
+            exported_models.move_to_end(path)
+            return exported_models[path]
+    model = NumpyLSTM.load(path)
+    remember_exported(path, model)
+    return model
+
+
+def load_or_train(prices):
+    """
+    Return (model, fitted scaler, sequence_length) for the price series: the
+    model exported for exactly these prices if PREDICTION_MODEL_DIR has one,
+    otherwise a newly trained LSTM. Exports saved without their scaler
+    (format version 1) are retrained and overwritten.
+    """
+    from prediction.model import train_lstm
+
+    path = None
+    if MODEL_DIR:
+        path = os.path.join(MODEL_DIR, body_key(*prices.iloc[:, 0].tolist()) + '.npz')
+        if path in exported_models or os.path.exists(path):
+            model = load_exported(path)
+            scaler = model.scaler()
+            if scaler is not None:
+                return model, scaler, model.sequence_length
+
+    with model_timer('training'):
+        model, scaler, sequence_length = train_lstm(prices)
+
+    if path or INFERENCE_BACKEND != 'keras':
+        exported = NumpyLSTM.from_keras(model, sequence_length, scaler)
+        if path:
+            os.makedirs(MODEL_DIR, exist_ok=True)
+            exported.save(path)
+            remember_exported(path, exported)
+        if INFERENCE_BACKEND != 'keras':
+            model = exported
+    return model, scaler, sequence_length
 
-        # Convert to DataFrame
-        df = pd.DataFrame(issuer_data)
-        df['Датум'] = pd.to_datetime(df['Датум'])
-        df.set_index('Датум', inplace=True)
 
-        # Train the LSTM model
-        model, scaler, sequence_length = train_lstm(df[['Цена_на_последна_трансакција']])
+def run_prediction(issuer_data):
+    """
+    Train the LSTM on the issuer data and predict over its history.
+    """
+    import pandas as pd
 
-        # Prepare test data
-        scaled_data = scaler.fit_transform(df.values.reshape(-1, 1))
-        X_test, y_test = [], []
-        for i in range(sequence_length, len(scaled_data)):
-            X_test.append(scaled_data[i - sequence_length:i])
-            y_test.append(scaled_data[i])
-        X_test = np.array(X_test)
-        y_test = np.array(y_test)
+    # Convert to DataFrame
+    df = pd.DataFrame(issuer_data)
+    df['Датум'] = pd.to_datetime(df['Датум'])
+    df.set_index('Датум', inplace=True)
 
-        # Predict
+    # Train the LSTM model (or load the exported one)
+    model, scaler, sequence_length = load_or_train(df[['Цена_на_последна_трансакција']])
+
+    # Prepare test data with the scaler the model was trained with
+    scaled_data = scaler.transform(df.values.reshape(-1, 1))
+    X_test, y_test = [], []
+    for i in range(sequence_length, len(scaled_data)):
+        X_test.append(scaled_data[i - sequence_length:i])
+        y_test.append(scaled_data[i])
+    X_test = np.array(X_test)
+    y_test = np.array(y_test)
+
+    # Predict
+    with model_timer('inference'):
         predictions = model.predict(X_test)
-        predictions = scaler.inverse_transform(predictions).flatten()
-        actual_prices = scaler.inverse_transform(y_test).flatten()
+    predictions = scaler.inverse_transform(predictions).flatten()
+    actual_prices = scaler.inverse_transform(y_test).flatten()
+
+    # Dates for predictions
+    prediction_dates = df.index[-len(predictions):].strftime('%Y-%m-%d').tolist()
+
+    return {
+        "predictions": predictions.tolist(),
+        "actual_prices": actual_prices.tolist(),
+        "dates": prediction_dates
+    }
+
+
+def warm_up():
+    """
+    Load the libraries /predict needs, run the model once and preload the
+    most recently written models exported to PREDICTION_MODEL_DIR, as many
+    as the cache holds.
+    """
+    import pandas  # noqa: F401
+    from prediction.model import warm_up as warm_up_model
+
+    warm_up_model()
+
+    if MODEL_DIR and os.path.isdir(MODEL_DIR):
+        paths = [
+            os.path.join(MODEL_DIR, name) for name in os.listdir(MODEL_DIR)
+            if name.endswith('.npz') and not name.endswith('.tmp.npz')
+        ]
+        newest = sorted(paths, key=os.path.getmtime)[-MODEL_CACHE_SIZE:] if MODEL_CACHE_SIZE > 0 else []
+        for path in newest:
+            try:
+                model = load_exported(path)
+                model.predict(np.zeros((1, model.sequence_length or 50, 1)))
+            except Exception:
+                logger.exception("Could not preload %s", path)
+        logger.info("Preloaded %d exported models", len(exported_models))
+
 
-        # Dates for predictions
-        prediction_dates = df.index[-len(predictions):].strftime('%Y-%m-%d').tolist()
+readiness.init_app(app, warm_up)
+
+
+@app.route('/predict', methods=['POST'])
+def predict():
+    try:
+        # Parse input data
+        data = request.json
+        issuer_data = data['issuer_data']
 
         # Return the response
-        return jsonify({
-            "predictions": predictions.tolist(),
-            "actual_prices": actual_prices.tolist(),
-            "dates": prediction_dates
-        })
+        return jsonify(predict_flight.do(body_key(request.get_data()), run_prediction, issuer_data))
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
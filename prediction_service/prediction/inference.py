@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+# 2 adds the MinMaxScaler range; version 1 files load without a scaler
+FORMAT_VERSION = 2
+SUPPORTED_FORMATS = (1, 2)
+
+
+def _sigmoid(x):
+    # tanh form: same values as 1 / (1 + exp(-x)) without overflow warnings
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _lstm(x, kernel, recurrent_kernel, bias, return_sequences):
+    """
+    One Keras LSTM layer (tanh activation, sigmoid recurrent activation,
+    gate order i, f, c, o) over a batch of sequences.
+    """
+    batch, steps, _ = x.shape
+    units = recurrent_kernel.shape[0]
+
+    # The input projection doesn't depend on the state, so do all steps at once
+    projected = x @ kernel + bias
+    h = np.zeros((batch, units), dtype=x.dtype)
+    c = np.zeros((batch, units), dtype=x.dtype)
+    outputs = np.empty((batch, steps, units), dtype=x.dtype) if return_sequences else None
+
+    for t in range(steps):
+        z = projected[:, t] + h @ recurrent_kernel
+        i = _sigmoid(z[:, :units])
+        f = _sigmoid(z[:, units:2 * units])
+        g = np.tanh(z[:, 2 * units:3 * units])
+        o = _sigmoid(z[:, 3 * units:])
+        c = f * c + i * g
+        h = o * np.tanh(c)
+        if return_sequences:
+            outputs[:, t] = h
+
+    return outputs if return_sequences else h
+
+
+class NumpyLSTM:
+    """
+    Forward pass of the model built by `train_lstm` (stacked LSTM layers
+    followed by linear Dense layers) in plain NumPy.
+
+    It gives the same predictions as `model.predict` without its per-call
+    overhead. Saved with `save` it can be served without importing
+    TensorFlow. The range of the MinMaxScaler the model was trained with is
+    saved alongside the weights, so predictions can be mapped back to prices.
+    """
+
+    def __init__(self, lstm_layers, dense_layers, sequence_length=None, dtype=np.float32, scaler_range=None):
+        """
+        lstm_layers: list of (kernel, recurrent_kernel, bias, return_sequences)
+        dense_layers: list of (kernel, bias)
+        scaler_range: (data_min, data_max, feature_range) of the fitted scaler, or None
+        """
+        self.dtype = np.dtype(dtype)
+        self.lstm_layers = [
+            (np.asarray(kernel, self.dtype), np.asarray(recurrent, self.dtype), np.asarray(bias, self.dtype), bool(sequences))
+            for kernel, recurrent, bias, sequences in lstm_layers
+        ]
+        self.dense_layers = [(np.asarray(kernel, self.dtype), np.asarray(bias, self.dtype)) for kernel, bias in dense_layers]
+        self.sequence_length = sequence_length
+        if scaler_range is not None:
+            data_min, data_max, feature_range = scaler_range
+            scaler_range = (
+                np.asarray(data_min, np.float64), np.asarray(data_max, np.float64), tuple(feature_range)
+            )
+        self.scaler_range = scaler_range
+
+    @classmethod
+    def from_keras(cls, model, sequence_length=None, scaler=None):
+        """
+        Copy the weights out of a trained Keras model, and the range of the
+        fitted MinMaxScaler if given. Raises ValueError for layers or
+        activations the NumPy forward pass doesn't implement.
+        """
+        lstm_layers, dense_layers = [], []
+        for layer in model.layers:
+            config = layer.get_config()
+            kind = type(layer).__name__
+            if kind == 'LSTM' and not dense_layers:
+                if (config['activation'], config['recurrent_activation']) != ('tanh', 'sigmoid') or not config['use_bias']:
+                    raise ValueError(f"Unsupported LSTM configuration in layer {layer.name}")
+                kernel, recurrent, bias = layer.get_weights()
+                lstm_layers.append((kernel, recurrent, bias, config['return_sequences']))
+            elif kind == 'Dense':
+                if config['activation'] != 'linear' or not config['use_bias']:
+                    raise ValueError(f"Unsupported Dense configuration in layer {layer.name}")
+                dense_layers.append(tuple(layer.get_weights()))
+            else:
+                raise ValueError(f"Unsupported layer {layer.name} ({kind})")
+        if not lstm_layers or lstm_layers[-1][3]:
+            raise ValueError("Expected LSTM layers ending in one without return_sequences")
+        scaler_range = None
+        if scaler is not None:
+            scaler_range = (scaler.data_min_, scaler.data_max_, scaler.feature_range)
+        return cls(lstm_layers, dense_layers, sequence_length, scaler_range=scaler_range)
+
+    def scaler(self):
+        """
+        A fitted MinMaxScaler equal to the one the model was trained with,
+        or None if the model was saved without one.
+        """
+        if self.scaler_range is None:
+            return None
+        from sklearn.preprocessing import MinMaxScaler
+
+        data_min, data_max, feature_range = self.scaler_range
+        # Fitting on the two extremes reproduces data_min_, data_max_, scale_ and min_
+        return MinMaxScaler(feature_range=feature_range).fit(np.vstack([data_min, data_max]))
+
+    def predict(self, X):
+        """
+        X: (samples, time steps, features) -> (samples, outputs), like model.predict.
+        """
+        output = np.asarray(X, dtype=self.dtype)
+        for kernel, recurrent, bias, sequences in self.lstm_layers:
+            output = _lstm(output, kernel, recurrent, bias, sequences)
+        for kernel, bias in self.dense_layers:
+            output = output @ kernel + bias
+        return output
+
+    def save(self, path, weights_dtype='float32'):
+        """
+        Write the weights to an .npz file. weights_dtype='float16' halves
+        the file size; the weights are cast back to float32 when loaded. The
+        scaler range is always stored as float64.
+        """
+        arrays = {}
+        for n, (kernel, recurrent, bias, _) in enumerate(self.lstm_layers):
+            arrays[f'lstm{n}_kernel'], arrays[f'lstm{n}_recurrent_kernel'], arrays[f'lstm{n}_bias'] = kernel, recurrent, bias
+        for n, (kernel, bias) in enumerate(self.dense_layers):
+            arrays[f'dense{n}_kernel'], arrays[f'dense{n}_bias'] = kernel, bias
+        arrays = {name: array.astype(weights_dtype) for name, array in arrays.items()}
+
+        config = {
+            'format_version': FORMAT_VERSION,
+            'return_sequences': [layer[3] for layer in self.lstm_layers],
+            'dense_layers': len(self.dense_layers),
+            'sequence_length': self.sequence_length,
+            'feature_range': None,
+        }
+        if self.scaler_range is not None:
+            arrays['scaler_data_min'], arrays['scaler_data_max'], feature_range = self.scaler_range
+            config['feature_range'] = list(feature_range)
+        # Write to a temporary file first so readers never see a partial model
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, config=np.array(json.dumps(config)), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, dtype=np.float32):
+        with np.load(path, allow_pickle=False) as data:
+            config = json.loads(str(data['config']))
+            if config['format_version'] not in SUPPORTED_FORMATS:
+                raise ValueError(f"Unsupported model format {config['format_version']} in {path}")
+            lstm_layers = [
+                (data[f'lstm{n}_kernel'], data[f'lstm{n}_recurrent_kernel'], data[f'lstm{n}_bias'], sequences)
+                for n, sequences in enumerate(config['return_sequences'])
+            ]
+            dense_layers = [(data[f'dense{n}_kernel'], data[f'dense{n}_bias']) for n in range(config['dense_layers'])]
+            scaler_range = None
+            if config.get('feature_range') is not None:
+                scaler_range = (data['scaler_data_min'], data['scaler_data_max'], config['feature_range'])
+        return cls(lstm_layers, dense_layers, config['sequence_length'], dtype, scaler_range)
+
+
+def export_model(keras_path, npz_path, weights_dtype='float32', sequence_length=50, data_range=None):
+    """
+    Convert a model saved by Keras (.keras/.h5) to the NumPy format.
+    `data_range` is the (min, max) price the model's scaler was fitted on.
+    """
+    from sklearn.preprocessing import MinMaxScaler
+    from tensorflow.keras.models import load_model
+
+    scaler = MinMaxScaler(feature_range=(0, 1)).fit([[data_range[0]], [data_range[1]]]) if data_range else None
+    NumpyLSTM.from_keras(load_model(keras_path), sequence_length, scaler).save(npz_path, weights_dtype)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export a trained Keras LSTM for NumPy inference.")
+    parser.add_argument('keras_model', help="model saved with model.save()")
+    parser.add_argument('output', help="destination .npz file")
+    parser.add_argument('--float16', action='store_true', help="store the weights as float16")
+    parser.add_argument('--sequence-length', type=int, default=50)
+    parser.add_argument('--data-range', type=float, nargs=2, metavar=('MIN', 'MAX'),
+                        help="price range the model's scaler was fitted on")
+    args = parser.parse_args()
+    export_model(
+        args.keras_model, args.output, 'float16' if args.float16 else 'float32', args.sequence_length, args.data_range
+    )
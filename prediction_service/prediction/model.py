@@ -1,8 +1,39 @@
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense
-from tensorflow.keras.callbacks import EarlyStopping
+
+# TensorFlow takes seconds and hundreds of MB to import, so it is only
+# imported when a model is built (or by warm_up)
+
+
+def build_model(sequence_length):
+    """
+    The compiled 2xLSTM(50) + Dense(25) + Dense(1) network.
+    """
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import LSTM, Dense
+
+    model = Sequential([
+        LSTM(50, return_sequences=True, input_shape=(sequence_length, 1)),
+        LSTM(50, return_sequences=False),
+        Dense(25),
+        Dense(1)
+    ])
+    model.compile(optimizer='adam', loss='mean_squared_error')
+    return model
+
+
+def warm_up(sequence_length=50):
+    """
+    Import TensorFlow and run one training step and one prediction on a
+    throwaway model, so the first request doesn't pay for loading the
+    library and initialising its kernels.
+    """
+    X = np.zeros((2, sequence_length, 1))
+    y = np.zeros((2, 1))
+    model = build_model(sequence_length)
+    model.fit(X, y, batch_size=2, epochs=1, verbose=0)
+    model.predict(X, verbose=0)
+
 
 def train_lstm(df):
     """
@@ -60,15 +91,10 @@ def train_lstm(df):
     print(f"Shape of y_val: {y_val.shape}")
 
     # Build the LSTM model
-    model = Sequential([
-        LSTM(50, return_sequences=True, input_shape=(X_train.shape[1], 1)),
-        LSTM(50, return_sequences=False),
-        Dense(25),
-        Dense(1)
-    ])
-    model.compile(optimizer='adam', loss='mean_squared_error')
+    model = build_model(X_train.shape[1])
 
     # Early stopping
+    from tensorflow.keras.callbacks import EarlyStopping
     early_stop = EarlyStopping(monitor='val_loss', patience=5, restore_best_weights=True)
 
     # Train the model
@@ -1,53 +1,135 @@
 from flask import Flask, request, jsonify
-from strategies.analysis_strategies import (
-    RSIOnlyStrategy,
-    MacdOnlyStrategy,
-    AdxOnlyStrategy,
-    CciOnlyStrategy,
-    FullIndicatorStrategy
-)
-import pandas as pd
+from common import instrumentation, profiling, readiness
+from common.instrumentation import compute_timer
+from common.singleflight import SingleFlight, body_key
+
+# pandas, ta and the strategy modules are imported on first use (or by the
+# warm-up) so the service starts answering /health immediately
 
 app = Flask(__name__)
+instrumentation.init_app(app)
+profiling.init_app(app)
+
+# Identical concurrent /analyze requests (same issuer data and strategy) share one computation
+analyze_flight = SingleFlight('analyze')
+
+
+def run_analysis(issuer_data, strategy, label):
+    """
+    Run one strategy over the issuer data and return the JSON response body.
+    """
+    import pandas as pd
+
+    # Load data into a DataFrame
+    df = pd.DataFrame(issuer_data)
+    df['Датум'] = pd.to_datetime(df['Датум'])
+    df = df.sort_values('Датум')
+
+    # Perform analysis
+    with compute_timer(f'analyze_{label}'):
+        result_df = strategy.perform_analysis(df)
+
+    # Convert `Датум` to string for JSON compatibility
+    result_df['Датум'] = result_df['Датум'].dt.strftime('%Y-%m-%d')
+
+    # Serialize once so every coalesced caller reuses the same body
+    return jsonify(result_df.to_dict(orient='records')).get_data()
+
+
+def warm_up_frame(rows=60):
+    """
+    Synthetic prices around 1,000 in the exchange's text format ('1.001,50'),
+    the same as /analyze receives.
+    """
+    import numpy as np
+    import pandas as pd
+
+    # Same conversion as the main app's live_feed.format_mk_number
+    mk_format = str.maketrans(',.', '.,')
+    closes = 1000 + np.cumsum(np.random.default_rng(0).normal(0, 10, rows))
+    return pd.DataFrame({
+        'Датум': pd.date_range('2024-01-01', periods=rows),
+        'Цена_на_последна_трансакција': [f"{close:,.2f}".translate(mk_format) for close in closes],
+        'Мак_': [f"{close + 10:,.2f}".translate(mk_format) for close in closes],
+        'Мин_': [f"{close - 10:,.2f}".translate(mk_format) for close in closes],
+    })
+
+
+def warm_up():
+    """
+    Import pandas, ta and the strategies and run every built-in strategy and
+    a rule once on synthetic prices, so the first /analyze request doesn't
+    pay for the imports.
+    """
+    from strategies.analysis_strategies import STRATEGIES
+    from strategies import sweep  # noqa: F401
+    from strategies.rules import RuleStrategy
+
+    frame = warm_up_frame()
+    instances = [strategy() for strategy in STRATEGIES.values()]
+    instances.append(RuleStrategy.from_spec('RSI < 30 AND MACD > 0 AND price > SMA20'))
+    for instance in instances:
+        instance.perform_analysis(frame.copy())
+
+
+readiness.init_app(app, warm_up)
 
-# Strategy Mapping
-STRATEGIES = {
-    "rsi": RSIOnlyStrategy,
-    "macd": MacdOnlyStrategy,
-    "adx": AdxOnlyStrategy,
-    "cci": CciOnlyStrategy,
-    "full": FullIndicatorStrategy
-}
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
+    from strategies.rules import RuleError, resolve_strategy
+
     try:
         # Parse input data
         data = request.json
         if 'issuer_data' not in data or 'strategy' not in data:
             return jsonify({'error': 'Missing issuer_data or strategy parameter'}), 400
 
-        # Load data into a DataFrame
-        df = pd.DataFrame(data['issuer_data'])
-        df['Датум'] = pd.to_datetime(df['Датум'])
-        df = df.sort_values('Датум')
+        # Get the strategy: a built-in name, a rule such as "RSI < 30 AND price > SMA50",
+        # or {"buy": rule, "sell": rule}
+        try:
+            label, strategy = resolve_strategy(data['strategy'])
+        except RuleError as e:
+            return jsonify({'error': str(e)}), 400
+
+        body = analyze_flight.do(
+            body_key(label, request.get_data()), run_analysis, data['issuer_data'], strategy, label
+        )
+        return app.response_class(body, mimetype='application/json')
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 
-        # Get the strategy
+@app.route('/sweep', methods=['POST'])
+def sweep():
+    import pandas as pd
+    from strategies.sweep import DEFAULT_GRIDS, METRICS, sweep_frame
+
+    try:
+        data = request.json
+        if 'issuer_data' not in data or 'strategy' not in data:
+            return jsonify({'error': 'Missing issuer_data or strategy parameter'}), 400
+
+        if not isinstance(data['strategy'], str):
+            return jsonify({'error': 'strategy must be a string'}), 400
         strategy_name = data['strategy'].lower()
-        strategy_class = STRATEGIES.get(strategy_name)
+        if strategy_name not in DEFAULT_GRIDS:
+            return jsonify({'error': f"Strategy '{strategy_name}' cannot be swept"}), 400
 
-        if not strategy_class:
-            return jsonify({'error': f"Strategy '{strategy_name}' not supported"}), 400
+        metric = data.get('metric', 'sharpe')
+        if metric not in METRICS:
+            return jsonify({'error': f"Metric '{metric}' not supported"}), 400
 
-        # Perform analysis
-        strategy = strategy_class()
-        result_df = strategy.perform_analysis(df)
+        df = pd.DataFrame(data['issuer_data'])
+        with compute_timer(f'sweep_{strategy_name}'):
+            result = sweep_frame(df, strategy_name, data.get('grid'), metric, data.get('top', 5))
 
-        # Convert `Датум` to string for JSON compatibility
-        result_df['Датум'] = result_df['Датум'].dt.strftime('%Y-%m-%d')
+        return jsonify(result)
 
-        # Convert DataFrame to JSON and return
-        return jsonify(result_df.to_dict(orient='records'))
+    except ValueError as e:
+        # Invalid grid, top or issuer data too short for the grid's windows
+        return jsonify({'error': str(e)}), 400
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -4,6 +4,37 @@ from abc import ABC, abstractmethod
 import pandas as pd
 import ta
 
+PRICE_COLUMNS = ('Цена_на_последна_трансакција', 'Мак_', 'Мин_')
+_MK_NUMBER = str.maketrans({'.': None, ',': '.'})
+
+
+def _mk_float(value):
+    if isinstance(value, str):
+        value = value.translate(_MK_NUMBER)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def parse_mk_number(series):
+    """
+    Parse Macedonian-formatted numbers ('1.234,56') into floats.
+    Numeric columns pass through; unparseable values become NaN.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    # A plain loop beats chained .str.replace calls plus pd.to_numeric
+    return pd.Series([_mk_float(value) for value in series.to_numpy()], index=series.index, dtype=float)
+
+
+def parse_price_columns(df):
+    """
+    Convert the price columns from the exchange's text format to floats, in place.
+    """
+    for column in PRICE_COLUMNS:
+        df[column] = parse_mk_number(df[column])
+
 
 class AnalysisStrategy(ABC):
     """
@@ -28,9 +59,7 @@ class RSIOnlyStrategy(AnalysisStrategy):
 
     def perform_analysis(self, df: pd.DataFrame) -> pd.DataFrame:
         # Clean numeric columns
-        df['Цена_на_последна_трансакција'] = df['Цена_на_последна_трансакција'].str.replace(',', '').astype(float)
-        df['Мак_'] = df['Мак_'].str.replace(',', '').astype(float)
-        df['Мин_'] = df['Мин_'].str.replace(',', '').astype(float)
+        parse_price_columns(df)
 
         df['Датум'] = pd.to_datetime(df['Датум'], errors='coerce')
         df = df.dropna(subset=['Цена_на_последна_трансакција', 'Мак_', 'Мин_', 'Датум'])
@@ -66,9 +95,7 @@ class MacdOnlyStrategy(AnalysisStrategy):
 
     def perform_analysis(self, df: pd.DataFrame) -> pd.DataFrame:
         # Clean numeric columns
-        df['Цена_на_последна_трансакција'] = df['Цена_на_последна_трансакција'].str.replace(',', '').astype(float)
-        df['Мак_'] = df['Мак_'].str.replace(',', '').astype(float)
-        df['Мин_'] = df['Мин_'].str.replace(',', '').astype(float)
+        parse_price_columns(df)
 
         df['Датум'] = pd.to_datetime(df['Датум'], errors='coerce')
         df = df.dropna(subset=['Цена_на_последна_трансакција', 'Мак_', 'Мин_', 'Датум'])
@@ -106,9 +133,7 @@ class AdxOnlyStrategy(AnalysisStrategy):
 
     def perform_analysis(self, df: pd.DataFrame) -> pd.DataFrame:
         # Clean numeric columns
-        df['Цена_на_последна_трансакција'] = df['Цена_на_последна_трансакција'].str.replace(',', '').astype(float)
-        df['Мак_'] = df['Мак_'].str.replace(',', '').astype(float)
-        df['Мин_'] = df['Мин_'].str.replace(',', '').astype(float)
+        parse_price_columns(df)
 
         df['Датум'] = pd.to_datetime(df['Датум'], errors='coerce')
         df = df.dropna(subset=['Цена_на_последна_трансакција', 'Мак_', 'Мин_', 'Датум'])
@@ -150,9 +175,7 @@ class CciOnlyStrategy(AnalysisStrategy):
 
     def perform_analysis(self, df: pd.DataFrame) -> pd.DataFrame:
         # Clean numeric columns
-        df['Цена_на_последна_трансакција'] = df['Цена_на_последна_трансакција'].str.replace(',', '').astype(float)
-        df['Мак_'] = df['Мак_'].str.replace(',', '').astype(float)
-        df['Мин_'] = df['Мин_'].str.replace(',', '').astype(float)
+        parse_price_columns(df)
 
         df['Датум'] = pd.to_datetime(df['Датум'], errors='coerce')
         df = df.dropna(subset=['Цена_на_последна_трансакција', 'Мак_', 'Мин_', 'Датум'])
@@ -194,9 +217,7 @@ class FullIndicatorStrategy(AnalysisStrategy):
 
     def perform_analysis(self, df: pd.DataFrame) -> pd.DataFrame:
         # Clean numeric columns
-        df['Цена_на_последна_трансакција'] = df['Цена_на_последна_трансакција'].str.replace(',', '').astype(float)
-        df['Мак_'] = df['Мак_'].str.replace(',', '').astype(float)
-        df['Мин_'] = df['Мин_'].str.replace(',', '').astype(float)
+        parse_price_columns(df)
 
         df['Датум'] = pd.to_datetime(df['Датум'], errors='coerce')
         df = df.dropna(subset=['Цена_на_последна_трансакција', 'Мак_', 'Мин_', 'Датум'])
@@ -280,4 +301,14 @@ class FullIndicatorStrategy(AnalysisStrategy):
             ] = 'Sell'
 
         df['InsufficientData'] = False
-        return df
\ No newline at end of file
+        return df
+
+
+# Strategy name -> class, as accepted by the /analyze endpoint
+STRATEGIES = {
+    "rsi": RSIOnlyStrategy,
+    "macd": MacdOnlyStrategy,
+    "adx": AdxOnlyStrategy,
+    "cci": CciOnlyStrategy,
+    "full": FullIndicatorStrategy
+}
@@ -0,0 +1,268 @@
+# strategies/backtest.py
+
+"""
+Vectorized backtesting of the strategies' Buy/Sell/Hold signals.
+
+Signals are generated per issuer by the existing `perform_analysis`
+implementations (in parallel across processes), then every issuer is placed
+on one shared date axis so positions, P&L and statistics for all issuers are
+computed at once with NumPy array operations.
+
+Trading rules: long-only, one unit per issuer. A Buy enters (or keeps) the
+position at that bar's close, a Sell exits it, Hold keeps the previous state.
+The position earns the next bar's return.
+
+Usage:
+    python -m strategies.backtest --db ../Dians/stock_data.db
+    python -m strategies.backtest --db ../Dians/stock_data.db --strategies rsi full --workers 4 --json
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from strategies.analysis_strategies import STRATEGIES, parse_price_columns
+
+TRADING_DAYS_PER_YEAR = 252
+
+SIGNAL_CODES = {'Buy': 1, 'Sell': -1}
+
+
+def load_issuer_frames(db_path, issuers=None, table='stock_data'):
+    """
+    Read every issuer's history from the main app's database, in the same
+    shape the main app sends to /analyze.
+    """
+    conn = sqlite3.connect(db_path)
+    query = f"SELECT Код_на_издавач, Датум, Цена_на_последна_трансакција, Мак_, Мин_ FROM {table}"
+    df = pd.read_sql_query(query, conn)
+    conn.close()
+
+    if issuers:
+        df = df[df['Код_на_издавач'].isin(issuers)]
+    df['Датум'] = pd.to_datetime(df['Датум'], format='%m/%d/%Y')
+    return {
+        code: group.drop(columns='Код_на_издавач').sort_values('Датум').reset_index(drop=True)
+        for code, group in df.groupby('Код_на_издавач')
+    }
+
+
+def issuer_signals(code, frame, strategy_names):
+    """
+    Run each strategy on one issuer. Returns the issuer's dates, its parsed
+    closing prices and an int8 signal array (1 Buy, -1 Sell, 0 Hold) per strategy.
+    """
+    # Parse once: the strategies get the same numeric prices the P&L is computed on
+    frame = frame.copy()
+    parse_price_columns(frame)
+    dates = frame['Датум'].to_numpy(dtype='datetime64[D]')
+    prices = frame['Цена_на_последна_трансакција'].to_numpy(dtype=np.float64)
+    signals = {}
+    for name in strategy_names:
+        try:
+            result = STRATEGIES[name]().perform_analysis(frame.copy())
+        except (ValueError, IndexError, KeyError):
+            # `ta` fails on some short/degenerate series; those issuers just don't trade
+            continue
+        if 'Signal' not in result or result['InsufficientData'].iloc[0]:
+            continue
+        codes = result['Signal'].map(SIGNAL_CODES).fillna(0).to_numpy(dtype=np.int8)
+        # perform_analysis may drop rows, so re-align to the issuer's own dates
+        positions = np.searchsorted(dates, result['Датум'].to_numpy(dtype='datetime64[D]'))
+        aligned = np.zeros(len(dates), dtype=np.int8)
+        aligned[positions] = codes
+        signals[name] = aligned
+    return code, dates, prices, signals
+
+
+def _issuer_signals_batch(batch, strategy_names):
+    return [issuer_signals(code, frame, strategy_names) for code, frame in batch]
+
+
+def generate_signals(frames, strategy_names, workers=None):
+    """
+    Generate signals for every issuer, spreading issuers over worker processes.
+    """
+    workers = workers or os.cpu_count() or 1
+    items = list(frames.items())
+    if workers == 1:
+        return _issuer_signals_batch(items, strategy_names)
+
+    # A few batches per worker keeps the pool busy without pickling per issuer
+    batches = [items[i::workers * 4] for i in range(workers * 4)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_issuer_signals_batch, batches, [strategy_names] * len(batches))
+        return [entry for batch in results for entry in batch]
+
+
+def build_panel(results, strategy_names):
+    """
+    Place all issuers on one date axis.
+
+    Returns the date axis, a forward-filled (issuers x dates) price matrix,
+    a `listed` mask that is True from each issuer's first trade onwards, and
+    a signal matrix per strategy (0 on days the issuer didn't trade).
+    """
+    axis = np.unique(np.concatenate([dates for _, dates, _, _ in results]))
+    n, t = len(results), len(axis)
+
+    prices = np.full((n, t), np.nan)
+    signals = {name: np.zeros((n, t), dtype=np.int8) for name in strategy_names}
+    for row, (_, dates, issuer_prices, issuer_signal_map) in enumerate(results):
+        columns = np.searchsorted(axis, dates)
+        prices[row, columns] = issuer_prices
+        for name, values in issuer_signal_map.items():
+            signals[name][row, columns] = values
+
+    # Forward-fill prices along the date axis without a Python loop
+    valid = ~np.isnan(prices)
+    last_valid = np.where(valid, np.arange(t), 0)
+    np.maximum.accumulate(last_valid, axis=1, out=last_valid)
+    prices = np.take_along_axis(prices, last_valid, axis=1)
+    listed = np.maximum.accumulate(valid, axis=1)
+    return axis, prices, listed, signals
+
+
+def signals_to_positions(signals):
+    """
+    Turn an (issuers x dates) signal matrix into long-only positions:
+    1 after a Buy, 0 after a Sell, previous state on Hold.
+    """
+    t = signals.shape[1]
+    last_signal = np.where(signals != 0, np.arange(t), -1)
+    np.maximum.accumulate(last_signal, axis=1, out=last_signal)
+    state = np.take_along_axis(signals, np.clip(last_signal, 0, None), axis=1)
+    return ((last_signal >= 0) & (state == 1)).astype(np.float64)
+
+
+def evaluate(prices, listed, positions):
+    """
+    Compute P&L statistics for every issuer and for an equal-weighted
+    portfolio of all listed issuers.
+    """
+    asset_returns = np.zeros_like(prices)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        asset_returns[:, 1:] = prices[:, 1:] / prices[:, :-1] - 1
+    asset_returns[~listed | ~np.isfinite(asset_returns)] = 0.0
+
+    # Yesterday's position earns today's return
+    held = np.zeros_like(positions)
+    held[:, 1:] = positions[:, :-1]
+    strategy_returns = held * asset_returns
+
+    equity = np.cumprod(1 + strategy_returns, axis=1)
+    drawdowns = equity / np.maximum.accumulate(equity, axis=1) - 1
+
+    in_market = (held > 0) & (asset_returns != 0)
+    wins = (strategy_returns > 0) & in_market
+    trades = np.abs(np.diff(positions, axis=1, prepend=0)).sum(axis=1)
+    listed_days = listed.sum(axis=1)
+
+    # Equal weight across issuers listed on each day
+    listed_count = listed.sum(axis=0)
+    portfolio_returns = np.divide(strategy_returns.sum(axis=0), listed_count,
+                                  out=np.zeros(listed.shape[1]), where=listed_count > 0)
+    portfolio_equity = np.cumprod(1 + portfolio_returns)
+    portfolio_drawdown = portfolio_equity / np.maximum.accumulate(portfolio_equity) - 1
+    years = max(listed.shape[1] / TRADING_DAYS_PER_YEAR, 1e-9)
+
+    return {
+        'issuers': {
+            'total_return': equity[:, -1] - 1,
+            'max_drawdown': drawdowns.min(axis=1),
+            'hit_rate': np.divide(wins.sum(axis=1), in_market.sum(axis=1),
+                                  out=np.full(len(prices), np.nan), where=in_market.sum(axis=1) > 0),
+            'turnover': np.divide(trades, listed_days, out=np.zeros(len(prices)), where=listed_days > 0),
+            'trades': trades,
+        },
+        'portfolio': {
+            'total_return': float(portfolio_equity[-1] - 1),
+            'annualized_return': float(portfolio_equity[-1] ** (1 / years) - 1),
+            'annualized_volatility': float(portfolio_returns.std() * np.sqrt(TRADING_DAYS_PER_YEAR)),
+            'max_drawdown': float(portfolio_drawdown.min()),
+            'hit_rate': float(wins.sum() / in_market.sum()) if in_market.any() else None,
+            'turnover': float(trades.sum() / listed_days.sum()) if listed_days.sum() else 0.0,
+            'trades': int(trades.sum()),
+            'exposure': float(held[listed].mean()) if listed.any() else 0.0,
+        },
+    }
+
+
+def run_backtest(frames, strategy_names=None, workers=None):
+    """
+    Backtest the given strategies over all issuer frames.
+    Returns per-strategy portfolio statistics, per-issuer statistics and timings.
+    """
+    strategy_names = strategy_names or list(STRATEGIES)
+    timings = {}
+
+    start = time.perf_counter()
+    results = generate_signals(frames, strategy_names, workers)
+    timings['signals_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    axis, prices, listed, signals = build_panel(results, strategy_names)
+    codes = [code for code, _, _, _ in results]
+    report = {}
+    for name in strategy_names:
+        stats = evaluate(prices, listed, signals_to_positions(signals[name]))
+        report[name] = {
+            'portfolio': stats['portfolio'],
+            'issuers': {
+                code: {metric: float(values[i]) for metric, values in stats['issuers'].items()}
+                for i, code in enumerate(codes)
+            },
+        }
+    buy_and_hold = evaluate(prices, listed, listed.astype(np.float64))
+    timings['evaluation_s'] = time.perf_counter() - start
+
+    return {
+        'strategies': report,
+        'buy_and_hold': buy_and_hold['portfolio'],
+        'issuers': len(codes),
+        'dates': len(axis),
+        'timings': timings,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the analysis strategies over all issuers.")
+    parser.add_argument('--db', default=os.path.join('..', 'Dians', 'stock_data.db'))
+    parser.add_argument('--strategies', nargs='+', choices=sorted(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument('--issuers', nargs='+', help="restrict to these issuer codes")
+    parser.add_argument('--workers', type=int, help="worker processes (default: all cores)")
+    parser.add_argument('--json', action='store_true', help="print the full report, including per-issuer stats")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    frames = load_issuer_frames(args.db, args.issuers)
+    load_time = time.perf_counter() - start
+    report = run_backtest(frames, args.strategies, args.workers)
+    report['timings']['load_s'] = load_time
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['issuers']} issuers, {report['dates']} trading days")
+    print(f"{'strategy':<14} {'return':>9} {'ann.ret':>9} {'ann.vol':>9} {'max DD':>9} {'hit rate':>9} "
+          f"{'turnover':>9} {'trades':>8}")
+    rows = [(name, stats['portfolio']) for name, stats in report['strategies'].items()]
+    rows.append(('buy & hold', report['buy_and_hold']))
+    for name, p in rows:
+        hit_rate = f"{p['hit_rate']:>9.1%}" if p['hit_rate'] is not None else f"{'-':>9}"
+        print(f"{name:<14} {p['total_return']:>9.1%} {p['annualized_return']:>9.1%} "
+              f"{p['annualized_volatility']:>9.1%} {p['max_drawdown']:>9.1%} {hit_rate} "
+              f"{p['turnover']:>9.3f} {p['trades']:>8}")
+    t = report['timings']
+    print(f"load {t['load_s']:.2f}s, signals {t['signals_s']:.2f}s, evaluation {t['evaluation_s']:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
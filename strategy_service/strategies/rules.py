@@ -0,0 +1,392 @@
+# strategies/rules.py
+
+"""
+A small rule language for building strategies from indicators, e.g.
+
+    RSI < 30 AND MACD > 0 AND price > SMA50
+    (CCI < -100 OR RSI(7) < 20) AND NOT ADX < 20
+
+Grammar (keywords and names are case-insensitive):
+
+    rule       := or_expr
+    or_expr    := and_expr ('OR' and_expr)*
+    and_expr   := not_expr ('AND' not_expr)*
+    not_expr   := 'NOT' not_expr | comparison
+    comparison := sum (('<' | '<=' | '>' | '>=' | '==' | '!=') sum)?
+    sum        := product (('+' | '-') product)*
+    product    := unary (('*' | '/') unary)*
+    unary      := '-' unary | NUMBER | series | '(' or_expr ')'
+    series     := PRICE | CLOSE | HIGH | LOW | INDICATOR | INDICATOR '(' NUMBER (',' NUMBER)* ')'
+
+Indicators are SMA/EMA (window required, `SMA50` or `SMA(50)`), RSI, CCI,
+ADX, MACD and MACD_SIGNAL, with the windows used by the built-in strategies
+as defaults. A rule is parsed and compiled once (cached by its text) into a
+tree of NumPy operations; evaluating it computes only the indicators it
+references, each once, on a shared `IndicatorFrame`.
+"""
+
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+import ta
+
+from strategies.analysis_strategies import AnalysisStrategy, parse_price_columns
+
+
+class RuleError(ValueError):
+    """
+    Raised for rules that don't parse or reference unknown indicators.
+    """
+
+
+def _sma(frame, window):
+    return frame.close.rolling(window=window).mean()
+
+
+def _ema(frame, window):
+    return frame.close.ewm(span=window, adjust=False).mean()
+
+
+def _rsi(frame, window):
+    return ta.momentum.RSIIndicator(frame.close, window=window).rsi()
+
+
+def _cci(frame, window):
+    return ta.trend.CCIIndicator(high=frame.high, low=frame.low, close=frame.close, window=window).cci()
+
+
+def _adx(frame, window):
+    return ta.trend.ADXIndicator(high=frame.high, low=frame.low, close=frame.close, window=window).adx()
+
+
+def _macd(frame, fast, slow):
+    return ta.trend.MACD(frame.close, window_fast=fast, window_slow=slow).macd()
+
+
+def _macd_signal(frame, fast, slow, signal):
+    return ta.trend.MACD(frame.close, window_fast=fast, window_slow=slow, window_sign=signal).macd_signal()
+
+
+# Name -> (function, default parameters); None means the parameter is required
+INDICATORS = {
+    'SMA': (_sma, (None,)),
+    'EMA': (_ema, (None,)),
+    'RSI': (_rsi, (14,)),
+    'CCI': (_cci, (20,)),
+    'ADX': (_adx, (14,)),
+    'MACD': (_macd, (12, 26)),
+    'MACD_SIGNAL': (_macd_signal, (12, 26, 9)),
+}
+
+PRICE_SERIES = {'PRICE': 'close', 'CLOSE': 'close', 'HIGH': 'high', 'LOW': 'low'}
+
+COMPARISONS = {
+    '<': np.less, '<=': np.less_equal, '>': np.greater,
+    '>=': np.greater_equal, '==': np.equal, '!=': np.not_equal,
+}
+ARITHMETIC = {'+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide}
+
+_TOKEN = re.compile(r"\s*(?:(\d+(?:\.\d+)?)|([A-Za-z_][A-Za-z_0-9]*)|(<=|>=|==|!=|[<>()+\-*/,]))")
+
+
+def tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match:
+            raise RuleError(f"Unexpected character {text[position:].lstrip()[0]!r} at position {position}")
+        number, name, symbol = match.groups()
+        if number:
+            tokens.append(('number', float(number)))
+        elif name:
+            tokens.append(('name', name.upper()))
+        else:
+            tokens.append(('symbol', symbol))
+        position = match.end()
+    return tokens
+
+
+class IndicatorFrame:
+    """
+    Price series for one issuer plus every indicator computed from them so
+    far. Indicators are computed on first use and shared by all rules
+    evaluated on the same frame.
+    """
+
+    def __init__(self, close, high, low):
+        self.close = close.reset_index(drop=True)
+        self.high = high.reset_index(drop=True)
+        self.low = low.reset_index(drop=True)
+        self.columns = {}
+
+    def __len__(self):
+        return len(self.close)
+
+    def series(self, key):
+        if key not in self.columns:
+            name, params = key
+            if name in PRICE_SERIES:
+                values = getattr(self, PRICE_SERIES[name])
+            else:
+                values = INDICATORS[name][0](self, *params)
+            self.columns[key] = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+        return self.columns[key]
+
+
+def column_name(key):
+    """
+    Output column for an indicator: 'RSI' and 'SMA50' for the defaults the
+    chart already knows, 'RSI7' or 'MACD5_35' otherwise.
+    """
+    name, params = key
+    defaults = INDICATORS[name][1]
+    if params == defaults:
+        return name
+    return name + '_'.join(str(param) for param in params)
+
+
+class _Parser:
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.position = 0
+        self.indicators = set()
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def expect(self, symbol):
+        kind, value = self.take()
+        if (kind, value) != ('symbol', symbol):
+            raise RuleError(f"Expected '{symbol}' in rule {self.text!r}")
+
+    def parse(self):
+        if not self.tokens:
+            raise RuleError("Empty rule")
+        node = self.or_expr()
+        if self.position != len(self.tokens):
+            raise RuleError(f"Unexpected {self.peek()[1]!r} in rule {self.text!r}")
+        if node[0] != 'bool':
+            raise RuleError(f"Rule {self.text!r} must be a condition, e.g. 'RSI < 30'")
+        return node
+
+    # Each node is (type, evaluate) where type is 'bool' or 'number' and
+    # evaluate(frame) returns a NumPy array (or a scalar for constants).
+
+    def _boolean(self, node):
+        if node[0] != 'bool':
+            raise RuleError(f"AND/OR/NOT need conditions in rule {self.text!r}")
+        return node[1]
+
+    def or_expr(self):
+        node = self.and_expr()
+        while self.peek() == ('name', 'OR'):
+            self.take()
+            left, right = self._boolean(node), self._boolean(self.and_expr())
+            node = ('bool', lambda frame, left=left, right=right: left(frame) | right(frame))
+        return node
+
+    def and_expr(self):
+        node = self.not_expr()
+        while self.peek() == ('name', 'AND'):
+            self.take()
+            left, right = self._boolean(node), self._boolean(self.not_expr())
+            node = ('bool', lambda frame, left=left, right=right: left(frame) & right(frame))
+        return node
+
+    def not_expr(self):
+        if self.peek() == ('name', 'NOT'):
+            self.take()
+            operand = self._boolean(self.not_expr())
+            return ('bool', lambda frame: ~operand(frame))
+        return self.comparison()
+
+    def comparison(self):
+        node = self.sum()
+        kind, value = self.peek()
+        if kind == 'symbol' and value in COMPARISONS:
+            self.take()
+            right = self.sum()
+            if node[0] != 'number' or right[0] != 'number':
+                raise RuleError(f"Comparisons need numbers or indicators in rule {self.text!r}")
+            op, left, right = COMPARISONS[value], node[1], right[1]
+            # NaN (indicator not warmed up yet) compares False, as in pandas
+            return ('bool', lambda frame: op(left(frame), right(frame)))
+        return node
+
+    def _arithmetic(self, next_level, symbols):
+        node = next_level()
+        while self.peek()[0] == 'symbol' and self.peek()[1] in symbols:
+            op = ARITHMETIC[self.take()[1]]
+            right = next_level()
+            if node[0] != 'number' or right[0] != 'number':
+                raise RuleError(f"Arithmetic needs numbers or indicators in rule {self.text!r}")
+            left, right = node[1], right[1]
+            node = ('number', lambda frame, op=op, left=left, right=right: op(left(frame), right(frame)))
+        return node
+
+    def sum(self):
+        return self._arithmetic(self.product, '+-')
+
+    def product(self):
+        return self._arithmetic(self.unary, '*/')
+
+    def unary(self):
+        kind, value = self.take()
+        if (kind, value) == ('symbol', '-'):
+            operand = self.unary()
+            if operand[0] != 'number':
+                raise RuleError(f"Unary minus needs a number in rule {self.text!r}")
+            return ('number', lambda frame: -operand[1](frame))
+        if kind == 'number':
+            return ('number', lambda frame: value)
+        if (kind, value) == ('symbol', '('):
+            node = self.or_expr()
+            self.expect(')')
+            return node
+        if kind == 'name':
+            key = self.series(value)
+            self.indicators.add(key)
+            return ('number', lambda frame: frame.series(key))
+        raise RuleError(f"Unexpected {value!r} in rule {self.text!r}" if value else f"Rule {self.text!r} ends early")
+
+    def series(self, name):
+        if name in PRICE_SERIES:
+            return (name, ())
+
+        # SMA50 is shorthand for SMA(50)
+        match = re.fullmatch(r"([A-Z_]*[A-Z])(\d+)", name)
+        if match and match.group(1) in INDICATORS:
+            name, params = match.group(1), [int(match.group(2))]
+        elif name in INDICATORS:
+            params = []
+        else:
+            raise RuleError(f"Unknown indicator '{name}'. Known: {', '.join(sorted([*INDICATORS, *PRICE_SERIES]))}")
+
+        if self.peek() == ('symbol', '(') and not params:
+            self.take()
+            while True:
+                kind, value = self.take()
+                if kind != 'number' or value != int(value) or value < 1:
+                    raise RuleError(f"{name} parameters must be positive integers")
+                params.append(int(value))
+                if self.peek() != ('symbol', ','):
+                    break
+                self.take()
+            self.expect(')')
+
+        defaults = INDICATORS[name][1]
+        if len(params) > len(defaults):
+            raise RuleError(f"{name} takes at most {len(defaults)} parameter(s)")
+        params = tuple(params) + defaults[len(params):]
+        if None in params:
+            raise RuleError(f"{name} needs a window, e.g. {name}50")
+        return (name, params)
+
+
+class CompiledRule:
+    """
+    A parsed rule: `evaluate(frame)` returns a boolean array, `indicators`
+    lists the (name, params) keys it reads.
+    """
+
+    def __init__(self, text, evaluate, indicators):
+        self.text = text
+        self.evaluate = evaluate
+        self.indicators = frozenset(indicators)
+
+    def __call__(self, frame):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = self.evaluate(frame)
+        # Constant rules ("1 < 2") evaluate to a scalar
+        return np.broadcast_to(np.asarray(result, dtype=bool), (len(frame),))
+
+
+@functools.lru_cache(maxsize=256)
+def compile_rule(text):
+    """
+    Parse and compile a rule. Cached, so a rule sent with every request is
+    only parsed the first time.
+    """
+    parser = _Parser(text)
+    node = parser.parse()
+    return CompiledRule(text, node[1], parser.indicators)
+
+
+class RuleStrategy(AnalysisStrategy):
+    """
+    Strategy defined by a Buy rule and an optional Sell rule; Buy wins if
+    both hold on the same day, neither means Hold.
+    """
+
+    def __init__(self, buy, sell=None):
+        self.buy = compile_rule(buy)
+        self.sell = compile_rule(sell) if sell else None
+
+    @classmethod
+    def from_spec(cls, spec):
+        """
+        Build from the /analyze `strategy` field: a rule string (Buy rule)
+        or {'buy': ..., 'sell': ...}.
+        """
+        if isinstance(spec, str):
+            return cls(spec)
+        if isinstance(spec, dict) and isinstance(spec.get('buy'), str):
+            sell = spec.get('sell')
+            if sell is not None and not isinstance(sell, str):
+                raise RuleError("'sell' must be a rule string")
+            return cls(spec['buy'], sell)
+        raise RuleError("A rule strategy is a rule string or {'buy': rule, 'sell': rule}")
+
+    def perform_analysis(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Clean numeric columns the same way as the built-in strategies
+        parse_price_columns(df)
+
+        df['Датум'] = pd.to_datetime(df['Датум'], errors='coerce')
+        df = df.dropna(subset=['Цена_на_последна_трансакција', 'Мак_', 'Мин_', 'Датум'])
+        df = df.sort_values('Датум')
+
+        if len(df) < 3:
+            df['InsufficientData'] = True
+            return df
+
+        frame = IndicatorFrame(df['Цена_на_последна_трансакција'], df['Мак_'], df['Мин_'])
+        try:
+            buy = self.buy(frame)
+            sell = self.sell(frame) if self.sell else np.zeros(len(frame), dtype=bool)
+        except (ValueError, IndexError):
+            # An indicator window longer than the history
+            df['InsufficientData'] = True
+            return df
+
+        for key, values in frame.columns.items():
+            if key[0] not in PRICE_SERIES:
+                df[column_name(key)] = values
+        df['Signal'] = np.select([buy, sell], ['Buy', 'Sell'], default='Hold')
+        df['InsufficientData'] = False
+        return df
+
+
+def resolve_strategy(spec):
+    """
+    The strategy for an /analyze `strategy` field: a built-in name, a rule
+    such as "RSI < 30 AND price > SMA50", or {"buy": rule, "sell": rule}.
+    Returns (label, strategy); raises RuleError for anything else.
+    """
+    from strategies.analysis_strategies import STRATEGIES
+
+    if isinstance(spec, str) and spec.lower() in STRATEGIES:
+        return spec.lower(), STRATEGIES[spec.lower()]()
+    try:
+        return 'rule', RuleStrategy.from_spec(spec)
+    except RuleError as e:
+        raise RuleError(f"Strategy {spec!r} is not supported or is not a valid rule: {e}") from e
@@ -0,0 +1,330 @@
+# strategies/sweep.py
+
+"""
+Parameter sweeps for the strategies' windows and thresholds.
+
+Instead of re-running `perform_analysis` once per combination, each sweep
+computes the indicator for every window at once (a windows x dates array)
+and broadcasts the thresholds against it, giving one boolean signal array
+for the whole grid, e.g. (windows, lower, upper, dates) for RSI. Positions
+and P&L for all combinations are then evaluated together.
+
+Usage:
+    python -m strategies.sweep --db ../Dians/stock_data.db --strategy rsi --issuers ALK KMB
+    python -m strategies.sweep --db ../Dians/stock_data.db --strategy sma --metric total_return
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import ta
+
+from strategies.analysis_strategies import PRICE_COLUMNS, parse_mk_number
+from strategies.backtest import TRADING_DAYS_PER_YEAR, load_issuer_frames, signals_to_positions
+
+DEFAULT_GRIDS = {
+    'rsi': {'window': list(range(5, 31)), 'lower': [20, 25, 30, 35, 40, 45], 'upper': [55, 60, 65, 70, 75, 80]},
+    'cci': {'window': list(range(10, 41, 2)), 'threshold': [50, 75, 100, 125, 150, 175, 200]},
+    'adx': {'window': [7, 10, 14, 20, 28], 'threshold': [15, 20, 25, 30, 35, 40]},
+    'sma': {'fast': [5, 10, 15, 20, 25, 30], 'slow': [20, 30, 40, 50, 60, 70, 80, 90, 100]},
+}
+
+METRICS = ('sharpe', 'total_return', 'max_drawdown')
+
+# Grid axes that are indicator windows; a sweep needs more rows than the largest
+WINDOW_AXES = ('window', 'fast', 'slow')
+
+# Limits on user-supplied grids; every combination costs a (dates,) float row
+# in grid_stats. The default grids stay inside them.
+MAX_COMBINATIONS = 1000
+MAX_AXIS_VALUES = 64
+MAX_WINDOW = 250
+
+# Floats per (windows, dates, widest window) block in cci_windows (32 MiB)
+CCI_BLOCK_CELLS = 1 << 22
+
+
+def ewm_windows(x, windows, block=128):
+    """
+    Wilder/EWM smoothing (alpha = 1/window, adjust=False, min_periods=window)
+    of one series for many windows at once. Returns a (windows, dates) array.
+
+    The recursion y[t] = (1 - a) * y[t-1] + a * x[t] is solved in closed form
+    inside blocks of `block` dates with a cumulative sum, carrying the last
+    value between blocks, so only len(x) / block Python iterations are needed.
+    """
+    windows = np.asarray(windows, dtype=np.float64)
+    if len(x) == 0:
+        raise ValueError("Cannot smooth an empty series")
+    if windows.min() < 2:
+        raise ValueError("EWM windows must be at least 2")
+    decay = (1 - 1 / windows)[:, None]
+    alpha = (1 / windows)[:, None]
+    t = len(x)
+    out = np.empty((len(windows), t))
+
+    steps = np.arange(block)
+    growth = decay ** -steps           # decay^-i, bounded by 2^block for window >= 2
+    shrink = decay ** steps            # decay^j
+    carry = np.full(len(windows), x[0], dtype=np.float64)  # makes y[0] == x[0]
+    for start in range(0, t, block):
+        chunk = x[start:start + block]
+        n = len(chunk)
+        partial = np.cumsum(chunk[None, :] * growth[:, :n], axis=1)
+        out[:, start:start + n] = decay * shrink[:, :n] * carry[:, None] + alpha * shrink[:, :n] * partial
+        carry = out[:, start + n - 1]
+
+    # Match pandas' min_periods: nothing before `window` observations
+    out[np.arange(t)[None, :] < windows[:, None] - 1] = np.nan
+    return out
+
+
+def rsi_windows(close, windows):
+    """
+    RSI for every window, identical to ta.momentum.RSIIndicator.
+    """
+    diff = np.diff(close, prepend=np.nan)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    ema_up = ewm_windows(up, windows)
+    ema_down = ewm_windows(down, windows)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ema_down == 0, 100.0, 100 - 100 / (1 + ema_up / ema_down))
+
+
+def sma_windows(close, windows):
+    """
+    Simple moving averages for every window from one cumulative sum.
+    """
+    t = len(close)
+    cumulative = np.concatenate(([0.0], np.cumsum(close)))
+    windows = np.asarray(windows)[:, None]
+    ends = np.arange(1, t + 1)[None, :]
+    starts = np.clip(ends - windows, 0, None)
+    out = (cumulative[ends] - cumulative[starts]) / windows
+    out[ends < windows] = np.nan
+    return out
+
+
+def cci_windows(high, low, close, windows, constant=0.015):
+    """
+    CCI for every window, identical to ta.trend.CCIIndicator. The typical
+    price is viewed as (dates, max window) trailing windows once and each
+    window masks off the columns it doesn't use. Windows are processed in
+    blocks of about CCI_BLOCK_CELLS floats to bound the 3-D temporaries.
+    """
+    typical = (high + low + close) / 3.0
+    windows = np.asarray(windows)
+    widest = windows.max()
+    padded = np.concatenate((np.full(widest - 1, np.nan), typical))
+    trailing = np.lib.stride_tricks.sliding_window_view(padded, widest)      # (dates, widest)
+    out = np.empty((len(windows), len(typical)))
+    step = max(1, CCI_BLOCK_CELLS // max(1, trailing.size))
+    for start in range(0, len(windows), step):
+        block = windows[start:start + step]
+        used = np.arange(widest)[None, :] >= (widest - block)[:, None]         # (block, widest)
+        values = np.where(used[:, None, :], trailing[None, :, :], 0.0)          # (block, dates, widest)
+        mean = values.sum(axis=2) / block[:, None]
+        deviation = np.where(used[:, None, :], np.abs(trailing[None, :, :] - mean[:, :, None]), 0.0)
+        mad = deviation.sum(axis=2) / block[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[start:start + step] = (typical[None, :] - mean) / (constant * mad)
+    return out
+
+
+def adx_windows(high, low, close, windows):
+    """
+    ADX for every window. ta's ADX has no closed form, so it is computed once
+    per window; the thresholds are still broadcast against the result.
+    """
+    high, low, close = pd.Series(high), pd.Series(low), pd.Series(close)
+    return np.vstack([
+        ta.trend.ADXIndicator(high=high, low=low, close=close, window=int(window)).adx().to_numpy()
+        for window in windows
+    ])
+
+
+def grid_signals(strategy, high, low, close, grid):
+    """
+    Build the int8 signal array (1 Buy, -1 Sell, 0 Hold) for a whole grid.
+    Returns the signals with shape (*grid dims, dates) and the grid axis names.
+    """
+    if strategy == 'rsi':
+        rsi = rsi_windows(close, grid['window'])[:, None, None, :]
+        lower = np.asarray(grid['lower'])[None, :, None, None]
+        upper = np.asarray(grid['upper'])[None, None, :, None]
+        buy, sell = rsi < lower, rsi > upper
+        axes = ('window', 'lower', 'upper')
+    elif strategy == 'cci':
+        cci = cci_windows(high, low, close, grid['window'])[:, None, :]
+        threshold = np.asarray(grid['threshold'])[None, :, None]
+        buy, sell = cci < -threshold, cci > threshold
+        axes = ('window', 'threshold')
+    elif strategy == 'adx':
+        adx = adx_windows(high, low, close, grid['window'])[:, None, :]
+        threshold = np.asarray(grid['threshold'])[None, :, None]
+        # Same rule as AdxOnlyStrategy: strong trend -> Buy, otherwise Sell
+        buy = adx > threshold
+        sell = ~buy & ~np.isnan(adx)
+        axes = ('window', 'threshold')
+    elif strategy == 'sma':
+        fast = sma_windows(close, grid['fast'])[:, None, :]
+        slow = sma_windows(close, grid['slow'])[None, :, :]
+        buy, sell = fast > slow, fast < slow
+        axes = ('fast', 'slow')
+    else:
+        raise ValueError(f"Strategy '{strategy}' cannot be swept")
+
+    signals = buy.astype(np.int8) - sell.astype(np.int8)
+    return signals, axes
+
+
+def grid_stats(close, signals):
+    """
+    Evaluate every combination of a signal grid against one price series.
+    Returns a dict of metric arrays shaped like the grid (without dates).
+    """
+    shape, t = signals.shape[:-1], signals.shape[-1]
+    positions = signals_to_positions(signals.reshape(-1, t))
+
+    asset_returns = np.zeros(t)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        asset_returns[1:] = close[1:] / close[:-1] - 1
+    asset_returns[~np.isfinite(asset_returns)] = 0.0
+
+    held = np.zeros_like(positions)
+    held[:, 1:] = positions[:, :-1]
+    returns = held * asset_returns[None, :]
+
+    equity = np.cumprod(1 + returns, axis=1)
+    std = returns.std(axis=1)
+    sharpe = np.divide(returns.mean(axis=1), std, out=np.zeros(len(std)), where=std > 0) \
+        * np.sqrt(TRADING_DAYS_PER_YEAR)
+    stats = {
+        'sharpe': sharpe,
+        'total_return': equity[:, -1] - 1,
+        'max_drawdown': (equity / np.maximum.accumulate(equity, axis=1) - 1).min(axis=1),
+        'trades': np.abs(np.diff(positions, axis=1, prepend=0)).sum(axis=1),
+    }
+    return {name: values.reshape(shape) for name, values in stats.items()}
+
+
+def _validated_grid(strategy, grid):
+    """
+    The default grid for `strategy` with the axes given in `grid` replaced.
+    Raises ValueError for unknown or malformed axes and for grids beyond
+    MAX_AXIS_VALUES, MAX_WINDOW or MAX_COMBINATIONS.
+    """
+    if strategy not in DEFAULT_GRIDS:
+        raise ValueError(f"Strategy '{strategy}' cannot be swept")
+    grid = grid or {}
+    if not isinstance(grid, dict):
+        raise ValueError("grid must map parameter names to lists of values")
+    unknown = set(grid) - set(DEFAULT_GRIDS[strategy])
+    if unknown:
+        raise ValueError(f"Unknown parameters for '{strategy}': {', '.join(sorted(unknown))}")
+    grid = {**DEFAULT_GRIDS[strategy], **grid}
+    for axis, values in grid.items():
+        if not isinstance(values, list) or not values or not all(isinstance(v, (int, float)) for v in values):
+            raise ValueError(f"'{axis}' must be a non-empty list of numbers")
+        if len(values) > MAX_AXIS_VALUES:
+            raise ValueError(f"'{axis}' has {len(values)} values, at most {MAX_AXIS_VALUES} are allowed")
+        if axis in WINDOW_AXES and not all(isinstance(v, int) and v >= 1 for v in values):
+            raise ValueError(f"'{axis}' must be a list of positive integer windows")
+        if axis in WINDOW_AXES and max(values) > MAX_WINDOW:
+            raise ValueError(f"'{axis}' windows must be at most {MAX_WINDOW}")
+    combinations = int(np.prod([len(values) for values in grid.values()]))
+    if combinations > MAX_COMBINATIONS:
+        raise ValueError(f"Grid has {combinations} combinations, at most {MAX_COMBINATIONS} are allowed")
+    return grid
+
+
+def sweep_frame(frame, strategy, grid=None, metric='sharpe', top=5):
+    """
+    Sweep one issuer's frame (columns as sent to /analyze). Returns the best
+    `top` parameter sets by `metric`, the grid size and the compute time.
+    Raises ValueError for an unknown strategy, metric or grid axis, an empty
+    or oversized grid, a `top` below 1, or a series too short for the grid's
+    windows.
+    """
+    grid = _validated_grid(strategy, grid)
+    if metric not in METRICS:
+        raise ValueError(f"Metric '{metric}' not supported")
+    if not isinstance(top, int) or isinstance(top, bool) or top < 1:
+        raise ValueError("top must be a positive integer")
+    missing = [column for column in ('Датум', *PRICE_COLUMNS) if column not in frame]
+    if missing:
+        raise ValueError(f"issuer_data is missing columns: {', '.join(missing)}")
+    start = time.perf_counter()
+
+    frame = frame.copy()
+    frame['Датум'] = pd.to_datetime(frame['Датум'])
+    frame = frame.sort_values('Датум')
+    close = parse_mk_number(frame['Цена_на_последна_трансакција']).to_numpy()
+    high = parse_mk_number(frame['Мак_']).to_numpy()
+    low = parse_mk_number(frame['Мин_']).to_numpy()
+    valid = ~(np.isnan(close) | np.isnan(high) | np.isnan(low))
+    close, high, low = close[valid], high[valid], low[valid]
+
+    longest = max(max(grid[axis]) for axis in WINDOW_AXES if axis in grid)
+    # ta's ADX smooths twice and needs two windows of history
+    needed = 2 * longest if strategy == 'adx' else longest + 1
+    if len(close) < needed:
+        raise ValueError(f"Need at least {needed} priced rows to sweep windows up to {longest}, got {len(close)}")
+
+    signals, axes = grid_signals(strategy, high, low, close, grid)
+    stats = grid_stats(close, signals)
+
+    # max_drawdown is negative, so "best" is the largest value for every metric
+    order = np.argsort(stats[metric], axis=None)[::-1][:top]
+    best = []
+    for flat_index in order:
+        index = np.unravel_index(flat_index, stats[metric].shape)
+        params = {axis: grid[axis][i] for axis, i in zip(axes, index)}
+        best.append({
+            'params': params,
+            **{name: float(values[index]) for name, values in stats.items()},
+        })
+
+    return {
+        'strategy': strategy,
+        'metric': metric,
+        'rows': int(len(close)),
+        'combinations': int(np.prod(stats[metric].shape)),
+        'best': best,
+        'compute_ms': round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep strategy windows and thresholds.")
+    parser.add_argument('--db', default=os.path.join('..', 'Dians', 'stock_data.db'))
+    parser.add_argument('--strategy', choices=sorted(DEFAULT_GRIDS), default='rsi')
+    parser.add_argument('--issuers', nargs='+', help="issuer codes to sweep (default: all)")
+    parser.add_argument('--metric', choices=METRICS, default='sharpe')
+    parser.add_argument('--top', type=int, default=3)
+    parser.add_argument('--grid', type=json.loads, help='JSON overriding grid axes, e.g. \'{"window": [7, 14, 21]}\'')
+    args = parser.parse_args()
+
+    frames = load_issuer_frames(args.db, args.issuers)
+    start = time.perf_counter()
+    for code, frame in frames.items():
+        try:
+            result = sweep_frame(frame, args.strategy, args.grid, args.metric, args.top)
+        except ValueError as e:
+            print(f"{code:<8} skipped: {e}")
+            continue
+        best = result['best'][0] if result['best'] else None
+        if best:
+            print(f"{code:<8} {result['rows']:>5} rows  {result['combinations']} combos  "
+                  f"{result['compute_ms']:>7.1f} ms  best {best['params']} "
+                  f"{args.metric}={best[args.metric]:.3f} return={best['total_return']:.1%}")
+    print(f"{len(frames)} issuers swept in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# tests/conftest.py
+
+"""
+Shared fixtures. Importing `benchmarks` puts the repository root and every
+service directory on sys.path, the same way the benchmarks import the
+services, so tests can import `models`, `strategies` and `prediction`.
+"""
+
+import pytest
+
+import benchmarks  # noqa: F401
+from benchmarks.synthetic_data import generate_database
+
+
+@pytest.fixture(scope='session')
+def synthetic_db(tmp_path_factory):
+    """
+    A small synthetic stock_data database in the scraper's formats.
+    """
+    path = str(tmp_path_factory.mktemp('data') / 'stock_data.db')
+    generate_database(path, issuers=12, years=2, seed=7)
+    return path
+
+
+@pytest.fixture(scope='session')
+def issuer_frames(synthetic_db):
+    """
+    Every issuer's history, shaped like the /analyze payload.
+    """
+    from strategies.backtest import load_issuer_frames
+    return load_issuer_frames(synthetic_db)
+
+
+@pytest.fixture(scope='session')
+def issuer_frame(issuer_frames):
+    """
+    The history of the issuer with the most rows.
+    """
+    return max(issuer_frames.values(), key=len)
+
+
+@pytest.fixture
+def main_db(synthetic_db, monkeypatch):
+    """
+    Point the main app's models at the synthetic database.
+    """
+    from models import stock_model
+    monkeypatch.setattr(stock_model, 'DB_NAME', synthetic_db)
+    return synthetic_db
+
+
+@pytest.fixture
+def main_app(main_db):
+    """
+    The main app, reading the synthetic database.
+    """
+    from benchmarks.harness import load_service_app
+    return load_service_app('main_app').create_app()
+
+
+@pytest.fixture
+def main_client(main_app):
+    return main_app.test_client()
+
+
+@pytest.fixture(scope='session')
+def strategy_app():
+    """
+    The strategy service's app module.
+    """
+    from benchmarks.harness import load_service_app
+    return load_service_app('strategy_service')
+
+
+@pytest.fixture(scope='session')
+def strategy_client(strategy_app):
+    """
+    A test client for the strategy service.
+    """
+    return strategy_app.app.test_client()
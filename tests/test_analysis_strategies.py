@@ -0,0 +1,58 @@
+# tests/test_analysis_strategies.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies.analysis_strategies import (
+    AdxOnlyStrategy,
+    CciOnlyStrategy,
+    FullIndicatorStrategy,
+    MacdOnlyStrategy,
+    RSIOnlyStrategy,
+    parse_mk_number,
+    parse_price_columns,
+)
+
+STRATEGIES = [RSIOnlyStrategy, MacdOnlyStrategy, AdxOnlyStrategy, CciOnlyStrategy, FullIndicatorStrategy]
+
+
+def test_parse_mk_number():
+    values = pd.Series(['1.234,56', '305,00', '24.800,00', '0,5', '', None, 'n/a'])
+    np.testing.assert_array_equal(
+        parse_mk_number(values), [1234.56, 305.0, 24800.0, 0.5, np.nan, np.nan, np.nan],
+    )
+
+
+def test_parse_mk_number_passes_numbers_through():
+    values = pd.Series([1234.5, 2.0], index=[3, 7])
+    result = parse_mk_number(values)
+    assert result.dtype == float
+    pd.testing.assert_series_equal(result, values)
+    np.testing.assert_array_equal(parse_mk_number(pd.Series([305, 24800])), [305.0, 24800.0])
+
+
+def test_parse_price_columns():
+    frame = pd.DataFrame({
+        'Цена_на_последна_трансакција': ['305,00'], 'Мак_': ['1.234,56'], 'Мин_': [300.5], 'Датум': ['1/2/2020'],
+    })
+    parse_price_columns(frame)
+    assert frame.iloc[0].tolist() == [305.0, 1234.56, 300.5, '1/2/2020']
+
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+def test_strategies_keep_exchange_prices(issuer_frame, strategy):
+    # The old str.replace(',', '') parse turned '305,00' into 30500 and '24.800,00' into 24.8
+    result = strategy().perform_analysis(issuer_frame.copy())
+    expected = parse_mk_number(issuer_frame['Цена_на_последна_трансакција'])
+    np.testing.assert_allclose(result['Цена_на_последна_трансакција'], expected.loc[result.index])
+
+
+def test_warm_up_frame_is_in_exchange_format(strategy_app):
+    frame = strategy_app.warm_up_frame()
+    assert frame['Цена_на_последна_трансакција'].str.contains(r'^\d{1,3}(?:\.\d{3})*,\d{2}$').all()
+    parse_price_columns(frame)
+    close, high, low = (frame[column] for column in ('Цена_на_последна_трансакција', 'Мак_', 'Мин_'))
+    assert close.between(800, 1200).all()
+    np.testing.assert_allclose(high - close, 10, atol=0.011)
+    np.testing.assert_allclose(close - low, 10, atol=0.011)
@@ -0,0 +1,86 @@
+# tests/test_backtest.py
+
+import numpy as np
+import pytest
+
+from strategies.backtest import build_panel, evaluate, issuer_signals, signals_to_positions
+
+
+def _days(*offsets):
+    return np.datetime64('2024-01-01') + np.array(offsets, dtype='timedelta64[D]')
+
+
+def test_signals_to_positions():
+    signals = np.array([
+        [0, 1, 0, 0, -1, 0, 1, -1, -1, 0],
+        [-1, 0, 1, 1, 0, 0, 0, 0, 0, -1],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    ], dtype=np.int8)
+    np.testing.assert_array_equal(signals_to_positions(signals), [
+        [0, 1, 1, 1, 0, 0, 1, 0, 0, 0],
+        [0, 0, 1, 1, 1, 1, 1, 1, 1, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    ])
+
+
+def test_evaluate_known_trades():
+    prices = np.array([
+        [100, 110, 121, 60.5, 60.5],
+        [100, 50, 50, 100, 100],
+    ])
+    listed = np.ones_like(prices, dtype=bool)
+    # Issuer 0 buys on day 0 and sells on day 2, issuer 1 trades in and out twice
+    positions = signals_to_positions(np.array([[1, 0, -1, 0, 0], [1, -1, 1, 0, -1]], dtype=np.int8))
+    np.testing.assert_array_equal(positions, [[1, 1, 0, 0, 0], [1, 0, 1, 1, 0]])
+
+    result = evaluate(prices, listed, positions)
+    issuers, portfolio = result['issuers'], result['portfolio']
+    # Held on days 1-2: +10% twice, and out before the -50% day
+    np.testing.assert_allclose(issuers['total_return'], [0.21, 0.0])
+    np.testing.assert_allclose(issuers['max_drawdown'], [0.0, -0.5])
+    np.testing.assert_allclose(issuers['hit_rate'], [1.0, 0.5])
+    np.testing.assert_array_equal(issuers['trades'], [2, 4])
+    np.testing.assert_allclose(issuers['turnover'], [0.4, 0.8])
+
+    # Equal-weighted daily returns: -20%, +5%, +50%
+    assert portfolio['total_return'] == pytest.approx(0.8 * 1.05 * 1.5 - 1)
+    assert portfolio['max_drawdown'] == pytest.approx(-0.2)
+    assert portfolio['hit_rate'] == pytest.approx(0.75)
+    assert portfolio['trades'] == 6
+    assert portfolio['exposure'] == pytest.approx(0.5)
+
+
+def test_build_panel_aligns_gapped_issuers():
+    results = [
+        ('AAA', _days(0, 1, 2, 3, 4), np.array([10.0, 11, 12, 13, 14]), {'rsi': np.array([1, 0, 0, -1, 0], np.int8)}),
+        # Lists on day 1, doesn't trade on day 3 and has an unparseable price on day 2
+        ('BBB', _days(1, 2, 4), np.array([20.0, np.nan, 30]), {'rsi': np.array([1, 1, -1], np.int8)}),
+    ]
+    axis, prices, listed, signals = build_panel(results, ['rsi', 'macd'])
+
+    np.testing.assert_array_equal(axis, _days(0, 1, 2, 3, 4))
+    np.testing.assert_array_equal(prices, [[10, 11, 12, 13, 14], [np.nan, 20, 20, 20, 30]])
+    np.testing.assert_array_equal(listed, [[1, 1, 1, 1, 1], [0, 1, 1, 1, 1]])
+    np.testing.assert_array_equal(signals['rsi'], [[1, 0, 0, -1, 0], [0, 1, 1, 0, -1]])
+    # Strategies without signals for an issuer leave it flat
+    assert not signals['macd'].any()
+
+
+def test_evaluate_ignores_unlisted_and_gapped_days():
+    results = [('BBB', _days(1, 2, 4), np.array([20.0, np.nan, 30]), {'rsi': np.array([1, 0, 0], np.int8)})]
+    _, prices, listed, signals = build_panel(results + [('AAA', _days(0, 4), np.array([5.0, 5]), {})], ['rsi'])
+    result = evaluate(prices, listed, signals_to_positions(signals['rsi']))
+
+    # Bought at 20 and held through the gap to 30; nothing is NaN
+    np.testing.assert_allclose(result['issuers']['total_return'], [0.5, 0.0])
+    assert all(np.isfinite(value) for value in result['portfolio'].values() if value is not None)
+    assert result['portfolio']['total_return'] == pytest.approx(0.25)
+
+
+def test_issuer_signals_on_exchange_formatted_prices(issuer_frame):
+    code, dates, prices, signals = issuer_signals('X', issuer_frame, ['rsi', 'macd'])
+    assert code == 'X' and len(dates) == len(prices) == len(issuer_frame)
+    assert np.isfinite(prices).all() and prices.min() > 0
+    for values in signals.values():
+        assert values.dtype == np.int8 and len(values) == len(dates)
+        assert set(np.unique(values)) <= {-1, 0, 1}
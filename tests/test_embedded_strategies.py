@@ -0,0 +1,106 @@
+# tests/test_embedded_strategies.py
+
+import pandas as pd
+import pytest
+import requests
+from prometheus_client import REGISTRY
+
+from benchmarks.harness import InProcessTransport
+from controllers import main_controller
+from models import stock_model
+from models.embedded_strategies import RemoteBackoff, StrategyError, analyze_embedded
+
+RULE = {'buy': 'RSI(7) < 30 AND price > SMA20', 'sell': 'RSI(7) > 70'}
+
+
+def _runs(path):
+    return REGISTRY.get_sample_value('strategy_runs_total', {'path': path}) or 0
+
+
+@pytest.fixture
+def issuer_history(main_db):
+    issuer = max(stock_model.get_issuer_codes(), key=lambda code: len(stock_model.get_issuer_data_for_graph(code)))
+    return stock_model.get_issuer_data_for_graph(issuer)
+
+
+@pytest.fixture(scope='module')
+def transport():
+    return InProcessTransport()
+
+
+@pytest.fixture
+def auto_mode(monkeypatch):
+    """
+    STRATEGY_MODE=auto with a fresh backoff on a controllable clock.
+    """
+    clock = [0.0]
+    backoff = RemoteBackoff(10, clock=lambda: clock[0])
+    monkeypatch.setattr(main_controller, 'STRATEGY_MODE', 'auto')
+    monkeypatch.setattr(main_controller, 'strategy_backoff', backoff)
+    return clock
+
+
+@pytest.mark.parametrize('strategy', ['rsi', 'macd', 'adx', 'cci', 'full', RULE])
+def test_embedded_matches_remote(issuer_history, transport, strategy):
+    with transport.patch():
+        remote = main_controller._analyze_remote(issuer_history, strategy)
+    embedded = analyze_embedded(issuer_history, strategy)
+
+    # The remote frame went through JSON: keys sorted, NaN as None
+    pd.testing.assert_frame_equal(
+        embedded.reset_index(drop=True), remote, check_like=True, check_dtype=False, check_exact=False, rtol=1e-12,
+    )
+
+
+def test_embedded_rejects_invalid_rules(issuer_history):
+    with pytest.raises(StrategyError, match="Unknown indicator"):
+        analyze_embedded(issuer_history, {'buy': 'FOO > 1', 'sell': 'RSI > 70'})
+
+
+def test_auto_mode_uses_the_service_when_it_answers(issuer_history, transport, auto_mode):
+    remote = _runs('remote')
+    with transport.patch():
+        result = main_controller._analyze(issuer_history, 'rsi')
+    assert _runs('remote') == remote + 1
+    assert 'Signal' in result
+
+
+def test_auto_mode_falls_back_and_backs_off(issuer_history, auto_mode, monkeypatch):
+    calls = []
+
+    def unavailable(*args, **kwargs):
+        calls.append(1)
+        raise requests.ConnectionError("connection refused")
+
+    monkeypatch.setattr(requests, 'post', unavailable)
+    fallback = _runs('fallback')
+    expected = analyze_embedded(issuer_history, 'rsi')
+
+    result = main_controller._analyze(issuer_history, 'rsi')
+    pd.testing.assert_frame_equal(result, expected)
+    assert len(calls) == 1 and _runs('fallback') == fallback + 1
+
+    # Within the backoff the service isn't called again
+    auto_mode[0] = 9.9
+    main_controller._analyze(issuer_history, 'rsi')
+    assert len(calls) == 1 and _runs('fallback') == fallback + 2
+
+    # Afterwards it is tried again
+    auto_mode[0] = 10.0
+    main_controller._analyze(issuer_history, 'rsi')
+    assert len(calls) == 2 and _runs('fallback') == fallback + 3
+
+
+def test_auto_mode_recovers_after_a_successful_call(issuer_history, transport, auto_mode):
+    main_controller.strategy_backoff.failed()
+    auto_mode[0] = 10.0
+    with transport.patch():
+        main_controller._analyze(issuer_history, 'rsi')
+    assert not main_controller.strategy_backoff.active()
+
+
+def test_auto_mode_passes_invalid_strategies_through(issuer_history, transport, auto_mode):
+    # A 400 is the caller's error, not an outage
+    with transport.patch(), pytest.raises(StrategyError):
+        main_controller._analyze(issuer_history, 'momentum')
+    assert not main_controller.strategy_backoff.active()
@@ -0,0 +1,79 @@
+# tests/test_export_memory.py
+
+"""
+The streaming exports must use the same memory whatever the table size.
+Each export runs in a fresh process (see benchmarks.export_memory) and is
+judged by its peak RSS growth and, for Parquet, by the peak of pyarrow's
+memory pool, since Arrow buffers are invisible to tracemalloc.
+"""
+
+import io
+import os
+
+import pytest
+
+from benchmarks.export_memory import database_for, grew, measure
+from benchmarks.synthetic_data import generate_database
+
+FORMATS = ['csv', 'ndjson', 'parquet']
+TOLERANCE = 1.5
+SLACK = 8 * 2**20
+
+slow = pytest.mark.skipif(
+    os.environ.get('EXPORT_MEMORY_10M') != '1',
+    reason="set EXPORT_MEMORY_10M=1 to export a generated 10M-row table",
+)
+
+
+@pytest.fixture(scope='module')
+def sized_dbs(tmp_path_factory):
+    """
+    Two tables ten times apart in size: about 21k and 210k rows.
+    """
+    directory = tmp_path_factory.mktemp('export')
+    paths = []
+    for issuers in (8, 80):
+        path = str(directory / f'{issuers}.db')
+        generate_database(path, issuers=issuers, years=20, seed=11)
+        paths.append(path)
+    return paths
+
+
+def _assert_flat(paths, fmt):
+    results = [measure(path, fmt) for path in paths]
+    assert results[-1]['size'] > results[0]['size'] * 5
+
+    rss = [result['peak_rss_growth'] for result in results]
+    assert not grew(rss, TOLERANCE, SLACK), f"peak RSS growth {rss}"
+    if fmt == 'parquet':
+        arrow = [result['arrow_peak'] for result in results]
+        assert not grew(arrow, TOLERANCE, 0), f"Arrow pool peaks {arrow}"
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_export_memory_is_flat(sized_dbs, fmt):
+    _assert_flat(sized_dbs, fmt)
+
+
+@slow
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_export_memory_is_flat_at_10m_rows(sized_dbs, fmt):
+    _assert_flat([sized_dbs[0], database_for(10_000_000)], fmt)
+
+
+def test_parquet_row_groups_span_many_batches(main_db):
+    # The writer keeps each row group's metadata until close, so the number
+    # of row groups must follow the row group size, not the batch size
+    import pyarrow.parquet as pq
+    from models.export import iter_parquet
+    from models.stock_model import get_all_stock_data, iter_stock_data
+
+    data = b''.join(iter_parquet(iter_stock_data(batch_size=300), row_group_rows=1000))
+    metadata = pq.ParquetFile(io.BytesIO(data)).metadata
+    sizes = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+
+    rows = get_all_stock_data()
+    assert sum(sizes) == len(rows)
+    assert all(size == 1200 for size in sizes[:-1]) and 0 < sizes[-1] <= 1200
+    table = pq.read_table(io.BytesIO(data))
+    assert table.column('Код_на_издавач').to_pylist() == [row['Код_на_издавач'] for row in rows]
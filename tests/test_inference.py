@@ -0,0 +1,70 @@
+# tests/test_inference.py
+
+import numpy as np
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+
+from prediction.inference import NumpyLSTM
+
+SEQUENCE_LENGTH = 12
+
+
+@pytest.fixture(scope='module')
+def keras_model():
+    pytest.importorskip('tensorflow')
+    from prediction.model import build_model
+    # Untrained weights are random, which exercises every gate just as well
+    return build_model(SEQUENCE_LENGTH)
+
+
+@pytest.fixture(scope='module')
+def windows():
+    rng = np.random.default_rng(3)
+    return rng.random((64, SEQUENCE_LENGTH, 1)).astype(np.float32)
+
+
+def test_numpy_forward_pass_matches_keras(keras_model, windows):
+    expected = keras_model.predict(windows, verbose=0)
+    result = NumpyLSTM.from_keras(keras_model, SEQUENCE_LENGTH).predict(windows)
+    np.testing.assert_allclose(result, expected, atol=1e-5)
+
+
+def test_save_and_load_round_trip(keras_model, windows, tmp_path):
+    scaler = MinMaxScaler(feature_range=(0, 1)).fit(np.array([[460.03], [711.31], [500.0]]))
+    model = NumpyLSTM.from_keras(keras_model, SEQUENCE_LENGTH, scaler)
+
+    model.save(tmp_path / 'model.npz')
+    loaded = NumpyLSTM.load(tmp_path / 'model.npz')
+    assert loaded.sequence_length == SEQUENCE_LENGTH
+    np.testing.assert_array_equal(loaded.predict(windows), model.predict(windows))
+
+    restored = loaded.scaler()
+    for attribute in ('data_min_', 'data_max_', 'scale_', 'min_'):
+        np.testing.assert_allclose(getattr(restored, attribute), getattr(scaler, attribute), rtol=1e-12)
+
+
+def test_float16_weights(keras_model, windows, tmp_path):
+    scaler = MinMaxScaler().fit(np.array([[1.0], [24800.5]]))
+    model = NumpyLSTM.from_keras(keras_model, SEQUENCE_LENGTH, scaler)
+    model.save(tmp_path / 'model.npz', weights_dtype='float16')
+    loaded = NumpyLSTM.load(tmp_path / 'model.npz')
+
+    np.testing.assert_allclose(loaded.predict(windows), model.predict(windows), atol=1e-2)
+    # The scaler range is not rounded to float16
+    assert loaded.scaler().data_max_[0] == 24800.5
+
+
+def test_model_without_scaler(keras_model, tmp_path):
+    NumpyLSTM.from_keras(keras_model, SEQUENCE_LENGTH).save(tmp_path / 'model.npz')
+    assert NumpyLSTM.load(tmp_path / 'model.npz').scaler() is None
+
+
+def test_unsupported_layers_are_rejected():
+    tf = pytest.importorskip('tensorflow')
+    model = tf.keras.Sequential([
+        tf.keras.Input((SEQUENCE_LENGTH, 1)),
+        tf.keras.layers.LSTM(4),
+        tf.keras.layers.Dense(1, activation='relu'),
+    ])
+    with pytest.raises(ValueError, match="Unsupported Dense configuration"):
+        NumpyLSTM.from_keras(model)
@@ -0,0 +1,73 @@
+# tests/test_issuer_search.py
+
+import time
+
+import pytest
+
+from models.issuer_search import IssuerIndex
+
+CODES = ['ALK', 'ALKB', 'KMB', 'KOMU', 'MPT', 'ADIN', 'TEL', 'TTK', 'STB', 'GRNT', '', 'ALK']
+
+
+@pytest.fixture(scope='module')
+def index():
+    return IssuerIndex(CODES)
+
+
+def test_codes_are_sorted_and_unique(index):
+    assert index.codes == ['ADIN', 'ALK', 'ALKB', 'GRNT', 'KMB', 'KOMU', 'MPT', 'STB', 'TEL', 'TTK']
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('al', [('ALK', 'prefix'), ('ALKB', 'prefix')]),
+    (' kmb ', [('KMB', 'prefix')]),
+    ('MB', [('KMB', 'contains')]),
+    ('KMBX', [('KMB', 'fuzzy')]),
+    ('', []),
+    ('XYZQW', []),
+])
+def test_search(index, query, expected):
+    assert index.search(query) == expected
+
+
+def test_prefix_matches_come_before_contains(index):
+    assert index.search('K') == [
+        ('KMB', 'prefix'), ('KOMU', 'prefix'), ('ALK', 'contains'), ('ALKB', 'contains'), ('TTK', 'contains'),
+    ]
+
+
+def test_fuzzy_matches_are_ranked_by_distance(index):
+    assert index.search('ALXB') == [('ALKB', 'fuzzy'), ('ALK', 'fuzzy')]
+    # Equal distances fall back to alphabetical order
+    assert index.search('ALKX') == [('ALK', 'fuzzy'), ('ALKB', 'fuzzy')]
+
+
+def test_short_queries_are_not_fuzzy_matched(index):
+    assert index.search('TE') == [('TEL', 'prefix')]
+
+
+def test_limit(index):
+    assert index.search('K', limit=3) == [('KMB', 'prefix'), ('KOMU', 'prefix'), ('ALK', 'contains')]
+    assert index.search('ALK', limit=1) == [('ALK', 'prefix')]
+    assert index.search('ALXB', limit=1) == [('ALKB', 'fuzzy')]
+
+
+def test_long_queries_match_nothing(index):
+    assert index.max_query_length == len('ALKB') + IssuerIndex.MAX_DISTANCE
+    assert index.search('ALKBXY') == [('ALKB', 'fuzzy')]
+    assert index.search('ALKBXYZ') == []
+
+    start = time.perf_counter()
+    assert index.search('ALKB' * 500) == []
+    assert time.perf_counter() - start < 0.01
+
+
+def test_search_route(main_client):
+    response = main_client.get('/api/issuers/search', query_string={'q': 'a', 'limit': 2})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert 0 < len(results) <= 2
+    assert all(result['code'].startswith('A') and result['match'] == 'prefix' for result in results)
+
+    response = main_client.get('/api/issuers/search', query_string={'q': 'X' * 5000})
+    assert response.status_code == 200 and response.get_json()['results'] == []
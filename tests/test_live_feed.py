@@ -0,0 +1,110 @@
+# tests/test_live_feed.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models import live_feed, stock_model
+from models.incremental_indicators import IndicatorState
+from strategies.analysis_strategies import (
+    AdxOnlyStrategy,
+    CciOnlyStrategy,
+    FullIndicatorStrategy,
+    MacdOnlyStrategy,
+    RSIOnlyStrategy,
+)
+
+STRATEGIES = {
+    'rsi': RSIOnlyStrategy,
+    'macd': MacdOnlyStrategy,
+    'adx': AdxOnlyStrategy,
+    'cci': CciOnlyStrategy,
+    'full': FullIndicatorStrategy,
+}
+INDICATORS = ('SMA10', 'SMA50', 'EMA10', 'EMA50', 'RSI', 'MACD', 'CCI', 'ADX')
+# Before these bars IndicatorState falls back to the last price change,
+# while the batch strategies already see the whole history
+WARM_UP = {'rsi': 13, 'macd': 13, 'adx': 13, 'full': 13, 'cci': 19}
+
+
+def _replay(frame):
+    state = IndicatorState()
+    rows = frame[['Мак_', 'Мин_', 'Цена_на_последна_трансакција']].itertuples(index=False)
+    return [state.update(high, low, close) for high, low, close in rows]
+
+
+@pytest.mark.parametrize('issuer', range(4))
+def test_incremental_indicators_match_batch_strategies(issuer_frames, issuer):
+    frame = sorted(issuer_frames.values(), key=len)[-1 - issuer]
+    batch = {name: strategy().perform_analysis(frame.copy()) for name, strategy in STRATEGIES.items()}
+    updates = _replay(batch['full'])
+
+    for column in INDICATORS:
+        incremental = np.array([np.nan if ind[column] is None else ind[column] for ind, _ in updates])
+        np.testing.assert_allclose(incremental, batch['full'][column].to_numpy(float), rtol=1e-9, atol=1e-9,
+                                   equal_nan=True, err_msg=column)
+
+    for name, result in batch.items():
+        signals = [update[1][name] for update in updates]
+        start = WARM_UP[name]
+        assert signals[start:] == result['Signal'].tolist()[start:], name
+
+
+@pytest.fixture
+def live(main_db, monkeypatch):
+    """
+    A fresh live-feed cache over the synthetic database.
+    """
+    monkeypatch.setattr(live_feed, '_live_issuers', {})
+    monkeypatch.setattr(live_feed, '_live_version', None)
+    issuer = max(stock_model.get_issuer_codes(), key=lambda code: len(stock_model.get_issuer_data_for_graph(code)))
+    return live_feed.get_live_issuer(issuer)
+
+
+def _next_bar(live, days=1, **prices):
+    close = live.last_close
+    return {'date': live.last_date + pd.Timedelta(days=days), 'close': close, 'high': close + 1,
+            'low': close - 1, **prices}
+
+
+def test_ingest_bar_continues_the_replayed_history(live):
+    history = stock_model.get_issuer_data_for_graph(live.issuer)
+    rows = stock_model.get_all_stock_data()
+    bars = live.state.bars
+
+    event = live_feed.ingest_bar(live.issuer, _next_bar(live, close=live.last_close + 0.5))
+
+    assert live.state.bars == bars + 1
+    assert event['date'] == live.last_date.strftime('%Y-%m-%d')
+    # The same bar appended to the history gives the same indicators in one replay
+    state = IndicatorState()
+    history['Датум'] = pd.to_datetime(history['Датум'], format='%m/%d/%Y')
+    prices = history.sort_values('Датум')[['Мак_', 'Мин_', 'Цена_на_последна_трансакција']]
+    prices = prices.apply(lambda column: column.map(live_feed.parse_mk_number)).dropna()
+    for high, low, close in prices.itertuples(index=False):
+        state.update(high, low, close)
+    indicators, signals = state.update(event['high'], event['low'], event['close'])
+    assert event['indicators'] == pytest.approx(indicators) and event['signals'] == signals
+    # Not persisted by default
+    assert len(stock_model.get_all_stock_data()) == len(rows)
+
+
+@pytest.mark.parametrize('days', [0, -3])
+def test_ingest_bar_rejects_dates_not_after_the_last_bar(live, days):
+    bars = live.state.bars
+    with pytest.raises(ValueError, match="is not after the last bar"):
+        live_feed.ingest_bar(live.issuer, _next_bar(live, days))
+    assert live.state.bars == bars
+
+
+@pytest.mark.parametrize('prices', [{'close': 10.0, 'high': 9.0, 'low': 8.0}, {'close': 10.0, 'high': 12.0, 'low': 11.0}])
+def test_ingest_bar_rejects_close_outside_low_and_high(live, prices):
+    bars = live.state.bars
+    with pytest.raises(ValueError, match="close must be between low and high"):
+        live_feed.ingest_bar(live.issuer, _next_bar(live, **prices))
+    assert live.state.bars == bars
+
+
+def test_unknown_issuer(live):
+    with pytest.raises(live_feed.UnknownIssuerError):
+        live_feed.ingest_bar('NOSUCH', {'date': '2030-01-01', 'close': 1.0})
@@ -0,0 +1,95 @@
+# tests/test_market_analytics.py
+
+import shutil
+import sqlite3
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_market import _mk_number, turnover_leaders_row_at_a_time
+from models import market_analytics, stock_model
+from models.market_analytics import MarketAnalytics, get_market_analytics, load_market_frame
+
+
+@pytest.fixture
+def engine(main_db):
+    return MarketAnalytics(load_market_frame())
+
+
+@pytest.fixture
+def rows(main_db):
+    rows = stock_model.get_all_stock_data()
+    for row in rows:
+        row['date'] = datetime.strptime(row['Датум'], '%m/%d/%Y')
+    return rows
+
+
+def test_turnover_leaders_match_row_at_a_time(engine, rows):
+    issuers = len({row['Код_на_издавач'] for row in rows})
+    expected = dict(turnover_leaders_row_at_a_time(rows, days=30, limit=issuers))
+    assert expected
+    result = engine.turnover_leaders(days=30, limit=issuers)
+
+    assert {row['issuer']: row['total_turnover'] for row in result} == pytest.approx(expected)
+    totals = [row['total_turnover'] for row in result]
+    assert totals == sorted(totals, reverse=True)
+
+
+def test_top_movers_match_row_at_a_time(engine, rows):
+    latest = max(row['date'] for row in rows)
+    changes = {row['Код_на_издавач']: _mk_number(row['Промет_во_БЕСТ_во_денари'])
+               for row in rows if row['date'] == latest}
+    result = engine.top_movers(limit=3)
+
+    assert result['date'] == latest.strftime('%Y-%m-%d')
+    gainers = [row['pct_change'] for row in result['gainers']]
+    losers = [row['pct_change'] for row in result['losers']]
+    assert gainers == pytest.approx(sorted(changes.values(), reverse=True)[:3])
+    assert losers == pytest.approx(sorted(changes.values())[:3])
+    for row in result['gainers'] + result['losers']:
+        assert row['pct_change'] == pytest.approx(changes[row['issuer']])
+
+
+def test_volatility_matches_row_at_a_time(engine, rows):
+    window, active_days = 20, 30
+    since = max(row['date'] for row in rows) - timedelta(days=active_days)
+    history = defaultdict(list)
+    for row in sorted(rows, key=lambda row: row['date']):
+        close = _mk_number(row['Цена_на_последна_трансакција'])
+        if close > 0:
+            history[row['Код_на_издавач']].append((row['date'], close))
+
+    expected = {}
+    for issuer, points in history.items():
+        if len(points) > window and points[-1][0] > since:
+            closes = np.array([close for _, close in points[-window - 1:]])
+            expected[issuer] = np.std(np.diff(np.log(closes)), ddof=1) * np.sqrt(252)
+
+    assert expected
+    result = engine.volatility(window=window, limit=len(history), active_days=active_days)
+    assert {row['issuer']: row['volatility'] for row in result} == pytest.approx(expected, rel=1e-9)
+
+
+def test_engine_is_reloaded_after_a_write(synthetic_db, tmp_path, monkeypatch):
+    path = str(tmp_path / 'stock_data.db')
+    shutil.copy(synthetic_db, path)
+    monkeypatch.setattr(stock_model, 'DB_NAME', path)
+    monkeypatch.setattr(market_analytics, '_engine', None)
+    monkeypatch.setattr(market_analytics, '_engine_version', None)
+
+    engine = get_market_analytics()
+    assert get_market_analytics() is engine
+
+    conn = sqlite3.connect(path)
+    row = list(conn.execute("SELECT * FROM stock_data LIMIT 1").fetchone())
+    row[1] = '1/2/2099'
+    conn.execute(f"INSERT INTO stock_data VALUES ({', '.join('?' * len(row))})", row)
+    conn.commit()
+    conn.close()
+
+    reloaded = get_market_analytics()
+    assert reloaded is not engine
+    assert reloaded.latest_date.strftime('%Y-%m-%d') == '2099-01-02'
+    assert get_market_analytics() is reloaded
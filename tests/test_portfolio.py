@@ -0,0 +1,59 @@
+# tests/test_portfolio.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.market_analytics import get_market_analytics
+from models.portfolio import PortfolioAnalytics, PricePanel, pairwise_covariance, rolling_betas
+
+
+@pytest.fixture
+def returns(main_db):
+    _, values = PricePanel.from_market(get_market_analytics()).returns('D')
+    return values
+
+
+@pytest.mark.parametrize('min_periods', [2, 20, 300])
+def test_pairwise_covariance_matches_pandas(returns, min_periods):
+    covariance, correlation, observations = pairwise_covariance(returns, min_periods)
+
+    frame = pd.DataFrame(returns.astype(np.float64))
+    np.testing.assert_allclose(covariance, frame.cov(min_periods=min_periods), rtol=1e-9, atol=1e-15, equal_nan=True)
+    np.testing.assert_allclose(correlation, frame.corr(min_periods=min_periods), rtol=1e-9, atol=1e-12, equal_nan=True)
+    present = frame.notna().astype(int)
+    np.testing.assert_array_equal(observations, present.T @ present)
+
+
+def test_pairwise_covariance_without_variance():
+    returns = np.array([[0.01, 0.0], [0.02, 0.0], [np.nan, 0.0], [0.03, 0.0]], dtype=np.float32)
+    _, correlation, observations = pairwise_covariance(returns, min_periods=2)
+    assert correlation[0, 0] == 1.0
+    assert np.isnan(correlation[1, 1]) and np.isnan(correlation[0, 1])
+    assert observations.tolist() == [[3, 3], [3, 4]]
+
+
+def test_rolling_betas_match_pandas(returns):
+    # Equal-weighted index of the issuers that traded each day, NaN when none did
+    counts = np.sum(~np.isnan(returns), axis=1)
+    market = np.where(counts > 0, np.nansum(returns, axis=1) / np.maximum(counts, 1), np.nan)
+    window, min_periods = 60, 20
+    betas = rolling_betas(returns, market, window, min_periods)
+
+    for column in range(returns.shape[1]):
+        frame = pd.DataFrame({'x': returns[:, column], 'm': market}).astype(np.float64)
+        frame.loc[frame['x'].isna(), 'm'] = np.nan
+        rolling = frame.rolling(window, min_periods=min_periods)
+        expected = rolling['x'].cov(frame['m']) / rolling['m'].var()
+        np.testing.assert_allclose(betas[:, column], expected, rtol=1e-6, atol=1e-9, equal_nan=True)
+
+
+def test_volatility_of_one_issuer_is_its_annualized_std(returns, main_db):
+    analytics = PortfolioAnalytics(PricePanel.from_market(get_market_analytics()))
+    issuer = analytics.panel.most_traded(1)[0]
+    column = analytics.panel.issuers.index(issuer)
+
+    result = analytics.volatility([issuer])
+    expected = np.nanstd(returns[:, column].astype(np.float64), ddof=1) * np.sqrt(252)
+    assert result['volatility'] == pytest.approx(expected, rel=1e-9)
+    assert result['risk_contributions'] == [pytest.approx(1.0)]
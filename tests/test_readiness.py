@@ -0,0 +1,67 @@
+# tests/test_readiness.py
+
+import threading
+
+import pytest
+from flask import Flask
+from prometheus_client import REGISTRY
+
+from common import readiness
+
+
+def _app(warmup=None, checks=()):
+    app = Flask(__name__)
+    state = readiness.init_app(app, warmup, checks)
+    return app.test_client(), state
+
+
+@pytest.fixture(autouse=True)
+def warmup_enabled(monkeypatch):
+    monkeypatch.setenv('WARMUP', '1')
+
+
+def test_ready_after_warm_up():
+    release = threading.Event()
+    client, state = _app(lambda: release.wait(5))
+
+    assert client.get('/health').status_code == 200
+    response = client.get('/ready')
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'warming up'
+
+    release.set()
+    assert state.wait(5)
+    response = client.get('/ready')
+    assert response.status_code == 200 and response.get_json() == {'status': 'ready'}
+    assert REGISTRY.get_sample_value('service_ready') == 1
+
+
+def test_failed_warm_up_is_reported():
+    def warmup():
+        raise RuntimeError("model file missing")
+
+    client, state = _app(warmup)
+    assert state.wait(5)
+    response = client.get('/ready')
+    assert response.status_code == 503
+    assert response.get_json() == {'status': 'error', 'error': 'warm-up failed: model file missing'}
+    assert client.get('/health').status_code == 200
+
+
+def test_failing_check_is_reported():
+    def check_database():
+        raise OSError("unable to open database file")
+
+    client, state = _app(checks=[check_database])
+    assert state.wait(0)
+    response = client.get('/ready')
+    assert response.status_code == 503
+    assert response.get_json()['error'] == 'check_database: unable to open database file'
+
+
+def test_warm_up_can_be_disabled(monkeypatch):
+    monkeypatch.setenv('WARMUP', '0')
+    calls = []
+    client, _ = _app(lambda: calls.append(1))
+    assert client.get('/ready').status_code == 200
+    assert calls == []
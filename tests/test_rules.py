@@ -0,0 +1,92 @@
+# tests/test_rules.py
+
+import re
+
+import numpy as np
+import pytest
+
+from strategies.analysis_strategies import (
+    AdxOnlyStrategy,
+    CciOnlyStrategy,
+    MacdOnlyStrategy,
+    RSIOnlyStrategy,
+)
+from strategies.rules import RuleError, RuleStrategy, compile_rule, resolve_strategy, tokenize
+
+
+def test_tokenize():
+    assert tokenize("rsi(7) <= 30.5 and price>sma50") == [
+        ('name', 'RSI'), ('symbol', '('), ('number', 7.0), ('symbol', ')'), ('symbol', '<='),
+        ('number', 30.5), ('name', 'AND'), ('name', 'PRICE'), ('symbol', '>'), ('name', 'SMA50'),
+    ]
+
+
+def test_tokenize_rejects_unknown_characters():
+    with pytest.raises(RuleError, match="Unexpected character '&'"):
+        tokenize("RSI < 30 && MACD > 0")
+
+
+@pytest.mark.parametrize('rule, indicators', [
+    ("RSI < 30", {('RSI', (14,))}),
+    ("rsi(7) < 20", {('RSI', (7,))}),
+    ("SMA50 < price", {('SMA', (50,)), ('PRICE', ())}),
+    ("SMA(10) > EMA(20)", {('SMA', (10,)), ('EMA', (20,))}),
+    ("MACD(5, 35) > MACD_SIGNAL", {('MACD', (5, 35)), ('MACD_SIGNAL', (12, 26, 9))}),
+    ("(CCI < -100 OR RSI(7) < 20) AND NOT ADX < 20",
+     {('CCI', (20,)), ('RSI', (7,)), ('ADX', (14,))}),
+    ("(high - low) / close * 100 > 2", {('HIGH', ()), ('LOW', ()), ('CLOSE', ())}),
+])
+def test_parse_collects_indicators(rule, indicators):
+    assert compile_rule(rule).indicators == indicators
+
+
+@pytest.mark.parametrize('rule, message', [
+    ("", "Empty rule"),
+    ("RSI", "must be a condition"),
+    ("RSI < 30 AND", "ends early"),
+    ("RSI < 30)", "Unexpected ')'"),
+    ("(RSI < 30", "Expected ')'"),
+    ("FOO > 1", "Unknown indicator 'FOO'"),
+    ("SMA > 1", "SMA needs a window"),
+    ("RSI(7, 3) > 1", "RSI takes at most 1 parameter"),
+    ("RSI(0) > 1", "positive integers"),
+    ("RSI(2.5) > 1", "positive integers"),
+    ("RSI AND MACD > 0", "AND/OR/NOT need conditions"),
+    ("(RSI < 30) < 1", "Comparisons need numbers"),
+    ("-(RSI < 30)", "Unary minus needs a number"),
+])
+def test_parse_errors(rule, message):
+    with pytest.raises(RuleError, match=re.escape(message)):
+        compile_rule(rule)
+
+
+def test_precedence():
+    frame = np.zeros(1)
+    # AND binds tighter than OR, arithmetic tighter than comparisons
+    assert compile_rule("1 > 2 AND 1 > 2 OR 2 > 1")(frame).all()
+    assert not compile_rule("1 > 2 AND (1 > 2 OR 2 > 1)")(frame).any()
+    assert compile_rule("1 + 2 * 3 == 7")(frame).all()
+    assert compile_rule("NOT 1 > 2 AND 2 > 1")(frame).all()
+
+
+def test_resolve_strategy():
+    assert resolve_strategy('RSI')[0] == 'rsi'
+    label, strategy = resolve_strategy({'buy': 'RSI < 30', 'sell': 'RSI > 70'})
+    assert label == 'rule' and strategy.sell.text == 'RSI > 70'
+    with pytest.raises(RuleError, match="is not supported or is not a valid rule"):
+        resolve_strategy('momentum')
+
+
+@pytest.mark.parametrize('builtin, buy, sell, column', [
+    (RSIOnlyStrategy, "RSI < 40", "RSI > 60", 'RSI'),
+    (MacdOnlyStrategy, "MACD > 0", "NOT MACD > 0", 'MACD'),
+    (AdxOnlyStrategy, "ADX > 25", "NOT ADX > 25", 'ADX'),
+    (CciOnlyStrategy, "CCI < -100", "CCI > 100", 'CCI'),
+])
+def test_rule_forms_of_builtin_strategies(issuer_frame, builtin, buy, sell, column):
+    expected = builtin().perform_analysis(issuer_frame.copy())
+    result = RuleStrategy(buy, sell).perform_analysis(issuer_frame.copy())
+
+    assert result['Signal'].tolist() == expected['Signal'].tolist()
+    np.testing.assert_allclose(result[column].to_numpy(float), expected[column].to_numpy(float), equal_nan=True)
+
@@ -0,0 +1,84 @@
+# tests/test_singleflight.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from prometheus_client import REGISTRY
+
+from common.singleflight import SingleFlight, body_key
+
+CALLERS = 8
+
+
+def _followers(group):
+    return REGISTRY.get_sample_value('singleflight_calls_total', {'group': group, 'role': 'follower'}) or 0
+
+
+def _run_concurrently(group, work):
+    """
+    Call SingleFlight(group).do('key', ...) from CALLERS threads, keeping the
+    first call running until every other caller has joined it. Returns the
+    futures and how many times the work actually ran.
+    """
+    flight = SingleFlight(group)
+    started, release = threading.Event(), threading.Event()
+    runs = []
+
+    def blocking():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return work()
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        futures = [pool.submit(flight.do, 'key', blocking)]
+        assert started.wait(5)
+        futures += [pool.submit(flight.do, 'key', blocking) for _ in range(CALLERS - 1)]
+        deadline = time.monotonic() + 5
+        while _followers(group) < CALLERS - 1 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+    return futures, len(runs)
+
+
+def test_concurrent_calls_are_coalesced():
+    result = object()
+    futures, runs = _run_concurrently('test_coalesced', lambda: result)
+
+    assert runs == 1
+    assert _followers('test_coalesced') == CALLERS - 1
+    assert all(future.result() is result for future in futures)
+
+
+def test_exception_reaches_every_caller():
+    def fail():
+        raise KeyError('boom')
+
+    futures, runs = _run_concurrently('test_exception', fail)
+    assert runs == 1
+    for future in futures:
+        with pytest.raises(KeyError, match='boom'):
+            future.result()
+
+
+def test_nothing_is_cached_after_the_call():
+    flight = SingleFlight('test_sequential')
+    runs = []
+    for _ in range(3):
+        flight.do('key', runs.append, 1)
+    assert len(runs) == 3
+    assert _followers('test_sequential') == 0
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight('test_keys')
+    assert flight.do('a', lambda: 1) == 1
+    assert flight.do('b', lambda: 2) == 2
+
+
+def test_body_key():
+    assert body_key('a', b'b') == body_key('a', 'b')
+    # Parts are delimited, so shifting bytes between them changes the key
+    assert body_key('ab', 'c') != body_key('a', 'bc')
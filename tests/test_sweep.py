@@ -0,0 +1,116 @@
+# tests/test_sweep.py
+
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+
+from strategies.analysis_strategies import parse_mk_number
+from strategies import sweep
+from strategies.sweep import DEFAULT_GRIDS, cci_windows, ewm_windows, rsi_windows, sma_windows, sweep_frame
+
+
+@pytest.fixture(scope='module')
+def prices(issuer_frame):
+    return tuple(
+        parse_mk_number(issuer_frame[column]).to_numpy()
+        for column in ('Мак_', 'Мин_', 'Цена_на_последна_трансакција')
+    )
+
+
+@pytest.mark.parametrize('block', [7, 128])
+def test_ewm_windows_matches_pandas(prices, block):
+    close = prices[2]
+    windows = [2, 5, 14, 30]
+    result = ewm_windows(close, windows, block=block)
+    for row, window in zip(result, windows):
+        expected = pd.Series(close).ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+        np.testing.assert_allclose(row, expected.to_numpy(), rtol=1e-9, equal_nan=True)
+
+
+def test_ewm_windows_rejects_bad_input():
+    with pytest.raises(ValueError, match="empty series"):
+        ewm_windows(np.array([]), [14])
+    with pytest.raises(ValueError, match="at least 2"):
+        ewm_windows(np.ones(10), [1])
+
+
+def test_rsi_windows_matches_ta(prices):
+    close = prices[2]
+    windows = [5, 14, 30]
+    for row, window in zip(rsi_windows(close, windows), windows):
+        expected = ta.momentum.RSIIndicator(pd.Series(close), window=window).rsi()
+        np.testing.assert_allclose(row, expected.to_numpy(), rtol=1e-7, equal_nan=True)
+
+
+def test_sma_windows_matches_pandas(prices):
+    close = prices[2]
+    windows = [1, 10, 50]
+    for row, window in zip(sma_windows(close, windows), windows):
+        expected = pd.Series(close).rolling(window).mean()
+        np.testing.assert_allclose(row, expected.to_numpy(), rtol=1e-9, equal_nan=True)
+
+
+def test_cci_windows_matches_ta(prices):
+    high, low, close = prices
+    windows = [10, 20, 40]
+    for row, window in zip(cci_windows(high, low, close, windows), windows):
+        expected = ta.trend.CCIIndicator(pd.Series(high), pd.Series(low), pd.Series(close), window=window).cci()
+        np.testing.assert_allclose(row, expected.to_numpy(), rtol=1e-7, equal_nan=True)
+
+
+def test_cci_windows_in_blocks(prices, monkeypatch):
+    windows = [10, 20, 40]
+    expected = cci_windows(*prices, windows)
+    # One window per block
+    monkeypatch.setattr(sweep, 'CCI_BLOCK_CELLS', 1)
+    np.testing.assert_array_equal(cci_windows(*prices, windows), expected)
+
+
+def test_sweep_frame(issuer_frame):
+    result = sweep_frame(issuer_frame, 'rsi', {'window': [7, 14], 'lower': [30], 'upper': [70]}, top=2)
+    assert result['combinations'] == 2
+    assert sorted(best['params']['window'] for best in result['best']) == [7, 14]
+    assert result['best'][0]['sharpe'] >= result['best'][1]['sharpe']
+
+
+@pytest.mark.parametrize('strategy, rows, grid, message', [
+    ('rsi', 0, None, "missing columns"),
+    ('rsi', 10, None, "Need at least 31 priced rows"),
+    ('adx', 40, None, "Need at least 56 priced rows"),
+    ('rsi', None, {'window': []}, "non-empty list"),
+    ('rsi', None, {'period': [14]}, "Unknown parameters"),
+    ('sma', None, {'fast': [2.5]}, "positive integer windows"),
+    ('momentum', None, None, "cannot be swept"),
+    ('cci', None, {'threshold': list(range(65))}, "at most 64 are allowed"),
+    ('sma', None, {'slow': [20, 251]}, "at most 250"),
+    ('rsi', None, {'window': list(range(2, 60))}, "Grid has 2088 combinations"),
+])
+def test_sweep_frame_rejects_bad_input(issuer_frame, strategy, rows, grid, message):
+    frame = issuer_frame if rows is None else issuer_frame.iloc[:rows]
+    if rows == 0:
+        frame = pd.DataFrame()
+    with pytest.raises(ValueError, match=message):
+        sweep_frame(frame, strategy, grid)
+
+
+def test_default_grids_are_within_the_limits():
+    for strategy in DEFAULT_GRIDS:
+        assert sweep._validated_grid(strategy, None) == DEFAULT_GRIDS[strategy]
+
+
+@pytest.mark.parametrize('top', [0, -1, 2.5, '3', True])
+def test_sweep_frame_rejects_bad_top(issuer_frame, top):
+    with pytest.raises(ValueError, match="top must be a positive integer"):
+        sweep_frame(issuer_frame, 'sma', top=top)
+
+
+@pytest.mark.parametrize('body, message', [
+    ({'strategy': 7}, "strategy must be a string"),
+    ({'strategy': 'rsi', 'top': 0}, "top must be a positive integer"),
+    ({'strategy': 'rsi', 'grid': {'window': list(range(2, 60))}}, "at most 1000"),
+])
+def test_sweep_route_rejects_bad_requests(strategy_client, issuer_frame, body, message):
+    response = strategy_client.post('/sweep', json={'issuer_data': issuer_frame.to_dict('records'), **body})
+    assert response.status_code == 400
+    assert message in response.get_json()['error']